@@ -1,5 +1,3 @@
-import os
-
 from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
 from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPConnectionParams
 from google.adk.agents.llm_agent import LlmAgent
@@ -12,7 +10,6 @@ load_dotenv()
 
 MCP_SERVERS = [
     "http://localhost:8004/city_server",
-    f"https://mcp.tavily.com/mcp/?tavilyApiKey={os.getenv('TAVILY_API_KEY')}"
 ]
 
 
@@ -0,0 +1,91 @@
+"""Attractions search benchmark: cold searches vs. the memory and disk caches, against a stand-in API.
+
+Run from the `instrutor` folder:
+
+    python -m benchmarks.attractions
+
+A local HTTP server stands in for the Tavily search endpoint and answers after a fixed delay.
+The benchmark times a first (cold) round of searches, a burst of concurrent identical searches
+(which must reach the endpoint only once per city), and a round after a "restart" of the server
+process, when only the disk cache survives.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from servers.city.helpers import attractions
+from utils.async_cache import AsyncTTLCache
+
+LATENCY = 0.5
+CITIES = ["Lisbon", "Porto", "Madrid", "Paris", "Rome"]
+BURST = 20
+upstream_calls = 0
+
+
+class StandInSearchAPI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        global upstream_calls
+        upstream_calls += 1
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(LATENCY)
+        results = [{"title": f"Attraction {i}", "url": f"https://example.com/{i}", "content": request["query"], "score": 1.0}
+                   for i in range(request.get("max_results", 5))]
+        data = json.dumps({"query": request["query"], "results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def timed_round(searches: list[str]) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(attractions.search_trending_attractions(city, "benchmark-key") for city in searches))
+    elapsed = time.perf_counter() - start
+    await attractions.close_http_client()
+    return elapsed
+
+
+def run_round(label: str, searches: list[str], disk_cache: str) -> tuple[str, int, float, int]:
+    global upstream_calls
+    # Every round starts like a new server process: empty memory cache, given disk cache
+    attractions.ATTRACTIONS_CACHE = AsyncTTLCache(ttl=attractions.ATTRACTIONS_TTL)
+    attractions.ATTRACTIONS_DISK_CACHE = attractions.SearchResultCache(disk_cache)
+    upstream_calls = 0
+    elapsed = asyncio.run(timed_round(searches))
+    attractions.ATTRACTIONS_DISK_CACHE.close()
+    return label, len(searches), elapsed, upstream_calls
+
+
+def main():
+    ThreadingHTTPServer.request_queue_size = 64  # accept a burst of new connections
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInSearchAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    attractions.TAVILY_API_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    directory = tempfile.mkdtemp()
+    try:
+        rows = [
+            run_round("cold", CITIES, os.path.join(directory, "cold.sqlite3")),
+            # An empty disk cache of its own, so only the in-memory coalescing can save requests
+            run_round(f"burst of {BURST} per city", CITIES * BURST, os.path.join(directory, "burst.sqlite3")),
+            run_round("after restart", CITIES, os.path.join(directory, "cold.sqlite3")),
+        ]
+    finally:
+        server.shutdown()
+    print(f"{LATENCY * 1000:.0f} ms per search request")
+    print(f"{'round':<24}{'searches':>9}{'time (s)':>10}{'requests':>10}")
+    for label, count, elapsed, calls in rows:
+        print(f"{label:<24}{count:>9}{elapsed:>10.3f}{calls:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Cold-start benchmark: CSV parsing vs. binary snapshots.
+
+Run from the `instrutor` folder:
+
+    python -m benchmarks.cold_start
+
+Every dataset is loaded by a fresh registry, once straight from the CSV and once from its
+binary snapshot (written by the first load if missing). Accommodation datasets that are not
+present on disk are reported and skipped.
+"""
+import gc
+import os
+import time
+
+from servers.accommodations.helpers import airbnbs, hotels
+from servers.flights.helpers import airlines, airports, countries, planes, routes
+from utils.registry import DatasetRegistry
+from utils.snapshot import snapshot_path
+
+DATASETS = [
+    (os.path.join(airports.DATASET_DIR, airports.FILENAME_AIRPORTS), airports.HEADERS_AIRPORTS),
+    (os.path.join(airlines.DATASET_DIR, airlines.FILENAME_AIRLINES), airlines.HEADERS_AIRLINES),
+    (os.path.join(routes.DATASET_DIR, routes.FILENAME_ROUTES), routes.HEADERS_ROUTES),
+    (os.path.join(planes.DATASET_DIR, planes.FILENAME_PLANES), planes.HEADERS_PLANES),
+    (os.path.join(countries.DATASET_DIR, countries.FILENAME_COUNTRIES), countries.HEADERS_COUNTRIES),
+    (os.path.join(airbnbs.DATASET_DIR, airbnbs.AIRBNB_FILENAME), None),
+    (os.path.join(hotels.DATASET_DIR, hotels.HOTELS_FILENAME), None),
+]
+REPEAT = 5
+
+
+def best_load_time(path: str, headers, binary_snapshots: bool) -> tuple[float, int]:
+    best = float("inf")
+    rows = 0
+    for _ in range(REPEAT):
+        gc.collect()
+        registry = DatasetRegistry(binary_snapshots=binary_snapshots)
+        start = time.perf_counter()
+        snapshot = registry.get(path, headers)
+        best = min(best, time.perf_counter() - start)
+        rows = snapshot.row_count
+    return best, rows
+
+
+def main():
+    print(f"{'dataset':<24}{'rows':>9}{'csv (s)':>10}{'snapshot (s)':>14}{'speedup':>9}")
+    total_csv = total_snapshot = 0.0
+    for path, headers in DATASETS:
+        name = os.path.basename(path)
+        if not os.path.exists(path):
+            print(f"{name:<24}{'missing, skipped':>42}")
+            continue
+        # Make sure the snapshot exists and matches the current file
+        DatasetRegistry(binary_snapshots=True).get(path, headers)
+        assert os.path.exists(snapshot_path(path))
+        csv_time, rows = best_load_time(path, headers, binary_snapshots=False)
+        snapshot_time, _ = best_load_time(path, headers, binary_snapshots=True)
+        total_csv += csv_time
+        total_snapshot += snapshot_time
+        print(f"{name:<24}{rows:>9}{csv_time:>10.3f}{snapshot_time:>14.3f}{csv_time / snapshot_time:>8.1f}x")
+    if total_snapshot:
+        print(f"{'total':<24}{'':>9}{total_csv:>10.3f}{total_snapshot:>14.3f}{total_csv / total_snapshot:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Concurrency benchmark: tool latency under mixed load, with and without the worker pool.
+
+Run from the `instrutor` folder:
+
+    python -m benchmarks.concurrency
+
+Requests arrive on a fixed Poisson schedule (open loop) and call the flights helpers the way the
+MCP tools do, through a `ToolExecutor`, mixing cheap index lookups with slow multi-hop route
+searches. Latency is measured from the scheduled arrival of a request, so time spent waiting for
+a blocked event loop counts. With the "inline" executor every call runs on the event loop and one
+route search stalls every lookup that arrives meanwhile; with a thread or process pool the lookups
+keep flowing.
+"""
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from servers.flights.helpers.airports import find_airport_by_iata, get_airport_indexes
+from servers.flights.helpers.routes import find_route_paths, get_route_graph
+from utils.executor import ToolExecutor
+
+REQUESTS_PER_SECOND = 300
+DURATION = 5.0
+SEARCH_SHARE = 0.1
+SEARCH_LIMIT = 2
+AIRPORTS = ["LIS", "OPO", "MAD", "JFK", "SYD", "NRT", "GRU", "JNB", "LAX", "DXB", "HNL", "SCL"]
+
+
+async def request(executor: ToolExecutor, rng: random.Random, arrival: float, latencies: dict[str, list[float]]):
+    if rng.random() < SEARCH_SHARE:
+        source, destination = rng.sample(AIRPORTS, 2)
+        await executor.run("find_route_hops", find_route_paths, source, destination, 4, 200)
+        kind = "search"
+    else:
+        await executor.run("get_airport_by_iata", find_airport_by_iata, rng.choice(AIRPORTS))
+        kind = "lookup"
+    latencies[kind].append(time.perf_counter() - arrival)
+
+
+async def run(executor: ToolExecutor, duration: float) -> dict[str, list[float]]:
+    rng = random.Random(0)
+    latencies: dict[str, list[float]] = {"lookup": [], "search": []}
+    tasks = []
+    start = time.perf_counter()
+    arrival = start
+    while arrival < start + duration:
+        arrival += rng.expovariate(REQUESTS_PER_SECOND)
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(request(executor, rng, arrival, latencies)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def main():
+    # Load the datasets before any pool starts, as the servers do
+    get_airport_indexes()
+    get_route_graph()
+    print(f"{REQUESTS_PER_SECOND} requests/s for {DURATION:.0f}s, {SEARCH_SHARE:.0%} route searches")
+    print(f"{'executor':<10}{'lookup p50 (ms)':>17}{'lookup p99 (ms)':>17}{'search p50 (ms)':>17}{'search p99 (ms)':>17}")
+    for kind in ("inline", "thread", "process"):
+        executor = ToolExecutor(kind=kind, limits={"find_route_hops": SEARCH_LIMIT})
+        try:
+            asyncio.run(run(executor, 0.5))  # start and warm the pool up
+            latencies = asyncio.run(run(executor, DURATION))
+        finally:
+            executor.shutdown()
+        lookup = np.array(latencies["lookup"]) * 1000
+        search = np.array(latencies["search"]) * 1000
+        print(f"{kind:<10}{np.percentile(lookup, 50):>17.2f}{np.percentile(lookup, 99):>17.2f}"
+              f"{np.percentile(search, 50):>17.2f}{np.percentile(search, 99):>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Lookup benchmark: linear scans vs. the hash indexes of the flights helpers.
+
+Run from the `instrutor` folder:
+
+    python -m benchmarks.lookups
+
+Each lookup is timed at the current dataset size and on a dataset scaled 100x by repeating
+the rows with fresh codes, so that the indexes have to hold 100x more keys.
+"""
+import random
+import timeit
+
+from servers.flights.helpers.airlines import build_airline_indexes, load_airlines
+from servers.flights.helpers.airports import build_airport_indexes, load_airports
+from servers.flights.helpers.countries import load_countries
+from servers.flights.helpers.planes import build_plane_index, load_planes
+from utils.indexes import unique_index
+
+SCALE = 100
+QUERIES = 200
+
+
+def scale(rows, fields: list[str], factor: int) -> list[dict]:
+    """Repeat the rows `factor` times, making the given fields unique for every copy."""
+    scaled = []
+    for copy in range(factor):
+        for row in rows:
+            row = dict(row)
+            if copy:
+                for f in fields:
+                    row[f] = f"{row[f]}#{copy}"
+            scaled.append(row)
+    return scaled
+
+
+def scan_airport(rows, iata):
+    iata = iata.upper()
+    for a in rows:
+        if a.get("iata", "").upper() == iata:
+            return a
+
+
+def scan_airline(rows, code):
+    for al in rows:
+        if al.get("iata", "").upper() == code.upper() or al.get("icao", "").upper() == code.upper() or al.get("name", "").lower() == code.lower():
+            return al
+
+
+def scan_country(rows, name):
+    for c in rows:
+        if c.get("name", "").lower() == name.lower():
+            return c
+
+
+def scan_planes(rows, code):
+    c = code.upper()
+    return [p for p in rows if p.get("iata", "").upper() == c or p.get("icao", "").upper() == c]
+
+
+def per_lookup_us(fn, keys) -> float:
+    return timeit.timeit(lambda: [fn(k) for k in keys], number=1) / len(keys) * 1e6
+
+
+def run(label: str, rows, fields, build, scan, lookup, key_field):
+    random.seed(0)
+    for factor in (1, SCALE):
+        data = scale(rows, fields, factor)
+        keys = [r[key_field] for r in random.sample(data, min(QUERIES, len(data)))]
+        index = build(data)
+        scan_us = per_lookup_us(lambda k: scan(data, k), keys)
+        index_us = per_lookup_us(lambda k: lookup(data, index, k), keys)
+        print(f"{label:<10}{len(data):>10}{scan_us:>14.1f}{index_us:>12.2f}")
+
+
+def main():
+    print(f"{'lookup':<10}{'rows':>10}{'scan (us)':>14}{'index (us)':>12}")
+    run("airport", load_airports(), ["iata", "icao"], build_airport_indexes, scan_airport,
+        lambda rows, idx, k: rows[idx["iata"][k.upper()]], "iata")
+    run("airline", load_airlines(), ["iata", "icao", "name"], build_airline_indexes, scan_airline,
+        lambda rows, idx, k: rows[min(i for i in (idx["code"].get(k.upper()), idx["name"].get(k.lower())) if i is not None)], "name")
+    run("country", load_countries(), ["name"], lambda rows: unique_index(rows, lambda c: c.get("name", "").lower()), scan_country,
+        lambda rows, idx, k: rows[idx[k.lower()]], "name")
+    run("plane", load_planes(), ["iata", "icao"], build_plane_index, scan_planes,
+        lambda rows, idx, k: [rows[i] for i in idx.get(k.upper(), [])], "icao")
+
+
+if __name__ == "__main__":
+    main()
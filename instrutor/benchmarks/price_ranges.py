@@ -0,0 +1,72 @@
+"""Price range benchmark: scans vs. the sorted price index of the hotel bookings.
+
+Run from the `instrutor` folder:
+
+    python -m benchmarks.price_ranges
+
+For ranges of growing width, times the per-row `float()` scan of the original helper, the
+vectorized mask over the typed price column, and the sorted index (two binary searches and a
+slice), the latter in file order and sorted by price with an offset.
+"""
+import timeit
+
+import numpy as np
+
+from servers.accommodations.helpers.hotels import get_hotel_price_index, get_hotels_table, load_hotels
+
+REPEAT = 20
+LIMIT = 50
+OFFSET = 100
+RANGES = [(100, 101), (100, 120), (50, 200), (0, 1e9)]
+
+
+def scan_rows(rows, low, high):
+    matches = []
+    for h in rows:
+        try:
+            price = float(h.get("price", 0))
+            if low <= price <= high:
+                matches.append(h)
+        except (ValueError, TypeError):
+            continue
+    return len(matches), matches[:LIMIT]
+
+
+def scan_column(table, low, high):
+    prices = table.values("price")
+    ids = np.flatnonzero((prices >= low) & (prices <= high))
+    return len(ids), table.take(ids, LIMIT)
+
+
+def sorted_index(table, index, low, high, sort=None, offset=0):
+    ids = index.range(low, high, sort)
+    return len(ids), table.take(ids, LIMIT, offset)
+
+
+def per_query_us(fn) -> float:
+    return min(timeit.repeat(fn, number=REPEAT, repeat=3)) / REPEAT * 1e6
+
+
+def main():
+    # The bookings are joined from the star schema when read: materialize them once, so the row
+    # scan times the scan and not the join
+    rows, table = list(load_hotels()), get_hotels_table()
+    build_s = timeit.timeit(get_hotel_price_index, number=1)
+    index = get_hotel_price_index()
+    print(f"{len(rows)} hotel bookings, sorted price index built in {build_s * 1e3:.1f} ms")
+    print(f"{'range':<14}{'matches':>9}{'row scan':>12}{'mask':>10}{'index':>10}{'asc+offset':>12}{'desc+offset':>13}  (us)")
+    for low, high in RANGES:
+        count, first = sorted_index(table, index, low, high)
+        assert (count, first) == scan_column(table, low, high) == scan_rows(rows, low, high)
+        print(
+            f"{f'{low:g}-{high:g}':<14}{count:>9}"
+            f"{per_query_us(lambda: scan_rows(rows, low, high)):>12.0f}"
+            f"{per_query_us(lambda: scan_column(table, low, high)):>10.0f}"
+            f"{per_query_us(lambda: sorted_index(table, index, low, high)):>10.0f}"
+            f"{per_query_us(lambda: sorted_index(table, index, low, high, 'asc', OFFSET)):>12.0f}"
+            f"{per_query_us(lambda: sorted_index(table, index, low, high, 'desc', OFFSET)):>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
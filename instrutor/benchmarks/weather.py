@@ -0,0 +1,120 @@
+"""Weather client benchmark: blocking requests vs. the pooled async client, against a stand-in API.
+
+Run from the `instrutor` folder:
+
+    python -m benchmarks.weather
+
+A local HTTP server stands in for OpenWeatherMap: it answers the geocoding and One Call
+endpoints with canned JSON after a fixed delay that simulates the upstream latency. N weather
+lookups are made the old way (two blocking `requests.get` calls each, one after the other, on
+fresh connections) and through `get_city_weather`, concurrently, on the shared connection pool.
+The second async batch reuses the pooled connections and finds the coordinates in the geocode
+cache (an in-memory one here), so it makes a single request per city. Both run with the weather
+cache disabled; a last batch of repeated requests for a few cities shows how it coalesces them.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import requests
+
+from servers.city.helpers import weather
+from servers.city.helpers.geocoding import GeocodeCache
+from utils.async_cache import AsyncTTLCache
+
+LATENCY = 0.05
+CITIES = [f"City {i}" for i in range(20)]
+REPEATED = [f"City {i % 4}" for i in range(100)]
+upstream_calls = 0
+
+
+class StandInWeatherAPI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        global upstream_calls
+        upstream_calls += 1
+        time.sleep(LATENCY)
+        url = urlparse(self.path)
+        path = url.path
+        if path == weather.GEOCODE_PATH:
+            # A distinct location per city name
+            number = sum(map(ord, url.query))
+            body = [{"lat": number % 90, "lon": number % 180}]
+        elif path == weather.ONECALL_PATH:
+            body = {"current": {"temp": 21.0, "feels_like": 20.5, "weather": [{"main": "Clear", "description": "clear sky"}]}}
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def blocking_weather(base_url: str, city: str) -> dict:
+    geocode = requests.get(base_url + weather.GEOCODE_PATH, params={"q": city, "limit": 1}, timeout=10)
+    geocode.raise_for_status()
+    location = geocode.json()[0]
+    current = requests.get(base_url + weather.ONECALL_PATH, params={"lat": location["lat"], "lon": location["lon"]}, timeout=10)
+    current.raise_for_status()
+    return current.json()["current"]
+
+
+async def pooled_weather() -> tuple[float, float]:
+    timings = []
+    # The first batch opens the pooled connections, the second one reuses them
+    for _ in range(2):
+        start = time.perf_counter()
+        await asyncio.gather(*(weather.get_city_weather(city, None) for city in CITIES))
+        timings.append(time.perf_counter() - start)
+    await weather.close_http_client()
+    return timings[0], timings[1]
+
+
+async def repeated_weather() -> tuple[float, dict]:
+    weather.WEATHER_CACHE = AsyncTTLCache(ttl=600, stale_ttl=3600)
+    start = time.perf_counter()
+    await asyncio.gather(*(weather.get_city_weather(city, None) for city in REPEATED))
+    elapsed = time.perf_counter() - start
+    await weather.close_http_client()
+    return elapsed, weather.WEATHER_CACHE.stats()
+
+
+def main():
+    global upstream_calls
+    ThreadingHTTPServer.request_queue_size = 64  # accept a burst of new connections
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInWeatherAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    weather.WEATHER_API_BASE_URL = base_url
+    weather.GEOCODE_CACHE = GeocodeCache(":memory:")
+    weather.WEATHER_CACHE = AsyncTTLCache(ttl=0)
+    try:
+        start = time.perf_counter()
+        for city in CITIES:
+            blocking_weather(base_url, city)
+        blocking = time.perf_counter() - start
+        cold, warm = asyncio.run(pooled_weather())
+        upstream_calls = 0
+        repeated, stats = asyncio.run(repeated_weather())
+    finally:
+        server.shutdown()
+    print(f"{len(CITIES)} weather lookups, {LATENCY * 1000:.0f} ms per upstream call")
+    print(f"{'blocking requests':<20}{blocking:>8.3f} s")
+    print(f"{'pooled async, cold':<20}{cold:>8.3f} s  ({blocking / cold:.1f}x)")
+    print(f"{'pooled async, warm':<20}{warm:>8.3f} s  ({blocking / warm:.1f}x)")
+    print(f"{len(REPEATED)} concurrent lookups of {len(set(REPEATED))} cities with the weather cache: "
+          f"{repeated:.3f} s, {upstream_calls} upstream calls, {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import asyncio
+import logging
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
@@ -8,6 +9,9 @@ ACCOMMODATIONS_INFO_SERVER = FastMCP(name=SERVER_NAME)
 
 # Import dataset helpers
 from servers.accommodations.helpers.airbnbs import (
+    get_airbnb_bitmaps,
+    get_airbnb_price_index,
+    get_airbnb_city_stats,
     search_airbnbs_by_city,
     get_airbnbs_by_room_type,
     get_airbnbs_by_price_range,
@@ -17,15 +21,30 @@ from servers.accommodations.helpers.airbnbs import (
     get_airbnb_statistics_by_city
 )
 from servers.accommodations.helpers.hotels import (
+    get_hotel_bitmaps,
+    get_hotel_price_index,
+    get_hotel_city_stats,
+    get_hotel_star_schema,
+    get_hotel_price_cube,
     search_hotels_by_city,
     search_hotels_by_country,
     get_hotels_by_star_rating,
     get_hotels_by_price_range,
     get_hotels_with_offers,
     get_hotel_statistics_by_city,
+    get_hotel_price_trends,
     get_available_cities as get_hotel_cities,
     get_available_countries
 )
+from servers.accommodations.helpers.search import compare_city_prices, rank_accommodations, search_accommodations
+from utils.executor import ToolExecutor
+from utils.registry import warm_up
+
+# Helpers run on a worker pool (see utils.executor); the scans over the whole hotel dataset get a
+# concurrency limit so they cannot take every worker
+TOOL_EXECUTOR = ToolExecutor.from_env(limits={
+    "get_hotels_with_offers": 4,
+})
 
 # ===================== Airbnb Tools =====================
 
@@ -40,7 +59,7 @@ async def search_airbnbs_by_city_tool(city: str, limit: int = 50) -> dict:
     Returns:
         dict: A list of Airbnb listings in the specified city.
     """
-    return search_airbnbs_by_city(city, limit)
+    return await TOOL_EXECUTOR.run("search_airbnbs_by_city", search_airbnbs_by_city, city, limit)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_airbnbs_by_room_type")
 async def get_airbnbs_by_room_type_tool(room_type: str, limit: int = 50) -> dict:
@@ -53,7 +72,7 @@ async def get_airbnbs_by_room_type_tool(room_type: str, limit: int = 50) -> dict
     Returns:
         dict: A list of Airbnb listings of the specified room type.
     """
-    return get_airbnbs_by_room_type(room_type, limit)
+    return await TOOL_EXECUTOR.run("get_airbnbs_by_room_type", get_airbnbs_by_room_type, room_type, limit)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_airbnbs_statistics_by_city")
 async def get_airbnbs_statistics_by_city_tool(city: str) -> dict:
@@ -65,21 +84,23 @@ async def get_airbnbs_statistics_by_city_tool(city: str) -> dict:
     Returns:
         dict: Statistics including price ranges, ratings, room types, etc.
     """
-    return get_airbnb_statistics_by_city(city)
+    return await TOOL_EXECUTOR.run("get_airbnbs_statistics_by_city", get_airbnb_statistics_by_city, city)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_airbnbs_by_price_range")
-async def get_airbnbs_by_price_range_tool(min_price: float, max_price: float, limit: int = 50) -> dict:
+async def get_airbnbs_by_price_range_tool(min_price: float, max_price: float, limit: int = 50, sort: str = None, offset: int = 0) -> dict:
     """Get Airbnb listings within a specific price range.
 
     Args:
         min_price (float): Minimum price per night.
         max_price (float): Maximum price per night.
         limit (int): Maximum number of results to return (default: 50).
+        sort (str): "asc" or "desc" to order the listings by price (default: dataset order).
+        offset (int): Number of matching listings to skip, for paging through results (default: 0).
 
     Returns:
         dict: A list of Airbnb listings within the price range.
     """
-    return get_airbnbs_by_price_range(min_price, max_price, limit)
+    return await TOOL_EXECUTOR.run("get_airbnbs_by_price_range", get_airbnbs_by_price_range, min_price, max_price, limit, sort, offset)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_superhost_airbnbs")
 async def get_superhost_airbnbs_tool(city: str = None, limit: int = 50) -> dict:
@@ -92,7 +113,7 @@ async def get_superhost_airbnbs_tool(city: str = None, limit: int = 50) -> dict:
     Returns:
         dict: A list of Airbnb listings from superhosts.
     """
-    return get_superhost_airbnbs(city, limit)
+    return await TOOL_EXECUTOR.run("get_superhost_airbnbs", get_superhost_airbnbs, city, limit)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_airbnb_statistics_by_city")
 async def get_airbnb_statistics_by_city_tool(city: str) -> dict:
@@ -104,7 +125,7 @@ async def get_airbnb_statistics_by_city_tool(city: str) -> dict:
     Returns:
         dict: Statistics including price ranges, ratings, room types, etc.
     """
-    return get_airbnb_statistics_by_city(city)
+    return await TOOL_EXECUTOR.run("get_airbnb_statistics_by_city", get_airbnb_statistics_by_city, city)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_airbnb_cities")
 async def get_airbnb_cities_tool() -> dict:
@@ -113,62 +134,64 @@ async def get_airbnb_cities_tool() -> dict:
     Returns:
         dict: List of cities with Airbnb listings.
     """
-    return get_airbnb_cities()
+    return await TOOL_EXECUTOR.run("get_airbnb_cities", get_airbnb_cities)
 
 # ===================== Hotel Tools =====================
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="search_hotels_by_city")
 async def search_hotels_by_city_tool(city: str, limit: int = 50) -> dict:
-    """Search for hotel bookings by city name.
+    """Search for hotels by city name (one result per hotel, not per booking).
 
     Args:
         city (str): The name of the city to search for.
         limit (int): Maximum number of results to return (default: 50).
 
     Returns:
-        dict: A list of hotel bookings in the specified city.
+        dict: A list of the distinct hotels in the specified city, with their number of bookings.
     """
-    return search_hotels_by_city(city, limit)
+    return await TOOL_EXECUTOR.run("search_hotels_by_city", search_hotels_by_city, city, limit)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="search_hotels_by_country")
 async def search_hotels_by_country_tool(country: str, limit: int = 50) -> dict:
-    """Search for hotel bookings by country name.
+    """Search for hotels by country name (one result per hotel, not per booking).
 
     Args:
         country (str): The name of the country to search for.
         limit (int): Maximum number of results to return (default: 50).
 
     Returns:
-        dict: A list of hotel bookings in the specified country.
+        dict: A list of the distinct hotels in the specified country, with their number of bookings.
     """
-    return search_hotels_by_country(country, limit)
+    return await TOOL_EXECUTOR.run("search_hotels_by_country", search_hotels_by_country, country, limit)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_hotels_by_star_rating")
-async def get_hotels_by_star_rating_tool(star_rating: int, limit: int = 50) -> dict:
-    """Get hotel bookings filtered by star rating.
+async def get_hotels_by_star_rating_tool(star_rating: float, limit: int = 50) -> dict:
+    """Get hotels filtered by star rating (one result per hotel, not per booking).
 
     Args:
-        star_rating (int): The star rating to filter by (1-5).
+        star_rating (float): The star rating to filter by (1-5, half stars such as 3.5 included).
         limit (int): Maximum number of results to return (default: 50).
 
     Returns:
-        dict: A list of hotels with the specified star rating.
+        dict: A list of the distinct hotels with the specified star rating, with their number of bookings.
     """
-    return get_hotels_by_star_rating(star_rating, limit)
+    return await TOOL_EXECUTOR.run("get_hotels_by_star_rating", get_hotels_by_star_rating, star_rating, limit)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_hotels_by_price_range")
-async def get_hotels_by_price_range_tool(min_price: float, max_price: float, limit: int = 50) -> dict:
+async def get_hotels_by_price_range_tool(min_price: float, max_price: float, limit: int = 50, sort: str = None, offset: int = 0) -> dict:
     """Get hotel bookings within a specific price range.
 
     Args:
         min_price (float): Minimum price.
         max_price (float): Maximum price.
         limit (int): Maximum number of results to return (default: 50).
+        sort (str): "asc" or "desc" to order the bookings by price (default: dataset order).
+        offset (int): Number of matching bookings to skip, for paging through results (default: 0).
 
     Returns:
         dict: A list of hotel bookings within the price range.
     """
-    return get_hotels_by_price_range(min_price, max_price, limit)
+    return await TOOL_EXECUTOR.run("get_hotels_by_price_range", get_hotels_by_price_range, min_price, max_price, limit, sort, offset)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_hotels_with_offers")
 async def get_hotels_with_offers_tool(offer_category: str = None, limit: int = 50) -> dict:
@@ -181,7 +204,7 @@ async def get_hotels_with_offers_tool(offer_category: str = None, limit: int = 5
     Returns:
         dict: A list of hotels with offers.
     """
-    return get_hotels_with_offers(offer_category, limit)
+    return await TOOL_EXECUTOR.run("get_hotels_with_offers", get_hotels_with_offers, offer_category, limit)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_hotel_statistics_by_city")
 async def get_hotel_statistics_by_city_tool(city: str) -> dict:
@@ -193,7 +216,38 @@ async def get_hotel_statistics_by_city_tool(city: str) -> dict:
     Returns:
         dict: Statistics including price ranges, star ratings, accommodation types, etc.
     """
-    return get_hotel_statistics_by_city(city)
+    return await TOOL_EXECUTOR.run("get_hotel_statistics_by_city", get_hotel_statistics_by_city, city)
+
+@ACCOMMODATIONS_INFO_SERVER.tool(title="get_hotel_price_trends")
+async def get_hotel_price_trends_tool(
+    city: str = None,
+    star_rating: float = None,
+    year: int = None,
+    month: int = None,
+    weekend: bool = None,
+    holiday: bool = None,
+    group_by: list[str] = None,
+) -> dict:
+    """Get hotel prices per night by season, e.g. "is Vienna cheaper on weekdays in December?".
+
+    Any filter can be combined, and the prices can be broken down by any of city, star_rating,
+    year, month, weekend and holiday.
+
+    Args:
+        city (str): The name of the city (default: all cities).
+        star_rating (float): Only hotels with this star rating, half stars included (e.g. 3.5).
+        year (int): Only bookings of this year.
+        month (int): Only bookings of this month (1-12).
+        weekend (bool): Only weekend (true) or weekday (false) bookings.
+        holiday (bool): Only holiday (true) or non-holiday (false) bookings.
+        group_by (list[str]): Dimensions to break the prices down by (default: ["month"]).
+
+    Returns:
+        dict: The number of bookings and the min, average and max price per night, overall and per group.
+    """
+    return await TOOL_EXECUTOR.run(
+        "get_hotel_price_trends", get_hotel_price_trends, city, star_rating, year, month, weekend, holiday, group_by
+    )
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_hotel_cities")
 async def get_hotel_cities_tool() -> dict:
@@ -202,7 +256,7 @@ async def get_hotel_cities_tool() -> dict:
     Returns:
         dict: List of cities with hotel bookings.
     """
-    return get_hotel_cities()
+    return await TOOL_EXECUTOR.run("get_hotel_cities", get_hotel_cities)
 
 @ACCOMMODATIONS_INFO_SERVER.tool(title="get_hotel_countries")
 async def get_hotel_countries_tool() -> dict:
@@ -211,7 +265,7 @@ async def get_hotel_countries_tool() -> dict:
     Returns:
         dict: List of countries with hotel bookings.
     """
-    return get_available_countries()
+    return await TOOL_EXECUTOR.run("get_hotel_countries", get_available_countries)
 
 # ===================== Combined Tools =====================
 
@@ -225,8 +279,10 @@ async def compare_accommodations_by_city_tool(city: str) -> dict:
     Returns:
         dict: Comparison of Airbnb and hotel statistics for the city.
     """
-    airbnb_stats = get_airbnb_statistics_by_city(city)
-    hotel_stats = get_hotel_statistics_by_city(city)
+    airbnb_stats, hotel_stats = await asyncio.gather(
+        TOOL_EXECUTOR.run("compare_accommodations_by_city", get_airbnb_statistics_by_city, city),
+        TOOL_EXECUTOR.run("compare_accommodations_by_city", get_hotel_statistics_by_city, city)
+    )
     
     return {
         "city": city,
@@ -234,14 +290,100 @@ async def compare_accommodations_by_city_tool(city: str) -> dict:
         "hotel_data": hotel_stats
     }
 
-async def main():
-    await ACCOMMODATIONS_INFO_SERVER.run_async(
-        transport="http", 
-        host="localhost", 
-        port=8002, 
-        path="/accommodations_info_server", 
-        log_level="debug"
+@ACCOMMODATIONS_INFO_SERVER.tool(title="compare_city_prices")
+async def compare_city_prices_tool(cities: list[str]) -> dict:
+    """Compare typical Airbnb and hotel prices across several cities.
+
+    Args:
+        cities (list[str]): The names of the cities to compare.
+
+    Returns:
+        dict: Per city and for all of them together, the min, max, average and 10th/50th/90th
+        percentile of Airbnb and hotel prices.
+    """
+    return await TOOL_EXECUTOR.run("compare_city_prices", compare_city_prices, cities)
+
+@ACCOMMODATIONS_INFO_SERVER.tool(title="search_accommodations")
+async def search_accommodations_tool(
+    source: str = "both",
+    city: str = None,
+    min_price: float = None,
+    max_price: float = None,
+    room_type: str = None,
+    superhost: bool = None,
+    star_rating: float = None,
+    has_offer: bool = None,
+    max_center_distance_km: float = None,
+    min_guest_rating: float = None,
+    limit: int = 50,
+    sort: str = None,
+    offset: int = 0,
+) -> dict:
+    """Search Airbnbs and/or hotels matching all the given filters at once.
+
+    Prefer this tool over combining the results of several single-filter tools. Room type and
+    superhost only apply to Airbnbs, star rating and offers only to hotels.
+
+    Args:
+        source (str): "airbnbs", "hotels" or "both" (default: "both").
+        city (str): Part of the city name.
+        min_price (float): Minimum price.
+        max_price (float): Maximum price.
+        room_type (str): Airbnb room type (e.g. "Private room").
+        superhost (bool): Only Airbnbs from superhosts (true) or from other hosts (false).
+        star_rating (float): Hotel star rating, half stars included (e.g. 3.5).
+        has_offer (bool): Only hotels with (true) or without (false) an offer.
+        max_center_distance_km (float): Maximum distance to the city centre, in km.
+        min_guest_rating (float): Minimum guest rating, out of 5.
+        limit (int): Maximum number of results to return per source (default: 50).
+        sort (str): "asc" or "desc" to order the results by price (default: dataset order).
+        offset (int): Number of matching results to skip per source, for paging (default: 0).
+
+    Returns:
+        dict: The total count of matches and, per source, its count, query plan and matches.
+    """
+    return await TOOL_EXECUTOR.run(
+        "search_accommodations", search_accommodations, source, city, min_price, max_price, room_type, superhost,
+        star_rating, has_offer, max_center_distance_km, min_guest_rating, limit, sort, offset,
     )
 
+@ACCOMMODATIONS_INFO_SERVER.tool(title="rank_accommodations")
+async def rank_accommodations_tool(city: str = None, weights: dict[str, float] = None, k: int = 10, source: str = "both") -> dict:
+    """Get the best value Airbnbs and/or hotels of a city, ranked by a weighted score.
+
+    Criteria are normalized over the city so that 1 is the best: Airbnbs are scored on price,
+    guest_rating, cleanliness, center_distance and metro_distance, hotels on price (their average
+    price per night), guest_rating, stars and center_distance. Every hotel is ranked once.
+
+    Args:
+        city (str): The name of the city (default: all cities).
+        weights (dict[str, float]): Weight of every criterion to use, e.g. {"price": 2, "guest_rating": 1}
+            (default: mostly price and guest rating).
+        k (int): Number of results to return per source (default: 10, at most 50).
+        source (str): "airbnbs", "hotels" or "both" (default: "both").
+
+    Returns:
+        dict: Per source, the best k accommodations with their score.
+    """
+    return await TOOL_EXECUTOR.run("rank_accommodations", rank_accommodations, city, weights, k, source)
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    warm_up([
+        get_airbnb_bitmaps, get_airbnb_price_index, get_airbnb_city_stats,
+        get_hotel_bitmaps, get_hotel_price_index, get_hotel_city_stats, get_hotel_star_schema, get_hotel_price_cube,
+    ])
+    TOOL_EXECUTOR.start()
+    try:
+        await ACCOMMODATIONS_INFO_SERVER.run_async(
+            transport="http", 
+            host="localhost", 
+            port=8002, 
+            path="/accommodations_info_server", 
+            log_level="debug"
+        )
+    finally:
+        TOOL_EXECUTOR.shutdown()
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,19 +1,129 @@
+from collections.abc import Sequence
 from typing import Optional
 import os
-from utils.loader import load_dataset
+import numpy as np
+from utils import bitmap
+from utils.bitmap import BitmapIndex
+from utils.columnar import ColumnarTable, as_flag, positive
+from utils.group_stats import GroupStats
+from utils.query_planner import execute, order_by, range_predicate, text_predicate, value_predicate
+from utils.ranking import MAX_RANKED, check_weights, top_k, weighted_scores
+from utils.registry import DatasetSnapshot, get_dataset
+from utils.sorted_index import SORT_ORDERS, SortedIndex
 
 AIRBNB_FILENAME = "Aemf1.csv"
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dataset")
 AIRBNB_HEADERS = ["City", "Price", "Day", "Room Type", "Shared Room", "Private Room", "Person Capacity", "Superhost", "Multiple Rooms", "Business", "Cleanliness Rating", "Guest Satisfaction", "Bedrooms", "City Center (km)", "Metro Distance (km)", "Attraction Index", "Normalised Attraction Index", "Restraunt Index", "Normalised Restraunt Index"]
+AIRBNB_SCHEMA = {
+    "City": str,
+    "Room Type": str,
+    "Price": float,
+    "Superhost": as_flag("true"),
+    "Shared Room": as_flag("true"),
+    "Private Room": as_flag("true"),
+    "Multiple Rooms": as_flag("1", "true"),
+    "Business": as_flag("1", "true"),
+    "Cleanliness Rating": float,
+    "Guest Satisfaction": float,
+    "City Center (km)": float,
+    "Metro Distance (km)": float,
+}
+# Low-cardinality columns with a bitmap index, built at load (see get_airbnb_bitmaps)
+AIRBNB_BITMAP_COLUMNS = ["Room Type", "Superhost", "Shared Room", "Private Room", "Multiple Rooms", "Business"]
+# Criteria of rank_airbnbs: the column to score and whether lower values are better
+AIRBNB_RANKING_CRITERIA = {
+    "price": ("Price", True),
+    "guest_rating": ("Guest Satisfaction", False),
+    "cleanliness": ("Cleanliness Rating", False),
+    "center_distance": ("City Center (km)", True),
+    "metro_distance": ("Metro Distance (km)", True),
+}
+AIRBNB_RANKING_WEIGHTS = {"price": 0.4, "guest_rating": 0.3, "cleanliness": 0.1, "center_distance": 0.15, "metro_distance": 0.05}
 
-def load_airbnbs() -> list[dict]:
+def get_airbnbs_snapshot() -> DatasetSnapshot:
+    """Get the shared snapshot of the airbnbs dataset, parsed once per process.
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the airbnbs dataset.
+    """
+    dataset_path = os.path.join(DATASET_DIR, AIRBNB_FILENAME)
+    return get_dataset(dataset_path)
+
+def load_airbnbs() -> Sequence[dict]:
     """
     Load all Airbnb data.
     
     Returns:
-        list[dict]: A list of Airbnbs with their details.
+        Sequence[dict]: A list of Airbnbs with their details.
+    """
+    return get_airbnbs_snapshot().rows
+
+def get_airbnbs_table(snapshot: Optional[DatasetSnapshot] = None) -> ColumnarTable:
+    """
+    Get the typed columnar view of the Airbnb data.
+
+    Args:
+        snapshot (Optional[DatasetSnapshot]): The airbnbs snapshot to get it for (default: the current one).
+
+    Returns:
+        ColumnarTable: The Airbnbs with prices, ratings and flags coerced once at load.
+    """
+    return (snapshot if snapshot is not None else get_airbnbs_snapshot()).table(AIRBNB_SCHEMA)
+
+def get_airbnb_bitmaps() -> dict[str, BitmapIndex]:
+    """
+    Get the bitmap indexes of the boolean and categorical Airbnb columns, built once per snapshot.
+
+    Returns:
+        dict[str, BitmapIndex]: The bitmap index of every column in AIRBNB_BITMAP_COLUMNS.
+    """
+    table = get_airbnbs_table()
+    return {name: table.bitmap(name) for name in AIRBNB_BITMAP_COLUMNS}
+
+def get_airbnb_price_index() -> SortedIndex:
+    """
+    Get the Airbnb ids sorted by price, built once per snapshot.
+
+    Returns:
+        SortedIndex: The sorted index of the Price column.
+    """
+    return get_airbnbs_table().sorted("Price")
+
+def build_airbnb_city_stats(snapshot: DatasetSnapshot) -> GroupStats:
+    """
+    Build the statistics of every Airbnb city in one grouped pass over the table.
+
+    Args:
+        snapshot (DatasetSnapshot): The airbnbs snapshot to build them from.
+
+    Returns:
+        GroupStats: Listing counts, room type histograms and price, cleanliness and guest
+        satisfaction summaries with quantile sketches (positive values only) by city code.
+    """
+    table = get_airbnbs_table(snapshot)
+    return GroupStats(
+        table.codes("City"),
+        len(table.categories("City")),
+        summaries={
+            "price_stats": positive(table.values("Price")),
+            "rating_stats": positive(table.values("Cleanliness Rating")),
+            "satisfaction_stats": positive(table.values("Guest Satisfaction")),
+        },
+        histograms={"room_types": (table.codes("Room Type"), table.categories("Room Type"))},
+    )
+
+def get_airbnb_city_stats() -> GroupStats:
+    """
+    Get the materialized statistics of every Airbnb city, rebuilt when the dataset reloads.
+
+    Returns:
+        GroupStats: The statistics by city code.
     """
-    dataset_path = os.path.join(os.path.dirname(__file__), "dataset", AIRBNB_FILENAME)
-    return load_dataset(dataset_path)
+    return get_airbnbs_snapshot().derive("city_stats", build_airbnb_city_stats)
+
+def _city_ids(table: ColumnarTable, city: str) -> np.ndarray:
+    """Ids of the Airbnbs whose city contains the given name (case-insensitive)."""
+    return table.search("City", city)
 
 def search_airbnbs_by_city(city: str, limit: int = 50) -> dict:
     """
@@ -26,13 +136,12 @@ def search_airbnbs_by_city(city: str, limit: int = 50) -> dict:
     Returns:
         dict: A dictionary containing the count of matches, the city name, and a list of matching Airbnbs.
     """
-    city_lower = city.lower()
-    airbnbs = load_airbnbs()
-    matches = [a for a in airbnbs if city_lower in a.get("City", "").lower()]
+    table = get_airbnbs_table()
+    ids = _city_ids(table, city)
     return {
-        "count": len(matches),
+        "count": len(ids),
         "city": city,
-        "airbnbs": matches[:limit]
+        "airbnbs": table.take(ids, limit)
     }
 
 def get_airbnbs_by_room_type(room_type: str, limit: int = 50) -> dict:
@@ -46,15 +155,16 @@ def get_airbnbs_by_room_type(room_type: str, limit: int = 50) -> dict:
     Returns:
         dict: A dictionary containing the count of matches, the room type, and a list of matching Airbnbs.    
     """
-    airbnbs = load_airbnbs()
-    matches = [a for a in airbnbs if a.get("Room Type", "").lower() == room_type.lower()]
+    table = get_airbnbs_table()
+    room_type_lower = room_type.lower()
+    ids = bitmap.to_ids(table.bitmap("Room Type").where(lambda v: v.lower() == room_type_lower), len(table))
     return {
-        "count": len(matches),
+        "count": len(ids),
         "room_type": room_type,
-        "airbnbs": matches[:limit]
+        "airbnbs": table.take(ids, limit)
     }
 
-def get_airbnbs_by_price_range(min_price: float, max_price: float, limit: int = 50) -> dict:
+def get_airbnbs_by_price_range(min_price: float, max_price: float, limit: int = 50, sort: Optional[str] = None, offset: int = 0) -> dict:
     """
     Get Airbnbs within a price range.
     
@@ -62,24 +172,21 @@ def get_airbnbs_by_price_range(min_price: float, max_price: float, limit: int =
         min_price (float): The minimum price.
         max_price (float): The maximum price.
         limit (int): The maximum number of results to return.
+        sort (Optional[str]): "asc" or "desc" to order the Airbnbs by price (default: file order).
+        offset (int): How many matching Airbnbs to skip before the returned ones.
         
     Returns:
         dict: A dictionary containing the count of matches, the price range, and a list of matching Airbnbs.   
     """
-    airbnbs = load_airbnbs()
-    matches = []
-    for a in airbnbs:
-        try:
-            price = float(a.get("Price", 0))
-            if min_price <= price <= max_price:
-                matches.append(a)
-        except (ValueError, TypeError):
-            continue
+    if sort is not None and sort not in SORT_ORDERS:
+        return {"error": f"Invalid sort order: {sort} (expected 'asc' or 'desc')"}
     
+    table = get_airbnbs_table()
+    ids = get_airbnb_price_index().range(min_price, max_price, sort)
     return {
-        "count": len(matches),
+        "count": len(ids),
         "price_range": f"{min_price}-{max_price}",
-        "airbnbs": matches[:limit]
+        "airbnbs": table.take(ids, limit, offset)
     }
 
 def get_superhost_airbnbs(city: Optional[str] = None, limit: int = 50) -> dict:
@@ -93,17 +200,109 @@ def get_superhost_airbnbs(city: Optional[str] = None, limit: int = 50) -> dict:
     Returns:
         dict: A dictionary containing the count of matches, the city name (or "all"), and a list of superhost Airbnbs.
     """
-    airbnbs = load_airbnbs()
-    matches = [a for a in airbnbs if a.get("Superhost", "").lower() == "true"]
+    table = get_airbnbs_table()
+    superhosts = table.bitmap("Superhost").bitmap(1.0)
     
     if city:
-        city_lower = city.lower()
-        matches = [a for a in matches if city_lower in a.get("City", "").lower()]
+        superhosts = superhosts & bitmap.from_ids(_city_ids(table, city), len(table))
+    ids = bitmap.to_ids(superhosts, len(table))
     
     return {
-        "count": len(matches),
+        "count": len(ids),
         "city": city or "all",
-        "superhosts": matches[:limit]
+        "superhosts": table.take(ids, limit)
+    }
+
+def search_airbnbs(
+    city: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    room_type: Optional[str] = None,
+    superhost: Optional[bool] = None,
+    max_center_distance_km: Optional[float] = None,
+    min_guest_satisfaction: Optional[float] = None,
+    limit: int = 50,
+    sort: Optional[str] = None,
+    offset: int = 0,
+) -> dict:
+    """
+    Search Airbnbs matching every given filter, evaluating the most selective index first.
+    
+    Args:
+        city (Optional[str]): Part of the city name.
+        min_price (Optional[float]): The minimum price.
+        max_price (Optional[float]): The maximum price.
+        room_type (Optional[str]): The type of room (case-insensitive).
+        superhost (Optional[bool]): Only listings from (True) or not from (False) superhosts.
+        max_center_distance_km (Optional[float]): The maximum distance to the city center, in km.
+        min_guest_satisfaction (Optional[float]): The minimum guest satisfaction, out of 100.
+        limit (int): The maximum number of results to return.
+        sort (Optional[str]): "asc" or "desc" to order the Airbnbs by price (default: file order).
+        offset (int): How many matching Airbnbs to skip before the returned ones.
+        
+    Returns:
+        dict: A dictionary containing the count of matches, the query plan, and a list of matching Airbnbs.
+    """
+    if sort is not None and sort not in SORT_ORDERS:
+        return {"error": f"Invalid sort order: {sort} (expected 'asc' or 'desc')"}
+    
+    table = get_airbnbs_table()
+    predicates = []
+    if city:
+        predicates.append(text_predicate(table, "City", city))
+    if min_price is not None or max_price is not None:
+        predicates.append(range_predicate(table, "Price", min_price, max_price))
+    if room_type:
+        room_type_lower = room_type.lower()
+        room_types = [v for v in table.categories("Room Type") if v.lower() == room_type_lower]
+        predicates.append(value_predicate(table, "Room Type", room_types, f"Room Type = {room_type!r}"))
+    if superhost is not None:
+        predicates.append(value_predicate(table, "Superhost", [1.0 if superhost else 0.0], f"Superhost = {superhost}"))
+    if max_center_distance_km is not None:
+        predicates.append(range_predicate(table, "City Center (km)", high=max_center_distance_km))
+    if min_guest_satisfaction is not None:
+        predicates.append(range_predicate(table, "Guest Satisfaction", low=min_guest_satisfaction))
+    
+    ids, plan = execute(predicates, len(table))
+    if sort:
+        ids = order_by(table, "Price", ids, sort)
+    return {
+        "count": len(ids),
+        "plan": plan,
+        "airbnbs": table.take(ids, limit, offset)
+    }
+
+def rank_airbnbs(city: Optional[str] = None, weights: Optional[dict[str, float]] = None, k: int = 10) -> dict:
+    """
+    Rank Airbnbs by a weighted score of their price, ratings and distances.
+    
+    Every criterion is min-max normalized over the Airbnbs of the city (1 being the best, a
+    missing value scoring 0) and the score is the weighted sum of the criteria, in [0, 1]. Only
+    the k best rows are selected and materialized.
+    
+    Args:
+        city (Optional[str]): Part of the city name (default: all cities).
+        weights (Optional[dict[str, float]]): Weight of every criterion of AIRBNB_RANKING_CRITERIA
+            to use (default: AIRBNB_RANKING_WEIGHTS).
+        k (int): The maximum number of results to return (at most MAX_RANKED).
+        
+    Returns:
+        dict: A dictionary containing the count of ranked Airbnbs, the weights used, and the k best Airbnbs with their score.
+    """
+    weights, error = check_weights(weights, AIRBNB_RANKING_CRITERIA, AIRBNB_RANKING_WEIGHTS)
+    if error:
+        return {"error": error}
+    
+    table = get_airbnbs_table()
+    ids = _city_ids(table, city) if city else np.arange(len(table))
+    columns = {name: table.values(AIRBNB_RANKING_CRITERIA[name][0])[ids] for name in weights}
+    scores = weighted_scores(columns, AIRBNB_RANKING_CRITERIA, weights)
+    best = top_k(scores, max(1, min(k, MAX_RANKED)))
+    return {
+        "count": len(ids),
+        "city": city or "all",
+        "weights": {name: round(w, 4) for name, w in weights.items()},
+        "airbnbs": [{**row, "score": round(float(scores[i]), 4)} for i, row in zip(best, table.take(ids[best]))]
     }
 
 def get_airbnb_statistics_by_city(city: str) -> dict:
@@ -116,71 +315,24 @@ def get_airbnb_statistics_by_city(city: str) -> dict:
     Returns:
         dict: A dictionary containing various statistics about Airbnbs in the specified city.
     """
-    city_lower = city.lower()
-    airbnbs = load_airbnbs()
-    city_airbnbs = [a for a in airbnbs if city_lower in a.get("City", "").lower()]
+    # Cities whose name contains the query, merged from their precomputed statistics
+    cities = get_airbnbs_table().matching("City", city)
+    city_stats = get_airbnb_city_stats()
+    total = city_stats.total(cities)
     
-    if not city_airbnbs:
+    if not total:
         return {"error": f"No Airbnbs found for city: {city}"}
     
-    # Calculate statistics
-    prices = []
-    ratings = []
-    satisfaction_scores = []
-    
-    for a in city_airbnbs:
-        try:
-            price = float(a.get("Price", 0))
-            if price > 0:
-                prices.append(price)
-        except (ValueError, TypeError):
-            pass
-        
-        try:
-            rating = float(a.get("Cleanliness Rating", 0))
-            if rating > 0:
-                ratings.append(rating)
-        except (ValueError, TypeError):
-            pass
-        
-        try:
-            satisfaction = float(a.get("Guest Satisfaction", 0))
-            if satisfaction > 0:
-                satisfaction_scores.append(satisfaction)
-        except (ValueError, TypeError):
-            pass
-    
-    room_types = {}
-    for a in city_airbnbs:
-        room_type = a.get("Room Type", "Unknown")
-        room_types[room_type] = room_types.get(room_type, 0) + 1
-    
     stats = {
         "city": city,
-        "total_listings": len(city_airbnbs),
-        "room_types": room_types
+        "total_listings": total,
+        "room_types": city_stats.histogram("room_types", cities)
     }
     
-    if prices:
-        stats["price_stats"] = {
-            "min": min(prices),
-            "max": max(prices),
-            "avg": sum(prices) / len(prices)
-        }
-    
-    if ratings:
-        stats["rating_stats"] = {
-            "min": min(ratings),
-            "max": max(ratings),
-            "avg": sum(ratings) / len(ratings)
-        }
-    
-    if satisfaction_scores:
-        stats["satisfaction_stats"] = {
-            "min": min(satisfaction_scores),
-            "max": max(satisfaction_scores),
-            "avg": sum(satisfaction_scores) / len(satisfaction_scores)
-        }
+    for key in ("price_stats", "rating_stats", "satisfaction_stats"):
+        summary = city_stats.summary(key, cities)
+        if summary:
+            stats[key] = summary
     
     return stats
 
@@ -192,12 +344,8 @@ def get_available_cities() -> dict:
     Returns:
         dict: A dictionary containing the count of unique cities and a sorted list of city names.
     """
-    airbnbs = load_airbnbs()
-    cities = set()
-    for a in airbnbs:
-        city = a.get("City", "").strip()
-        if city:
-            cities.add(city)
+    cities = {c.strip() for c in get_airbnbs_table().categories("City")}
+    cities.discard("")
     
     return {
         "count": len(cities),
@@ -1,19 +1,269 @@
+from collections.abc import Sequence
 from typing import Optional
 import os
-from utils.loader import load_dataset
+import numpy as np
+from utils import bitmap
+from utils.bitmap import BitmapIndex
+from utils.columnar import ColumnarTable, positive
+from utils.cube import Cube, encode_numbers
+from utils.group_stats import GroupStats
+from utils.query_planner import execute, order_by, range_predicate, text_predicate, value_predicate
+from utils.ranking import MAX_RANKED, check_weights, top_k, weighted_scores
+from utils.registry import DatasetSnapshot, get_dataset
+from utils.snapshot import encode_columns
+from utils.sorted_index import SORT_ORDERS, SortedIndex
+from utils.star_schema import StarSchema
 
 HOTELS_FILENAME = "hotelbookingdata.csv"
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dataset")
 HOTELS_HEADERS = ["addresscountryname", "city_actual", "rating_reviewcount", "center1distance", "center1label", "center2distance", "center2label", "neighbourhood", "price", "price_night", "s_city", "starrating", "rating2_ta", "rating2_ta_reviewcount", "accommodationtype", "guestreviewsrating", "scarce_room", "hotel_id", "offer", "offer_cat", "year", "month", "weekend", "holiday"]
 
-def load_hotels() -> list[dict]:
+def parse_guest_rating(value: str) -> float:
+    """Parse a guest review rating such as "4.3 /5"."""
+    return float(value.replace(" /5", ""))
+
+def parse_miles(value: str) -> float:
+    """Parse a distance such as "7.0 miles"."""
+    return float(value.replace(" miles", ""))
+
+def parse_nights(value: str) -> float:
+    """Parse the stay a price is for, such as "price for 4 nights", into a number of nights."""
+    return float(value.split()[2])
+
+HOTELS_SCHEMA = {
+    "city_actual": str,
+    "addresscountryname": str,
+    "accommodationtype": str,
+    "offer_cat": str,
+    "price": float,
+    "starrating": float,
+    "guestreviewsrating": parse_guest_rating,
+    "center1distance": parse_miles,
+    "offer": int,
+    "weekend": int,
+    "holiday": int,
+    "year": int,
+    "month": int,
+    "price_night": parse_nights,
+    "hotel_id": str,
+}
+# Low-cardinality columns with a bitmap index, built at load (see get_hotel_bitmaps)
+HOTELS_BITMAP_COLUMNS = ["starrating", "offer", "offer_cat", "weekend", "holiday"]
+KM_PER_MILE = 1.609344
+# Star schema of the bookings, the in-memory form of the dataset: one dimension row per hotel_id
+# with the attributes of the hotel (from its first booking), and one compact fact per booking
+HOTEL_DIMENSION_ATTRIBUTES = ["addresscountryname", "city_actual", "neighbourhood", "accommodationtype", "starrating", "guestreviewsrating", "center1distance", "center1label"]
+HOTEL_DIMENSION_SCHEMA = {
+    "hotel_id": str,
+    "addresscountryname": str,
+    "city_actual": str,
+    "accommodationtype": str,
+    "starrating": float,
+    "guestreviewsrating": parse_guest_rating,
+    "center1distance": parse_miles,
+}
+HOTEL_FACT_MEASURES = {name: HOTELS_SCHEMA[name] for name in ["price", "price_night", "offer", "year", "month", "weekend", "holiday"]}
+# Dimensions of the price cube (see get_hotel_price_trends)
+HOTEL_PRICE_CUBE_DIMENSIONS = ["city", "star_rating", "year", "month", "weekend", "holiday"]
+# Criteria of rank_hotels, over distinct hotels: the column to score and whether lower values are
+# better (the price of a hotel is its average price per night over its bookings)
+HOTEL_RANKING_CRITERIA = {
+    "price": ("avg_price_per_night", True),
+    "guest_rating": ("guestreviewsrating", False),
+    "stars": ("starrating", False),
+    "center_distance": ("center1distance", True),
+}
+HOTEL_RANKING_WEIGHTS = {"price": 0.4, "guest_rating": 0.3, "stars": 0.15, "center_distance": 0.15}
+
+def get_hotels_snapshot() -> DatasetSnapshot:
+    """Get the shared snapshot of the hotels dataset, parsed once per process.
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the hotels dataset.
+    """
+    dataset_path = os.path.join(DATASET_DIR, HOTELS_FILENAME)
+    return get_dataset(dataset_path)
+
+def load_hotels() -> Sequence[dict]:
     """
     Load all hotel booking data.
     
     Returns:
-        list[dict]: List of hotel data as dictionaries.
+        Sequence[dict]: List of hotel data as dictionaries, joined from the star schema when accessed.
+    """
+    return get_hotel_star_schema().rows
+
+def get_hotels_table(snapshot: Optional[DatasetSnapshot] = None) -> ColumnarTable:
+    """
+    Get the typed columnar view of the hotel bookings, built once per snapshot over the star schema.
+
+    Args:
+        snapshot (Optional[DatasetSnapshot]): The hotels snapshot to get it for (default: the current one).
+
+    Returns:
+        ColumnarTable: The hotel bookings with prices, ratings and offers coerced once at load;
+        its rows are joined from the star schema when they are returned.
+    """
+    def build(snapshot: DatasetSnapshot) -> ColumnarTable:
+        schema = get_hotel_star_schema(snapshot)
+        return ColumnarTable(schema.rows, HOTELS_SCHEMA, schema.encoded(HOTELS_SCHEMA))
+
+    return (snapshot if snapshot is not None else get_hotels_snapshot()).derive("bookings", build)
+
+def get_hotel_bitmaps() -> dict[str, BitmapIndex]:
+    """
+    Get the bitmap indexes of the boolean and categorical hotel columns, built once per snapshot.
+
+    Returns:
+        dict[str, BitmapIndex]: The bitmap index of every column in HOTELS_BITMAP_COLUMNS.
+    """
+    table = get_hotels_table()
+    return {name: table.bitmap(name) for name in HOTELS_BITMAP_COLUMNS}
+
+def get_hotel_price_index() -> SortedIndex:
+    """
+    Get the hotel ids sorted by price, built once per snapshot.
+
+    Returns:
+        SortedIndex: The sorted index of the price column.
+    """
+    return get_hotels_table().sorted("price")
+
+def build_hotel_city_stats(snapshot: DatasetSnapshot) -> GroupStats:
+    """
+    Build the statistics of every hotel city in one grouped pass over the bookings.
+    
+    Figures about hotels rather than bookings (hotel counts, accommodation types, star and guest
+    ratings, hotels with an offer) are counted once per hotel, on its first booking; bookings with
+    an offer are counted per booking.
+
+    Args:
+        snapshot (DatasetSnapshot): The hotels snapshot to build them from.
+
+    Returns:
+        GroupStats: Booking and hotel counts, counts of bookings and of hotels with an offer,
+        accommodation type and star rating histograms of the hotels, and booking price and hotel
+        guest rating summaries with quantile sketches (positive values only) by city code.
+    """
+    schema = get_hotel_star_schema(snapshot)
+    table = get_hotels_table(snapshot)
+    first = np.zeros(len(table), dtype=bool)
+    first[schema.first_facts] = True
+    with_offer = np.bincount(schema.fact_keys, weights=table.values("offer") == 1, minlength=len(schema.dimension)) > 0
+    stars = table.values("starrating")
+    rated = first & (stars > 0)
+    star_values = np.unique(stars[rated])
+    star_codes = np.full(len(stars), -1, dtype=np.int64)
+    star_codes[rated] = np.searchsorted(star_values, stars[rated])
+    return GroupStats(
+        table.codes("city_actual"),
+        len(table.categories("city_actual")),
+        summaries={
+            "price_stats": positive(table.values("price")),
+            "guest_rating_stats": np.where(first, positive(table.values("guestreviewsrating")), np.nan),
+        },
+        counts={
+            "hotels": first,
+            "bookings_with_offers": table.values("offer") == 1,
+            "hotels_with_offers": first & with_offer[schema.fact_keys],
+        },
+        histograms={
+            "accommodation_types": (np.where(first, table.codes("accommodationtype"), -1), table.categories("accommodationtype")),
+            "star_rating_distribution": (star_codes, star_values.tolist()),
+        },
+    )
+
+def get_hotel_city_stats() -> GroupStats:
+    """
+    Get the materialized statistics of every hotel city, rebuilt when the dataset reloads.
+
+    Returns:
+        GroupStats: The statistics by city code.
+    """
+    return get_hotels_snapshot().derive("city_stats", build_hotel_city_stats)
+
+def build_hotel_star_schema(snapshot: DatasetSnapshot) -> StarSchema:
+    """
+    Split the hotel bookings into a hotel dimension table and a booking fact table.
+
+    Built from the dictionary-encoded columns of the snapshot, so the denormalized booking rows
+    are never materialized.
+
+    Args:
+        snapshot (DatasetSnapshot): The hotels snapshot to split.
+
+    Returns:
+        StarSchema: The hotels, keyed by hotel_id, and the price, stay length, offer and date of every booking.
+    """
+    columns = snapshot.columns
+    if columns is None:
+        # Binary snapshots are disabled: the registry keeps the parsed rows, encode them here
+        names = [k for k in (snapshot.rows[0] if snapshot.rows else {}) if isinstance(k, str)]
+        columns = encode_columns(snapshot.rows, names)
+    return StarSchema(columns, "hotel_id", HOTEL_DIMENSION_ATTRIBUTES, HOTEL_DIMENSION_SCHEMA, HOTEL_FACT_MEASURES)
+
+def get_hotel_star_schema(snapshot: Optional[DatasetSnapshot] = None) -> StarSchema:
+    """
+    Get the star schema of the hotel bookings, rebuilt when the dataset reloads.
+
+    Args:
+        snapshot (Optional[DatasetSnapshot]): The hotels snapshot to get it for (default: the current one).
+
+    Returns:
+        StarSchema: The hotel dimension and booking fact tables.
+    """
+    return (snapshot if snapshot is not None else get_hotels_snapshot()).derive("star_schema", build_hotel_star_schema)
+
+def get_hotel_prices_per_night() -> np.ndarray:
+    """
+    Get the average price per night of every hotel over its bookings, computed once per snapshot.
+
+    Returns:
+        np.ndarray: The average price per night by hotel (dimension id), NaN for a hotel without a priced booking.
     """
-    dataset_path = os.path.join(os.path.dirname(__file__), "dataset", HOTELS_FILENAME)
-    return load_dataset(dataset_path)
+    def build(snapshot: DatasetSnapshot) -> np.ndarray:
+        schema = get_hotel_star_schema(snapshot)
+        return schema.dimension_mean(positive(schema.facts["price"]) / schema.facts["price_night"])
+
+    return get_hotels_snapshot().derive("prices_per_night", build)
+
+def build_hotel_price_cube(snapshot: DatasetSnapshot) -> Cube:
+    """
+    Build the cube of booking prices per night over city, star rating, year, month, weekend and holiday.
+
+    Args:
+        snapshot (DatasetSnapshot): The hotels snapshot to build it from.
+
+    Returns:
+        Cube: The count, min, max and sum of the price per night in every combination.
+    """
+    schema = get_hotel_star_schema(snapshot)
+    hotels, facts, keys = schema.dimension, schema.facts, schema.fact_keys
+    return Cube(
+        {
+            "city": (hotels.codes("city_actual")[keys], hotels.categories("city_actual")),
+            # Half stars (e.g. 3.5) are ratings of their own
+            "star_rating": encode_numbers(hotels.values("starrating")[keys], float),
+            "year": encode_numbers(facts["year"]),
+            "month": encode_numbers(facts["month"]),
+            "weekend": encode_numbers(facts["weekend"], bool),
+            "holiday": encode_numbers(facts["holiday"], bool),
+        },
+        positive(facts["price"]) / facts["price_night"],
+    )
+
+def get_hotel_price_cube() -> Cube:
+    """
+    Get the price cube of the hotel bookings, rebuilt when the dataset reloads.
+
+    Returns:
+        Cube: The price per night cube.
+    """
+    return get_hotels_snapshot().derive("price_cube", build_hotel_price_cube)
+
+def _city_ids(table: ColumnarTable, city: str) -> np.ndarray:
+    """Ids of the rows (hotels or bookings) whose city contains the given name (case-insensitive)."""
+    return table.search("city_actual", city)
 
 def search_hotels_by_city(city: str, limit: int = 50) -> dict:
     """
@@ -24,15 +274,15 @@ def search_hotels_by_city(city: str, limit: int = 50) -> dict:
         limit (int): Maximum number of results to return.
         
     Returns:
-        dict: A dictionary containing the count of matches, the city searched, and a list of matching hotels.
+        dict: A dictionary containing the count of distinct hotels, the city searched, and a list of matching hotels
+        (one per hotel_id, with its number of bookings).
     """
-    city_lower = city.lower()
-    hotels = load_hotels()
-    matches = [h for h in hotels if city_lower in h.get("city_actual", "").lower()]
+    hotels = get_hotel_star_schema().dimension
+    ids = _city_ids(hotels, city)
     return {
-        "count": len(matches),
+        "count": len(ids),
         "city": city,
-        "hotels": matches[:limit]
+        "hotels": hotels.take(ids, limit)
     }
 
 def search_hotels_by_country(country: str, limit: int = 50) -> dict:
@@ -44,45 +294,38 @@ def search_hotels_by_country(country: str, limit: int = 50) -> dict:
         limit (int): Maximum number of results to return.
         
     Returns:
-        dict: A dictionary containing the count of matches, the country searched, and a list of matching hotels.
+        dict: A dictionary containing the count of distinct hotels, the country searched, and a list of matching hotels
+        (one per hotel_id, with its number of bookings).
     """
-    country_lower = country.lower()
-    hotels = load_hotels()
-    matches = [h for h in hotels if country_lower in h.get("addresscountryname", "").lower()]
+    hotels = get_hotel_star_schema().dimension
+    ids = hotels.search("addresscountryname", country)
     return {
-        "count": len(matches),
+        "count": len(ids),
         "country": country,
-        "hotels": matches[:limit]
+        "hotels": hotels.take(ids, limit)
     }
 
-def get_hotels_by_star_rating(star_rating: int, limit: int = 50) -> dict:
+def get_hotels_by_star_rating(star_rating: float, limit: int = 50) -> dict:
     """
     Get hotels filtered by star rating.
     
     Args:
-        star_rating (int): The star rating to filter by.
+        star_rating (float): The star rating to filter by, half stars included (e.g. 3.5).
         limit (int): Maximum number of results to return.
         
     Returns:
-        dict: A dictionary containing the count of matches, the star rating searched, and a list of matching hotels.
-    """
-    hotels = load_hotels()
-    matches = []
-    for h in hotels:
-        try:
-            rating = int(h.get("starrating", 0))
-            if rating == star_rating:
-                matches.append(h)
-        except (ValueError, TypeError):
-            continue
-    
+        dict: A dictionary containing the count of distinct hotels, the star rating searched, and a list of matching hotels
+        (one per hotel_id, with its number of bookings).
+    """
+    hotels = get_hotel_star_schema().dimension
+    ids = np.flatnonzero(hotels.values("starrating") == star_rating)
     return {
-        "count": len(matches),
+        "count": len(ids),
         "star_rating": star_rating,
-        "hotels": matches[:limit]
+        "hotels": hotels.take(ids, limit)
     }
 
-def get_hotels_by_price_range(min_price: float, max_price: float, limit: int = 50) -> dict:
+def get_hotels_by_price_range(min_price: float, max_price: float, limit: int = 50, sort: Optional[str] = None, offset: int = 0) -> dict:
     """
     Get hotels within a price range.
     
@@ -90,24 +333,21 @@ def get_hotels_by_price_range(min_price: float, max_price: float, limit: int = 5
         min_price (float): Minimum price.
         max_price (float): Maximum price.
         limit (int): Maximum number of results to return.
+        sort (Optional[str]): "asc" or "desc" to order the hotels by price (default: file order).
+        offset (int): Number of matching hotels to skip before the returned ones.
         
     Returns:
         dict: A dictionary containing the count of matches, the price range searched, and a list of matching hotels.
     """
-    hotels = load_hotels()
-    matches = []
-    for h in hotels:
-        try:
-            price = float(h.get("price", 0))
-            if min_price <= price <= max_price:
-                matches.append(h)
-        except (ValueError, TypeError):
-            continue
+    if sort is not None and sort not in SORT_ORDERS:
+        return {"error": f"Invalid sort order: {sort} (expected 'asc' or 'desc')"}
     
+    table = get_hotels_table()
+    ids = get_hotel_price_index().range(min_price, max_price, sort)
     return {
-        "count": len(matches),
+        "count": len(ids),
         "price_range": f"{min_price}-{max_price}",
-        "hotels": matches[:limit]
+        "hotels": table.take(ids, limit, offset)
     }
 
 def get_hotels_with_offers(offer_category: Optional[str] = None, limit: int = 50) -> dict:
@@ -121,122 +361,225 @@ def get_hotels_with_offers(offer_category: Optional[str] = None, limit: int = 50
     Returns:
         dict: A dictionary containing the count of matches, the offer category searched, and a list of matching hotels.
     """
-    hotels = load_hotels()
-    matches = []
+    table = get_hotels_table()
+    offers = table.bitmap("offer").bitmap(1.0)
     
-    for h in hotels:
-        offer = h.get("offer", "0")
-        offer_cat = h.get("offer_cat", "")
-        
-        # Check if hotel has an offer
-        try:
-            has_offer = int(offer) == 1
-        except (ValueError, TypeError):
-            has_offer = False
-        
-        if has_offer:
-            if offer_category:
-                if offer_category.lower() in offer_cat.lower():
-                    matches.append(h)
-            else:
-                matches.append(h)
+    if offer_category:
+        category_lower = offer_category.lower()
+        offers = offers & table.bitmap("offer_cat").where(lambda v: category_lower in v.lower())
     
+    ids = bitmap.to_ids(offers, len(table))
     return {
-        "count": len(matches),
+        "count": len(ids),
         "offer_category": offer_category or "all",
-        "hotels": matches[:limit]
+        "hotels": table.take(ids, limit)
     }
 
-def get_hotel_statistics_by_city(city: str) -> dict:
+def search_hotels(
+    city: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    star_rating: Optional[float] = None,
+    has_offer: Optional[bool] = None,
+    max_center_distance_km: Optional[float] = None,
+    min_guest_rating: Optional[float] = None,
+    limit: int = 50,
+    sort: Optional[str] = None,
+    offset: int = 0,
+) -> dict:
     """
-    Get statistics for hotels in a specific city.
+    Search hotels matching every given filter, evaluating the most selective index first.
     
     Args:
-        city (str): The city name to get statistics for.
+        city (Optional[str]): Part of the city name.
+        min_price (Optional[float]): Minimum price.
+        max_price (Optional[float]): Maximum price.
+        star_rating (Optional[float]): Exact star rating, half stars included (e.g. 3.5).
+        has_offer (Optional[bool]): Only hotels with (True) or without (False) an offer.
+        max_center_distance_km (Optional[float]): Maximum distance to the city centre, in km.
+        min_guest_rating (Optional[float]): Minimum guest review rating, out of 5.
+        limit (int): Maximum number of results to return.
+        sort (Optional[str]): "asc" or "desc" to order the hotels by price (default: file order).
+        offset (int): Number of matching hotels to skip before the returned ones.
         
     Returns:
-        dict: A dictionary containing various statistics about hotels in the specified city.
+        dict: A dictionary containing the count of matches, the query plan, and a list of matching hotels.
     """
-    city_lower = city.lower()
-    hotels = load_hotels()
-    city_hotels = [h for h in hotels if city_lower in h.get("city_actual", "").lower()]
+    if sort is not None and sort not in SORT_ORDERS:
+        return {"error": f"Invalid sort order: {sort} (expected 'asc' or 'desc')"}
     
-    if not city_hotels:
-        return {"error": f"No hotels found for city: {city}"}
+    table = get_hotels_table()
+    predicates = []
+    if city:
+        predicates.append(text_predicate(table, "city_actual", city))
+    if min_price is not None or max_price is not None:
+        predicates.append(range_predicate(table, "price", min_price, max_price))
+    if star_rating is not None:
+        predicates.append(value_predicate(table, "starrating", [float(star_rating)], f"starrating = {star_rating}"))
+    if has_offer is not None:
+        predicates.append(value_predicate(table, "offer", [1.0 if has_offer else 0.0], f"offer = {int(has_offer)}"))
+    if max_center_distance_km is not None:
+        predicates.append(range_predicate(table, "center1distance", high=max_center_distance_km / KM_PER_MILE))
+    if min_guest_rating is not None:
+        predicates.append(range_predicate(table, "guestreviewsrating", low=min_guest_rating))
     
-    # Calculate statistics
-    prices = []
-    star_ratings = []
-    guest_ratings = []
+    ids, plan = execute(predicates, len(table))
+    if sort:
+        ids = order_by(table, "price", ids, sort)
+    return {
+        "count": len(ids),
+        "plan": plan,
+        "hotels": table.take(ids, limit, offset)
+    }
+
+def rank_hotels(city: Optional[str] = None, weights: Optional[dict[str, float]] = None, k: int = 10) -> dict:
+    """
+    Rank distinct hotels by a weighted score of their price, ratings and distance.
     
-    for h in city_hotels:
-        try:
-            price = float(h.get("price", 0))
-            if price > 0:
-                prices.append(price)
-        except (ValueError, TypeError):
-            pass
-        
-        try:
-            star_rating = int(h.get("starrating", 0))
-            if star_rating > 0:
-                star_ratings.append(star_rating)
-        except (ValueError, TypeError):
-            pass
+    Every criterion is min-max normalized over the hotels of the city (1 being the best, a
+    missing value scoring 0) and the score is the weighted sum of the criteria, in [0, 1]. Hotels
+    are scored once each, on their average price per night over their bookings. Only the k best
+    hotels are selected and materialized.
+    
+    Args:
+        city (Optional[str]): Part of the city name (default: all cities).
+        weights (Optional[dict[str, float]]): Weight of every criterion of HOTEL_RANKING_CRITERIA
+            to use (default: HOTEL_RANKING_WEIGHTS).
+        k (int): Maximum number of results to return (at most MAX_RANKED).
         
-        try:
-            guest_rating_str = h.get("guestreviewsrating", "").replace(" /5", "")
-            guest_rating = float(guest_rating_str)
-            if guest_rating > 0:
-                guest_ratings.append(guest_rating)
-        except (ValueError, TypeError):
-            pass
+    Returns:
+        dict: A dictionary containing the count of ranked hotels, the weights used, and the k best hotels
+        (one per hotel_id) with their average price per night and score.
+    """
+    weights, error = check_weights(weights, HOTEL_RANKING_CRITERIA, HOTEL_RANKING_WEIGHTS)
+    if error:
+        return {"error": error}
     
-    # Count by accommodation type
-    accommodation_types = {}
-    for h in city_hotels:
-        acc_type = h.get("accommodationtype", "Unknown")
-        accommodation_types[acc_type] = accommodation_types.get(acc_type, 0) + 1
+    hotels = get_hotel_star_schema().dimension
+    prices = get_hotel_prices_per_night()
+    ids = _city_ids(hotels, city) if city else np.arange(len(hotels))
+    columns = {
+        name: (prices if column == "avg_price_per_night" else hotels.values(column))[ids]
+        for name, (column, _) in HOTEL_RANKING_CRITERIA.items() if name in weights
+    }
+    scores = weighted_scores(columns, HOTEL_RANKING_CRITERIA, weights)
+    best = top_k(scores, max(1, min(k, MAX_RANKED)))
+    return {
+        "count": len(ids),
+        "city": city or "all",
+        "weights": {name: round(w, 4) for name, w in weights.items()},
+        "hotels": [
+            {**row, "avg_price_per_night": None if np.isnan(prices[h]) else round(float(prices[h]), 2), "score": round(float(scores[i]), 4)}
+            for i, h, row in zip(best, ids[best], hotels.take(ids[best]))
+        ]
+    }
+
+def get_hotel_statistics_by_city(city: str) -> dict:
+    """
+    Get statistics for hotels in a specific city.
     
-    # Count offers
-    offers_count = sum(1 for h in city_hotels if h.get("offer", "0") == "1")
+    Args:
+        city (str): The city name to get statistics for.
+        
+    Returns:
+        dict: A dictionary containing various statistics about hotels in the specified city: distinct
+        hotels, their accommodation types, star and guest ratings and how many have offers, and the
+        number and prices of their bookings and how many have an offer.
+    """
+    # Cities whose name contains the query, merged from their precomputed statistics
+    cities = get_hotel_star_schema().dimension.matching("city_actual", city)
+    city_stats = get_hotel_city_stats()
+    total = city_stats.total(cities)
+    
+    if not total:
+        return {"error": f"No hotels found for city: {city}"}
     
     stats = {
         "city": city,
-        "total_hotels": len(city_hotels),
-        "accommodation_types": accommodation_types,
-        "hotels_with_offers": offers_count
+        "total_hotels": city_stats.count("hotels", cities),
+        "total_bookings": total,
+        "accommodation_types": city_stats.histogram("accommodation_types", cities),
+        "hotels_with_offers": city_stats.count("hotels_with_offers", cities),
+        "bookings_with_offers": city_stats.count("bookings_with_offers", cities),
     }
     
-    if prices:
-        stats["price_stats"] = {
-            "min": min(prices),
-            "max": max(prices),
-            "avg": sum(prices) / len(prices)
-        }
+    price_stats = city_stats.summary("price_stats", cities)
+    if price_stats:
+        stats["price_stats"] = price_stats
     
-    if star_ratings:
-        stats["star_rating_distribution"] = {}
-        for rating in star_ratings:
-            stats["star_rating_distribution"][rating] = stats["star_rating_distribution"].get(rating, 0) + 1
+    star_rating_distribution = city_stats.histogram("star_rating_distribution", cities)
+    if star_rating_distribution:
+        stats["star_rating_distribution"] = star_rating_distribution
     
-    if guest_ratings:
-        stats["guest_rating_stats"] = {
-            "min": min(guest_ratings),
-            "max": max(guest_ratings),
-            "avg": sum(guest_ratings) / len(guest_ratings)
-        }
+    guest_rating_stats = city_stats.summary("guest_rating_stats", cities)
+    if guest_rating_stats:
+        stats["guest_rating_stats"] = guest_rating_stats
     
     return stats
 
+def _price_summary(entry: dict) -> dict:
+    return {"min": round(entry["min"], 2), "avg": round(entry["avg"], 2), "max": round(entry["max"], 2)}
+
+def get_hotel_price_trends(
+    city: Optional[str] = None,
+    star_rating: Optional[float] = None,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    weekend: Optional[bool] = None,
+    holiday: Optional[bool] = None,
+    group_by: Optional[list[str]] = None,
+) -> dict:
+    """
+    Get hotel prices per night for any slice of city, star rating, year, month, weekend and holiday.
+    
+    Answered from the pre-aggregated price cube, without scanning the bookings.
+    
+    Args:
+        city (Optional[str]): Part of the city name (default: all cities).
+        star_rating (Optional[float]): Only hotels with this star rating, half stars included (e.g. 3.5).
+        year (Optional[int]): Only bookings of this year.
+        month (Optional[int]): Only bookings of this month (1-12).
+        weekend (Optional[bool]): Only weekend (True) or weekday (False) bookings.
+        holiday (Optional[bool]): Only bookings on (True) or off (False) holidays.
+        group_by (Optional[list[str]]): Dimensions of HOTEL_PRICE_CUBE_DIMENSIONS to break the
+            prices down by (default: month).
+        
+    Returns:
+        dict: A dictionary containing the filters, the number of bookings and their price per night (min, avg, max),
+        overall and per group.
+    """
+    group_by = ["month"] if group_by is None else list(group_by)
+    unknown = [name for name in group_by if name not in HOTEL_PRICE_CUBE_DIMENSIONS]
+    if unknown:
+        return {"error": f"Invalid group_by: {', '.join(unknown)} (expected any of {', '.join(HOTEL_PRICE_CUBE_DIMENSIONS)})"}
+    
+    given = {"star_rating": star_rating, "year": year, "month": month, "weekend": weekend, "holiday": holiday}
+    filters = {name: [value] for name, value in given.items() if value is not None}
+    if city:
+        hotels = get_hotel_star_schema().dimension
+        cities = hotels.matching("city_actual", city)
+        if not cities:
+            return {"error": f"No hotels found for city: {city}"}
+        filters["city"] = [hotels.categories("city_actual")[c] for c in cities]
+    
+    cube = get_hotel_price_cube()
+    overall = cube.rollup(filters)
+    return {
+        "city": city or "all",
+        "filters": {name: value for name, value in given.items() if value is not None},
+        "group_by": group_by,
+        "bookings": overall[0]["count"] if overall else 0,
+        "price_per_night": _price_summary(overall[0]) if overall else None,
+        "groups": [
+            {**{name: entry[name] for name in group_by}, "bookings": entry["count"], "price_per_night": _price_summary(entry)}
+            for entry in cube.rollup(filters, group_by)
+        ]
+    }
+
 def get_available_cities() -> dict:
     """Get list of all available cities in the hotel dataset."""
-    hotels = load_hotels()
-    cities = set()
-    for h in hotels:
-        city = h.get("city_actual", "").strip()
-        if city:
-            cities.add(city)
+    cities = {c.strip() for c in get_hotel_star_schema().dimension.categories("city_actual")}
+    cities.discard("")
     
     return {
         "count": len(cities),
@@ -245,12 +588,8 @@ def get_available_cities() -> dict:
 
 def get_available_countries() -> dict:
     """Get list of all available countries in the hotel dataset."""
-    hotels = load_hotels()
-    countries = set()
-    for h in hotels:
-        country = h.get("addresscountryname", "").strip()
-        if country:
-            countries.add(country)
+    countries = {c.strip() for c in get_hotel_star_schema().dimension.categories("addresscountryname")}
+    countries.discard("")
     
     return {
         "count": len(countries),
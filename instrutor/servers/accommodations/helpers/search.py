@@ -0,0 +1,147 @@
+from typing import Optional
+from servers.accommodations.helpers.airbnbs import AIRBNB_RANKING_CRITERIA, get_airbnb_city_stats, get_airbnbs_table, rank_airbnbs, search_airbnbs
+from servers.accommodations.helpers.hotels import HOTEL_RANKING_CRITERIA, get_hotel_city_stats, get_hotels_table, rank_hotels, search_hotels
+
+ACCOMMODATION_SOURCES = ("airbnbs", "hotels", "both")
+
+def search_accommodations(
+    source: str = "both",
+    city: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    room_type: Optional[str] = None,
+    superhost: Optional[bool] = None,
+    star_rating: Optional[float] = None,
+    has_offer: Optional[bool] = None,
+    max_center_distance_km: Optional[float] = None,
+    min_guest_rating: Optional[float] = None,
+    limit: int = 50,
+    sort: Optional[str] = None,
+    offset: int = 0,
+) -> dict:
+    """
+    Search Airbnbs and/or hotels matching every given filter.
+
+    Room type and superhost only exist for Airbnbs, star rating and offers only for hotels: with
+    source "both", a source that does not have one of the given filters is left out.
+
+    Args:
+        source (str): "airbnbs", "hotels" or "both".
+        city (Optional[str]): Part of the city name.
+        min_price (Optional[float]): Minimum price.
+        max_price (Optional[float]): Maximum price.
+        room_type (Optional[str]): Airbnb room type.
+        superhost (Optional[bool]): Only Airbnbs from (True) or not from (False) superhosts.
+        star_rating (Optional[float]): Exact hotel star rating, half stars included (e.g. 3.5).
+        has_offer (Optional[bool]): Only hotels with (True) or without (False) an offer.
+        max_center_distance_km (Optional[float]): Maximum distance to the city centre, in km.
+        min_guest_rating (Optional[float]): Minimum guest rating, out of 5 (Airbnb guest
+            satisfaction is out of 100 and is scaled accordingly).
+        limit (int): Maximum number of results to return per source.
+        sort (Optional[str]): "asc" or "desc" to order the results by price (default: file order).
+        offset (int): Number of matching results to skip per source.
+
+    Returns:
+        dict: The total count of matches and, per searched source, its count, query plan and matches.
+    """
+    if source not in ACCOMMODATION_SOURCES:
+        return {"error": f"Invalid source: {source} (expected 'airbnbs', 'hotels' or 'both')"}
+
+    airbnb_only = [name for name, value in (("room_type", room_type), ("superhost", superhost)) if value is not None]
+    hotel_only = [name for name, value in (("star_rating", star_rating), ("has_offer", has_offer)) if value is not None]
+    if source == "airbnbs" and hotel_only:
+        return {"error": f"Filters not available for Airbnbs: {', '.join(hotel_only)}"}
+    if source == "hotels" and airbnb_only:
+        return {"error": f"Filters not available for hotels: {', '.join(airbnb_only)}"}
+    if source == "both" and airbnb_only and hotel_only:
+        return {"error": f"No source has all the filters: {', '.join(airbnb_only + hotel_only)}"}
+
+    results = {}
+    if source in ("airbnbs", "both") and not hotel_only:
+        results["airbnbs"] = search_airbnbs(
+            city, min_price, max_price, room_type, superhost, max_center_distance_km,
+            None if min_guest_rating is None else min_guest_rating * 20, limit, sort, offset,
+        )
+    if source in ("hotels", "both") and not airbnb_only:
+        results["hotels"] = search_hotels(
+            city, min_price, max_price, star_rating, has_offer, max_center_distance_km,
+            min_guest_rating, limit, sort, offset,
+        )
+
+    for result in results.values():
+        if "error" in result:
+            return result
+    return {"count": sum(r["count"] for r in results.values()), **results}
+
+def rank_accommodations(city: Optional[str] = None, weights: Optional[dict[str, float]] = None, k: int = 10, source: str = "both") -> dict:
+    """
+    Rank Airbnbs and/or hotels by a weighted "best value" score, separately per source.
+
+    Airbnbs are scored on price, guest_rating, cleanliness, center_distance and metro_distance;
+    hotels on price, guest_rating, stars and center_distance. Each source uses the weights of its
+    own criteria: with source "both", a source without any positive weight is left out.
+
+    Args:
+        city (Optional[str]): Part of the city name (default: all cities).
+        weights (Optional[dict[str, float]]): Weight of every criterion to use (default: the
+            default weights of each source).
+        k (int): Number of results to return per source.
+        source (str): "airbnbs", "hotels" or "both".
+
+    Returns:
+        dict: Per ranked source, the count of ranked rows, the weights used and the k best rows with their score.
+    """
+    if source not in ACCOMMODATION_SOURCES:
+        return {"error": f"Invalid source: {source} (expected 'airbnbs', 'hotels' or 'both')"}
+
+    rankers = {"airbnbs": (rank_airbnbs, AIRBNB_RANKING_CRITERIA), "hotels": (rank_hotels, HOTEL_RANKING_CRITERIA)}
+    searched = [name for name in rankers if source in (name, "both")]
+    if weights is not None and source == "both":
+        unknown = [name for name in weights if all(name not in rankers[s][1] for s in searched)]
+        if unknown:
+            return {"error": f"Unknown ranking criteria: {', '.join(unknown)}"}
+
+    results = {}
+    for name in searched:
+        ranker, criteria = rankers[name]
+        source_weights = weights
+        if weights is not None and source == "both":
+            source_weights = {c: w for c, w in weights.items() if c in criteria}
+            if not any(w > 0 for w in source_weights.values()):
+                continue
+        result = ranker(city, source_weights, k)
+        if "error" in result:
+            return result
+        results[name] = result
+    if not results:
+        return {"error": "At least one ranking weight must be positive"}
+    return results
+
+def compare_city_prices(cities: list[str]) -> dict:
+    """
+    Compare the price distributions of Airbnbs and hotels across several cities.
+
+    Every city gets the min, max, average and p10/p50/p90 of its Airbnb and hotel prices, and
+    "combined" gives the same over all the cities together. Everything is merged from the
+    per-city statistics and quantile sketches, without scanning the listings.
+
+    Args:
+        cities (list[str]): The cities to compare (each matched as part of the city name).
+
+    Returns:
+        dict: Per city and combined, the Airbnb and hotel price statistics (None where there is no listing).
+    """
+    sources = {
+        "airbnbs": (get_airbnbs_table(), "City", get_airbnb_city_stats()),
+        "hotels": (get_hotels_table(), "city_actual", get_hotel_city_stats()),
+    }
+    result = {city: {} for city in cities}
+    combined = {}
+    for name, (table, column, city_stats) in sources.items():
+        matched: set[int] = set()
+        for city in cities:
+            codes = table.matching(column, city)
+            matched.update(codes)
+            result[city][name] = city_stats.summary("price_stats", codes)
+        combined[name] = city_stats.summary("price_stats", sorted(matched))
+    return {"count": len(cities), "cities": result, "combined": combined}
@@ -1,11 +1,17 @@
-import requests
 import asyncio
+import logging
 from dotenv import load_dotenv
+import httpx
 import os
 
-from tavily import TavilyClient
 from fastmcp import FastMCP
 
+from servers.city.helpers.attractions import ATTRACTIONS_CACHE, ATTRACTIONS_DISK_CACHE, describe_search_error, search_trending_attractions
+from servers.city.helpers.attractions import close_http_client as close_search_client
+from servers.city.helpers.geocoding import GEOCODE_CACHE, seed_from_airports
+from servers.city.helpers.timezones import find_time_zone, get_timezone_index
+from servers.city.helpers.weather import WEATHER_CACHE, close_http_client, describe_weather_error, get_city_weather, get_weather_for_cities
+
 load_dotenv()
 
 SERVER_NAME = "CityServer"
@@ -21,102 +27,97 @@ async def get_weather_data(city: str) -> dict:
         """
         This function is used when you need to retrieve weather information for a specified city.
         Uses OpenWeatherMap's Geocoding API to convert city name to coordinates,
-        then One Call API 3.0 to get weather data.
+        then One Call API 3.0 to get weather data, over a pooled async HTTP client.
 
         Args:
             city (str): The city name for which to retrieve weather data.
 
         Returns:
-            dict: A dictionary containing weather data like temperature and weather conditions.
+            dict: A dictionary containing weather data like temperature and weather conditions, or an error message.
+        """
+        try:
+            return await get_city_weather(city, WEATHER_API_KEY)
+        except Exception as error:
+            return {"error": describe_weather_error(error)}
+
+@CITY_SERVER.tool(
+    title="get_weather_for_cities"
+)
+async def get_weather_for_cities_tool(cities: list[str]) -> dict:
+        """
+        This function is used when you need weather information for several cities at once, e.g. every stop of a multi-city trip.
+        The cities are fetched concurrently; a city that cannot be resolved gets an error without failing the others.
+
+        Args:
+            cities (list[str]): The city names for which to retrieve weather data.
+
+        Returns:
+            dict: The weather data of each city, keyed by city name, and an error message for each city that failed.
+        """
+        return await get_weather_for_cities(cities, WEATHER_API_KEY)
+
+@CITY_SERVER.tool(
+    title="get_weather_cache_stats"
+)
+async def get_weather_cache_stats() -> dict:
         """
-        # Step 1: Get coordinates for the city using Geocoding API
-        geocode_url = "http://api.openweathermap.org/geo/1.0/direct"
-        geocode_params = {
-            "q": city,
-            "limit": 1,
-            "appid": WEATHER_API_KEY
-        }
-        geocode_response = requests.get(geocode_url, params=geocode_params)
-        geocode_response.raise_for_status()
-        geocode_data = geocode_response.json()
-        
-        if not geocode_data:
-            raise ValueError(f"City '{city}' not found")
-        
-        lat = geocode_data[0]['lat']
-        lon = geocode_data[0]['lon']
-        
-        # Step 2: Get weather data using One Call API 3.0
-        weather_url = "https://api.openweathermap.org/data/3.0/onecall"
-        weather_params = {
-            "lat": lat,
-            "lon": lon,
-            "appid": WEATHER_API_KEY,
-            "units": "metric",
-            "exclude": "minutely,hourly,daily,alerts"  # Only get current weather
-        }
-        weather_response = requests.get(weather_url, params=weather_params)
-        weather_response.raise_for_status()
-        weather_data = weather_response.json()
-        
-        current = weather_data['current']
-        return {
-            "temperature": current['temp'],
-            "temperature_feels_like": current['feels_like'],
-            "temperature_min": current['temp'],  # Current API doesn't have min/max for current
-            "temperature_max": current['temp'],  # Current API doesn't have min/max for current
-            "main_condition": current['weather'][0]['main'],
-            "condition_description": current['weather'][0]['description'],
-        }
-
-# @CITY_SERVER.tool(
-#     title="get_trending_attractions"
-# )      
-# async def get_trending_attractions(city: str) -> dict:
-#         """
-#         This function is used when you need to retrieve trending attractions in a city.
-
-#         Args:
-#             city (str): The city name for which to retrieve trending attractions.
-
-#         Returns:
-#             dict: A dictionary containing trending attractions in the city.
-#         """
-        
-#         client = TavilyClient(api_key=TAVILY_API_KEY)
-#         response = client.search(
-#             query=f"{city} trending attractions",
-#             max_results=5,
-#         )
-        
-#         return response
-
-# @CITY_SERVER.tool(
-#     title="get_time_zone"
-# )
-# async def get_time_zone(city: str) -> dict:
-#     """
-#     This function retrieves the time zone information for a specified city using Tavily's search API.
-
-#     Args:
-#         city (str): The city name for which to retrieve time zone information.
-
-#     Returns:
-#         dict: A dictionary containing time zone information for the city.
-#     """
-    
-#     client = TavilyClient(api_key=TAVILY_API_KEY)
-#     response = client.search(
-#         query=f"{city} time zone",
-#         max_results=1,
-#     )
-    
-#     return response
+        This function returns the hit and miss counters of the weather and attractions caches and the size of the geocode cache.
+
+        Returns:
+            dict: The counters and sizes of the caches.
+        """
+        return {"weather": WEATHER_CACHE.stats(), "geocode": GEOCODE_CACHE.stats(), "attractions": ATTRACTIONS_CACHE.stats()}
+
+@CITY_SERVER.tool(
+    title="get_trending_attractions"
+)
+async def get_trending_attractions(city: str, max_results: int = 5) -> dict:
+        """
+        This function is used when you need to retrieve trending attractions in a city.
+        Results of the web search are cached for a day.
+
+        Args:
+            city (str): The city name for which to retrieve trending attractions.
+            max_results (int): The number of results to return (default: 5, at most 10).
+
+        Returns:
+            dict: A dictionary containing trending attractions in the city, or an error message.
+        """
+        try:
+            return await search_trending_attractions(city, TAVILY_API_KEY, max_results)
+        except (httpx.HTTPError, ValueError) as error:
+            return {"error": describe_search_error(error)}
+
+@CITY_SERVER.tool(
+    title="get_time_zone"
+)
+async def get_time_zone(city: str) -> dict:
+    """
+    This function retrieves the time zone, current local time and UTC offset of a specified city.
+    It is answered offline from the time zones of the airports dataset, without any web search.
+
+    Args:
+        city (str): The city name, optionally followed by its country (e.g. "Porto, Portugal").
+
+    Returns:
+        dict: A dictionary containing time zone information for the city.
+    """
+    time_zone = find_time_zone(city)
+    return time_zone if time_zone else {"error": f"No time zone found for city {city}"}
 
 
 async def main():
+    logging.basicConfig(level=logging.INFO)
+    seed_from_airports()
+    get_timezone_index()
     # Use run_async() in async contexts
-    await CITY_SERVER.run_async(transport="http", host="0.0.0.0", port=8004, path="/city_server", log_level="debug")
+    try:
+        await CITY_SERVER.run_async(transport="http", host="0.0.0.0", port=8004, path="/city_server", log_level="debug")
+    finally:
+        await close_http_client()
+        await close_search_client()
+        GEOCODE_CACHE.close()
+        ATTRACTIONS_DISK_CACHE.close()
 
 if __name__ == "__main__":
     # mcp.run(transport="sse", host="0.0.0.0", port=8010, path="/category_server", log_level="debug")
@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from servers.city.helpers.geocoding import normalize_city
+from servers.flights.helpers.airports import get_airports_snapshot
+from servers.flights.helpers.countries import load_countries
+from utils.registry import DatasetSnapshot
+
+SCHEMA_AIRPORT_CITIES = {"city": str, "country": str, "latitude": float, "longitude": float, "tz_database": str}
+
+@dataclass(frozen=True)
+class AirportCityIndex:
+    """
+    The airports of airports.dat grouped by the city they serve.
+
+    Every named (city, country) pair is a group, whatever the spelling of the city. `groups` holds the group of every airport (-1 for
+    an airport without a city name) and `sizes` the number of airports of every group. `queries`
+    maps every city query to its group: "city, country", "city, ISO code" and the bare city name,
+    which goes to the country with the most airports of that name, usually the one people mean
+    ("Paris" is in France). Queries are normalized with `normalize_city`.
+    """
+    groups: np.ndarray
+    sizes: np.ndarray
+    queries: dict[str, int]
+
+def build_airport_city_index(snapshot: DatasetSnapshot) -> AirportCityIndex:
+    """
+    Build the city to airports index of a snapshot of the airports dataset.
+
+    Args:
+        snapshot (DatasetSnapshot): The airports snapshot.
+
+    Returns:
+        AirportCityIndex: The airports grouped by city, and the group of every city query.
+    """
+    table = snapshot.table(SCHEMA_AIRPORT_CITIES)
+    country_names = table.categories("country")
+    # Spellings of a city that only differ in case, accents or spacing are the same city
+    spellings: dict[str, int] = {}
+    normalized = np.array([spellings.setdefault(normalize_city(c), len(spellings)) for c in table.categories("city")], dtype=np.int64)
+    city_names = list(spellings)
+    cities, countries = normalized[table.codes("city")] if len(normalized) else table.codes("city"), table.codes("country")
+    named = np.array([bool(c) for c in city_names], dtype=bool)
+    valid = named[cities] if len(cities) else np.zeros(0, dtype=bool)
+
+    n_countries = max(1, len(country_names))
+    pairs = cities.astype(np.int64) * n_countries + countries
+    keys, inverse, sizes = np.unique(pairs[valid], return_inverse=True, return_counts=True)
+    groups = np.full(len(pairs), -1, dtype=np.int64)
+    groups[valid] = inverse
+
+    iso_codes = {c.get("name", "").lower(): c.get("iso_name", "") for c in load_countries()}
+    queries: dict[str, int] = {}
+    largest: dict[int, int] = {}
+    for group, key in enumerate(keys.tolist()):
+        city, country = divmod(key, n_countries)
+        name, country_name = city_names[city], country_names[country]
+        queries[normalize_city(f"{name}, {country_name}")] = group
+        iso = iso_codes.get(country_name.lower())
+        if iso:
+            queries[normalize_city(f"{name}, {iso}")] = group
+        if city not in largest or sizes[group] > sizes[largest[city]]:
+            largest[city] = group
+    for city, group in largest.items():
+        queries.setdefault(city_names[city], group)
+    return AirportCityIndex(groups, sizes, queries)
+
+def get_airport_city_index(snapshot: Optional[DatasetSnapshot] = None) -> AirportCityIndex:
+    """
+    Get the city to airports index, built once per snapshot of the airports dataset.
+
+    Args:
+        snapshot (Optional[DatasetSnapshot]): The airports snapshot to get it for (default: the current one).
+
+    Returns:
+        AirportCityIndex: The airports grouped by city, and the group of every city query.
+    """
+    return (snapshot if snapshot is not None else get_airports_snapshot()).derive("city_airports", build_airport_city_index)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+import httpx
+from servers.city.helpers.geocoding import CACHE_DIR, normalize_city
+from utils.async_cache import AsyncTTLCache
+
+TAVILY_API_BASE_URL = os.getenv("TAVILY_API_BASE_URL", "https://api.tavily.com")
+SEARCH_PATH = "/search"
+# Searches take a few seconds upstream; the pool keeps connections alive between tool calls
+TAVILY_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+TAVILY_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+ATTRACTIONS_CACHE_PATH = os.getenv("ATTRACTIONS_CACHE_PATH", os.path.join(CACHE_DIR, "attractions.sqlite3"))
+# Trending attractions change slowly: search results are reused for a day
+ATTRACTIONS_TTL = float(os.getenv("ATTRACTIONS_TTL", 24 * 3600))
+MAX_ATTRACTIONS = 10
+
+class SearchResultCache:
+    """
+    Disk-backed cache of search responses with a TTL, kept in a SQLite database.
+
+    Responses are stored as JSON under the normalized query, so they survive restarts of the
+    server; expired ones are ignored and overwritten by the next search.
+    """
+
+    def __init__(self, path: str, ttl: float = ATTRACTIONS_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS search (key TEXT PRIMARY KEY, response TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[dict]:
+        """Get the stored response of a query, or None if it is missing or expired."""
+        with self._lock:
+            row = self._connect().execute("SELECT response, stored_at FROM search WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] + self.ttl <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, response: dict) -> None:
+        """Store the response of a query."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO search (key, response, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(response), time.time()),
+            )
+            connection.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+ATTRACTIONS_DISK_CACHE = SearchResultCache(ATTRACTIONS_CACHE_PATH)
+# In front of the disk cache: concurrent identical searches share one request
+ATTRACTIONS_CACHE = AsyncTTLCache(ttl=ATTRACTIONS_TTL, max_entries=256)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client of the Tavily API, created on first use.
+
+    The client (and its connection pool) belongs to the event loop it was created on, so a new
+    one is created if it is requested from a different loop.
+
+    Returns:
+        httpx.AsyncClient: The pooled client.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(base_url=TAVILY_API_BASE_URL, timeout=TAVILY_TIMEOUT, limits=TAVILY_LIMITS)
+        _client_loop = loop
+    return _client
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+async def search_web(query: str, api_key: Optional[str], max_results: int) -> dict:
+    """
+    Search the web with the Tavily search API, over the pooled client.
+
+    Args:
+        query (str): The search query.
+        api_key (Optional[str]): The Tavily API key, sent with this request only.
+        max_results (int): How many results to return.
+
+    Returns:
+        dict: The Tavily search response.
+    """
+    # Without a key the request goes unauthenticated rather than with "Bearer None"
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    response = await get_http_client().post(SEARCH_PATH, json={"query": query, "max_results": max_results}, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+def describe_search_error(error: Exception) -> str:
+    """
+    Describe why a web search failed, as a message fit for a tool result.
+
+    Args:
+        error (Exception): The exception raised by the search.
+
+    Returns:
+        str: The error message.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        # Not str(error): the request it describes carries the API key
+        return f"Search service returned HTTP {error.response.status_code}"
+    if isinstance(error, httpx.HTTPError):
+        return f"Search service unavailable ({type(error).__name__})"
+    return "Unexpected response from the search service"
+
+async def search_trending_attractions(city: str, api_key: Optional[str], max_results: int = 5) -> dict:
+    """
+    Search the web for trending attractions in a city, through the memory and disk caches.
+
+    Args:
+        city (str): The city name.
+        api_key (Optional[str]): The Tavily API key.
+        max_results (int): How many results to return (at most MAX_ATTRACTIONS).
+
+    Returns:
+        dict: The Tavily search response.
+    """
+    max_results = max(1, min(max_results, MAX_ATTRACTIONS))
+    key = f"{normalize_city(city)}|{max_results}"
+
+    async def fetch() -> dict:
+        response = ATTRACTIONS_DISK_CACHE.get(key)
+        if response is None:
+            response = await search_web(f"{city} trending attractions", api_key, max_results)
+            ATTRACTIONS_DISK_CACHE.put(key, response)
+        return response
+
+    return await ATTRACTIONS_CACHE.get(key, fetch)
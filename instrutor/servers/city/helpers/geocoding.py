@@ -0,0 +1,210 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections.abc import Iterable
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache")
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", os.path.join(CACHE_DIR, "geocode.sqlite3"))
+# How long a "city not found" answer is trusted before the API is asked again (0 disables them)
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", 24 * 3600))
+
+SOURCE_AIRPORTS = "airports"
+SOURCE_API = "api"
+
+def normalize_city(city: str) -> str:
+    """
+    Normalize a city query into a cache key: case, accents, spacing and comma spacing are ignored.
+
+    Args:
+        city (str): The city, optionally followed by its country ("Lisbon, Portugal", "Lisbon,PT").
+
+    Returns:
+        str: The cache key.
+    """
+    text = unicodedata.normalize("NFKD", city.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    return ", ".join(part for part in parts if part)
+
+class GeocodeCache:
+    """
+    Disk-backed cache of city coordinates, kept in a SQLite database.
+
+    Entries are keyed by `normalize_city`. Coordinates never expire; "not found" answers are
+    stored with an expiry time so a misspelt city does not hit the API on every call. The cache
+    can be pre-seeded offline (see `seed_from_airports`); seeded entries are replaced by answers
+    of the API and refreshed when the seed source changes.
+    """
+
+    def __init__(self, path: str, negative_ttl: float = GEOCODE_NEGATIVE_TTL):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "key TEXT PRIMARY KEY, lat REAL, lon REAL, source TEXT NOT NULL, expires_at REAL)"
+            )
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def lookup(self, city: str) -> Optional[tuple[Optional[float], Optional[float]]]:
+        """
+        Look a city up.
+
+        Args:
+            city (str): The city query.
+
+        Returns:
+            Optional[tuple[Optional[float], Optional[float]]]: None on a cache miss, (None, None)
+            for a cached "not found" answer, else the latitude and longitude.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT lat, lon, expires_at FROM geocode WHERE key = ?", (normalize_city(city),)
+            ).fetchone()
+        if row is None:
+            return None
+        lat, lon, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return lat, lon
+
+    def store(self, city: str, lat: float, lon: float) -> None:
+        """Store the coordinates the API returned for a city."""
+        self._write(normalize_city(city), lat, lon, None)
+
+    def store_missing(self, city: str) -> None:
+        """Remember, for `negative_ttl` seconds, that the API does not know a city."""
+        if self.negative_ttl > 0:
+            self._write(normalize_city(city), None, None, time.time() + self.negative_ttl)
+
+    def _write(self, key: str, lat: Optional[float], lon: Optional[float], expires_at: Optional[float]) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO geocode (key, lat, lon, source, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, lat, lon, SOURCE_API, expires_at),
+            )
+            connection.commit()
+
+    def seed_version(self) -> Optional[str]:
+        """Get the version of the source the cache was last seeded from, if any."""
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE key = 'seed_version'").fetchone()
+        return row[0] if row else None
+
+    def seed(self, entries: Iterable[tuple[str, float, float]], version: str) -> int:
+        """
+        Replace the seeded entries with offline coordinates.
+
+        Entries never replace answers of the API.
+
+        Args:
+            entries (Iterable[tuple[str, float, float]]): City queries with their coordinates.
+            version (str): Identifies the seed source (e.g. the hash of its file).
+
+        Returns:
+            int: How many entries were given.
+        """
+        with self._lock:
+            connection = self._connect()
+            rows = [(normalize_city(city), lat, lon, SOURCE_AIRPORTS) for city, lat, lon in entries]
+            with connection:
+                connection.execute("DELETE FROM geocode WHERE source = ?", (SOURCE_AIRPORTS,))
+                connection.executemany(
+                    "INSERT OR IGNORE INTO geocode (key, lat, lon, source, expires_at) VALUES (?, ?, ?, ?, NULL)", rows
+                )
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seed_version', ?)", (version,))
+            return len(rows)
+
+    def stats(self) -> dict:
+        """Count the cached entries by source, and the cached "not found" answers."""
+        with self._lock:
+            connection = self._connect()
+            counts = dict(connection.execute("SELECT source, COUNT(*) FROM geocode WHERE lat IS NOT NULL GROUP BY source").fetchall())
+            missing = connection.execute("SELECT COUNT(*) FROM geocode WHERE lat IS NULL").fetchone()[0]
+        return {"seeded": counts.get(SOURCE_AIRPORTS, 0), "from_api": counts.get(SOURCE_API, 0), "not_found": missing}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+GEOCODE_CACHE = GeocodeCache(GEOCODE_CACHE_PATH)
+
+def _group_median(groups: np.ndarray, values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Median of the values of every group (groups numbered 0..n-1, with the given sizes)."""
+    ordered = values[np.lexsort((values, groups))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return (ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]) / 2
+
+def airport_city_coordinates() -> list[tuple[str, float, float]]:
+    """
+    Derive city coordinates from the airports dataset.
+
+    Every city query of the airport city index (see `servers.city.helpers.airport_cities`) gets
+    the median position of the airports of its city, robust to the odd far-away airfield filed
+    under a big city.
+
+    Returns:
+        list[tuple[str, float, float]]: City queries with their latitude and longitude.
+    """
+    # Imported here: the city server only needs the flights datasets to seed the cache
+    from servers.city.helpers.airport_cities import SCHEMA_AIRPORT_CITIES, get_airport_city_index
+    from servers.flights.helpers.airports import get_airports_snapshot
+
+    snapshot = get_airports_snapshot()
+    index = get_airport_city_index(snapshot)
+    table = snapshot.table(SCHEMA_AIRPORT_CITIES)
+    lat, lon = table.values("latitude"), table.values("longitude")
+    located = (index.groups >= 0) & ~(np.isnan(lat) | np.isnan(lon))
+    groups, inverse, counts = np.unique(index.groups[located], return_inverse=True, return_counts=True)
+    center_lat = _group_median(inverse, lat[located], counts)
+    center_lon = _group_median(inverse, lon[located], counts)
+
+    positions = {group: i for i, group in enumerate(groups.tolist())}
+    entries = []
+    for query, group in index.queries.items():
+        i = positions.get(group)
+        if i is not None:
+            entries.append((query, center_lat[i], center_lon[i]))
+    return entries
+
+def seed_from_airports(cache: GeocodeCache = GEOCODE_CACHE) -> int:
+    """
+    Pre-seed the geocode cache from `servers/flights/dataset/airports.dat`, if it changed.
+
+    Args:
+        cache (GeocodeCache): The cache to seed.
+
+    Returns:
+        int: How many entries were written (0 if the cache was already up to date).
+    """
+    from servers.flights.helpers.airports import get_airports_snapshot
+    from utils.snapshot import file_hash
+
+    version = file_hash(get_airports_snapshot().path)
+    if cache.seed_version() == version:
+        return 0
+    written = cache.seed(airport_city_coordinates(), version)
+    logger.info("Seeded the geocode cache with %d cities from the airports dataset", written)
+    return written
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+from servers.city.helpers.airport_cities import SCHEMA_AIRPORT_CITIES, get_airport_city_index
+from servers.city.helpers.geocoding import normalize_city
+from servers.flights.helpers.airports import get_airports_snapshot
+from utils.registry import DatasetSnapshot
+
+def build_timezone_index(snapshot: DatasetSnapshot) -> dict[str, str]:
+    """
+    Build the city to IANA time zone index from the tz_database column of airports.dat.
+
+    Every city query of the airport city index (see `servers.city.helpers.airport_cities`) gets
+    the time zone most of the airports of its city are in.
+
+    Args:
+        snapshot (DatasetSnapshot): The airports snapshot.
+
+    Returns:
+        dict[str, str]: IANA time zone names by normalized city query.
+    """
+    index = get_airport_city_index(snapshot)
+    table = snapshot.table(SCHEMA_AIRPORT_CITIES)
+    zones, zone_names = table.codes("tz_database"), table.categories("tz_database")
+    known = np.array([z.strip() not in ("", "\\N") for z in zone_names], dtype=bool)
+    valid = (index.groups >= 0) & known[zones] if len(zones) else np.zeros(0, dtype=bool)
+
+    # Count the airports of every (city, zone) pair; the most common zone wins
+    n_zones = max(1, len(zone_names))
+    keys, counts = np.unique(index.groups[valid] * n_zones + zones[valid], return_counts=True)
+    best: dict[int, tuple[int, int]] = {}
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        group, zone = divmod(key, n_zones)
+        if group not in best or count > best[group][1]:
+            best[group] = (zone, count)
+    return {query: zone_names[best[group][0]] for query, group in index.queries.items() if group in best}
+
+def get_timezone_index() -> dict[str, str]:
+    """
+    Get the city to time zone index, built once per snapshot of the airports dataset.
+
+    Returns:
+        dict[str, str]: IANA time zone names by normalized city query.
+    """
+    return get_airports_snapshot().derive("timezones", build_timezone_index)
+
+def find_time_zone(city: str, now: Optional[datetime] = None) -> Optional[dict]:
+    """
+    Find the time zone of a city and its current local time, without any network call.
+
+    Args:
+        city (str): The city, optionally followed by its country ("Porto, Portugal", "Porto,PT").
+        now (Optional[datetime]): The instant to convert (default: now).
+
+    Returns:
+        Optional[dict]: The IANA time zone, local time, UTC offset and DST flag, or None if the
+        city is not known.
+    """
+    zone_name = get_timezone_index().get(normalize_city(city))
+    if zone_name is None:
+        return None
+    try:
+        zone = ZoneInfo(zone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+    local = (now or datetime.now(timezone.utc)).astimezone(zone)
+    offset = local.utcoffset()
+    minutes = int(offset.total_seconds() // 60)
+    sign = "+" if minutes >= 0 else "-"
+    return {
+        "city": city,
+        "time_zone": zone_name,
+        "abbreviation": local.tzname(),
+        "local_time": local.isoformat(timespec="seconds"),
+        "utc_offset": f"{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}",
+        "dst": bool(local.dst()),
+    }
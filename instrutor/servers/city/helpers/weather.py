@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+from typing import Optional
+import httpx
+from servers.city.helpers.geocoding import GEOCODE_CACHE
+from utils.async_cache import AsyncTTLCache
+
+WEATHER_API_BASE_URL = os.getenv("WEATHER_API_BASE_URL", "https://api.openweathermap.org")
+GEOCODE_PATH = "/geo/1.0/direct"
+ONECALL_PATH = "/data/3.0/onecall"
+
+# Every call gets 10 seconds overall and 5 to connect; the pool keeps connections alive between
+# tool calls so only the first request to the API pays for the TCP/TLS handshake
+WEATHER_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+WEATHER_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+# Current conditions are reused for WEATHER_CACHE_TTL seconds per location (coordinates rounded
+# to about 1 km), then served stale for WEATHER_CACHE_STALE more seconds while they are refreshed
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", 600))
+WEATHER_CACHE_STALE = float(os.getenv("WEATHER_CACHE_STALE", 3600))
+WEATHER_CACHE = AsyncTTLCache(ttl=WEATHER_CACHE_TTL, stale_ttl=WEATHER_CACHE_STALE)
+
+# How many cities a batch request resolves at once
+WEATHER_BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", 8))
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client of the weather API, created on first use.
+
+    The client (and its connection pool) belongs to the event loop it was created on, so a new
+    one is created if it is requested from a different loop.
+
+    Returns:
+        httpx.AsyncClient: The pooled client.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(base_url=WEATHER_API_BASE_URL, timeout=WEATHER_TIMEOUT, limits=WEATHER_LIMITS)
+        _client_loop = loop
+    return _client
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+async def geocode_city(city: str, api_key: Optional[str]) -> tuple[float, float]:
+    """
+    Get the coordinates of a city with OpenWeatherMap's Geocoding API.
+
+    Args:
+        city (str): The city name.
+        api_key (Optional[str]): The OpenWeatherMap API key.
+
+    Returns:
+        tuple[float, float]: The latitude and longitude of the city.
+    """
+    response = await get_http_client().get(GEOCODE_PATH, params={"q": city, "limit": 1, "appid": api_key})
+    response.raise_for_status()
+    geocode_data = response.json()
+    if not geocode_data:
+        raise ValueError(f"City '{city}' not found")
+    return geocode_data[0]['lat'], geocode_data[0]['lon']
+
+async def cached_current_weather(lat: float, lon: float, api_key: Optional[str]) -> dict:
+    """
+    Get the current weather at some coordinates through the weather cache.
+
+    Concurrent requests for the same location share one upstream call, and stale conditions are
+    returned at once while they are refreshed in the background.
+
+    Args:
+        lat (float): The latitude.
+        lon (float): The longitude.
+        api_key (Optional[str]): The OpenWeatherMap API key.
+
+    Returns:
+        dict: The temperature and weather conditions.
+    """
+    key = (round(lat, 2), round(lon, 2))
+    return await WEATHER_CACHE.get(key, lambda: fetch_current_weather(lat, lon, api_key))
+
+async def fetch_current_weather(lat: float, lon: float, api_key: Optional[str]) -> dict:
+    """
+    Get the current weather at some coordinates with OpenWeatherMap's One Call API 3.0.
+
+    Args:
+        lat (float): The latitude.
+        lon (float): The longitude.
+        api_key (Optional[str]): The OpenWeatherMap API key.
+
+    Returns:
+        dict: The temperature and weather conditions.
+    """
+    params = {
+        "lat": lat,
+        "lon": lon,
+        "appid": api_key,
+        "units": "metric",
+        "exclude": "minutely,hourly,daily,alerts"  # Only get current weather
+    }
+    response = await get_http_client().get(ONECALL_PATH, params=params)
+    response.raise_for_status()
+    current = response.json()['current']
+    return {
+        "temperature": current['temp'],
+        "temperature_feels_like": current['feels_like'],
+        "temperature_min": current['temp'],  # Current API doesn't have min/max for current
+        "temperature_max": current['temp'],  # Current API doesn't have min/max for current
+        "main_condition": current['weather'][0]['main'],
+        "condition_description": current['weather'][0]['description'],
+    }
+
+async def get_city_weather(city: str, api_key: Optional[str]) -> dict:
+    """
+    Get the current weather of a city: geocode it, then query the One Call API.
+
+    Coordinates come from the geocode cache when possible and current conditions from the
+    weather cache, so most cities take at most a single request.
+
+    Args:
+        city (str): The city name.
+        api_key (Optional[str]): The OpenWeatherMap API key.
+
+    Returns:
+        dict: The temperature and weather conditions.
+    """
+    cached = GEOCODE_CACHE.lookup(city)
+    if cached is None:
+        try:
+            lat, lon = await geocode_city(city, api_key)
+        except ValueError:
+            GEOCODE_CACHE.store_missing(city)
+            raise
+        GEOCODE_CACHE.store(city, lat, lon)
+    elif cached[0] is None:
+        raise ValueError(f"City '{city}' not found")
+    else:
+        lat, lon = cached
+    return await cached_current_weather(lat, lon, api_key)
+
+def describe_weather_error(error: Exception) -> str:
+    """
+    Describe why a weather lookup failed, as a message fit for a tool result.
+
+    Args:
+        error (Exception): The exception raised by the lookup.
+
+    Returns:
+        str: The error message.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        # Not str(error): the request URL in it carries the API key
+        return f"Weather service returned HTTP {error.response.status_code}"
+    if isinstance(error, httpx.HTTPError):
+        return f"Weather service unavailable ({type(error).__name__})"
+    if isinstance(error, (KeyError, IndexError, TypeError, json.JSONDecodeError)):
+        return "Unexpected response from the weather service"
+    if isinstance(error, ValueError):
+        return str(error)
+    return f"Weather lookup failed ({type(error).__name__})"
+
+async def get_weather_for_cities(cities: list[str], api_key: Optional[str], concurrency: int = WEATHER_BATCH_CONCURRENCY) -> dict:
+    """
+    Get the current weather of several cities concurrently, at most `concurrency` at a time.
+
+    A city that fails (unknown, upstream error, timeout, malformed response) gets an error
+    message instead of failing the whole batch.
+
+    Args:
+        cities (list[str]): The city names; duplicates are fetched once.
+        api_key (Optional[str]): The OpenWeatherMap API key.
+        concurrency (int): How many cities are resolved at the same time.
+
+    Returns:
+        dict: The weather of every city that succeeded and the error of every city that failed.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(city: str) -> dict:
+        async with semaphore:
+            return await get_city_weather(city, api_key)
+
+    names = list(dict.fromkeys(cities))
+    results = await asyncio.gather(*(fetch(city) for city in names), return_exceptions=True)
+    weather, errors = {}, {}
+    for city, result in zip(names, results):
+        if isinstance(result, Exception):
+            errors[city] = describe_weather_error(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            weather[city] = result
+    return {"count": len(weather), "weather": weather, "errors": errors}
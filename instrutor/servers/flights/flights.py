@@ -1,4 +1,5 @@
 import asyncio
+import logging
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
@@ -7,11 +8,22 @@ SERVER_NAME = "FlightsInfoServer"
 FLIGHTS_INFO_SERVER = FastMCP(name=SERVER_NAME)
 
 # Import dataset helpers
-from servers.flights.helpers.airports import find_airport_by_iata, search_airports_by_city, list_airports_in_country
-from servers.flights.helpers.airlines import find_airline_by_code, list_airlines_by_country
-from servers.flights.helpers.routes import destinations_from_airport, find_route_paths
-from servers.flights.helpers.planes import find_planes_by_code 
-from servers.flights.helpers.countries import find_country_by_name
+from servers.flights.helpers.airports import get_airport_indexes, get_airport_grid, find_airport_by_iata, find_airport_by_icao, find_airports_by_iata, search_airports_by_city, list_airports_in_country, find_nearest_airports, find_nearest_airports_batch
+from servers.flights.helpers.airlines import get_airline_indexes, find_airline_by_code, find_airlines_by_code, list_airlines_by_country
+from servers.flights.helpers.routes import get_route_graph, destinations_from_airport, destinations_from_airports, find_route_paths
+from servers.flights.helpers.planes import get_plane_index, find_planes_by_code, find_planes_by_codes
+from servers.flights.helpers.countries import get_country_index, find_country_by_name
+from servers.flights.helpers.itineraries import get_distance_graph, find_shortest_itineraries
+from utils.executor import ToolExecutor
+from utils.registry import warm_up
+
+# Helpers run on a worker pool (see utils.executor); path searches get a concurrency limit so
+# a burst of them cannot take every worker from the lookups
+TOOL_EXECUTOR = ToolExecutor.from_env(limits={
+    "find_route_hops": 2,
+    "find_shortest_itineraries": 2,
+    "find_nearest_airports_batch": 4,
+})
 
 # ===================== Tools =====================
 
@@ -25,9 +37,36 @@ async def get_airport_by_iata(iata: str) -> dict:
     Returns:
         dict: The airport information or an error message.
     """
-    airport = find_airport_by_iata(iata)
+    airport = await TOOL_EXECUTOR.run("get_airport_by_iata", find_airport_by_iata, iata)
     return {"airport": airport} if airport else {"error": f"No airport found with IATA code {iata}"}
 
+@FLIGHTS_INFO_SERVER.tool(title="get_airports_by_iata")
+async def get_airports_by_iata(iatas: list[str]) -> dict:
+    """Get the information of several airports by IATA code in a single call.
+
+    Args:
+        iatas (list[str]): The IATA codes of the airports.
+
+    Returns:
+        dict: The airports found, keyed by IATA code, and the codes that were not found.
+    """
+    airports = await TOOL_EXECUTOR.run("get_airports_by_iata", find_airports_by_iata, iatas)
+    found = {code: airport for code, airport in airports.items() if airport}
+    return {"count": len(found), "airports": found, "not_found": [code for code, airport in airports.items() if not airport]}
+
+@FLIGHTS_INFO_SERVER.tool(title="get_airport_by_icao")
+async def get_airport_by_icao(icao: str) -> dict:
+    """Get airport information by ICAO code.
+
+    Args:
+        icao (str): The ICAO code of the airport.
+
+    Returns:
+        dict: The airport information or an error message.
+    """
+    airport = await TOOL_EXECUTOR.run("get_airport_by_icao", find_airport_by_icao, icao)
+    return {"airport": airport} if airport else {"error": f"No airport found with ICAO code {icao}"}
+
 @FLIGHTS_INFO_SERVER.tool(title="search_airports_by_city")
 async def search_airports_by_city_tool(city: str) -> dict:
     """Search for airports by city name.
@@ -38,7 +77,7 @@ async def search_airports_by_city_tool(city: str) -> dict:
     Returns:
         dict: A list of airports in the specified city.
     """
-    return search_airports_by_city(city)
+    return await TOOL_EXECUTOR.run("search_airports_by_city", search_airports_by_city, city)
 
 @FLIGHTS_INFO_SERVER.tool(title="list_airports_in_country")
 async def list_airports_in_country_tool(country: str) -> dict:
@@ -50,7 +89,36 @@ async def list_airports_in_country_tool(country: str) -> dict:
     Returns:
         dict: A list of airports in the specified country.
     """
-    return list_airports_in_country(country)
+    return await TOOL_EXECUTOR.run("list_airports_in_country", list_airports_in_country, country)
+
+@FLIGHTS_INFO_SERVER.tool(title="find_nearest_airports")
+async def find_nearest_airports_tool(lat: float, lon: float, radius_km: float = 100, k: int = 10) -> dict:
+    """Find the airports closest to a location, closest first.
+    
+    Args:
+        lat (float): The latitude of the location, in degrees.
+        lon (float): The longitude of the location, in degrees.
+        radius_km (float): The search radius in kilometres (default: 100).
+        k (int): The maximum number of airports to return (default: 10, at most 50).
+        
+    Returns:
+        dict: The airports found, each with its distance in kilometres, or an error message.
+    """
+    return await TOOL_EXECUTOR.run("find_nearest_airports", find_nearest_airports, lat, lon, radius_km, k)
+
+@FLIGHTS_INFO_SERVER.tool(title="find_nearest_airports_batch")
+async def find_nearest_airports_batch_tool(points: list[dict], radius_km: float = 100, k: int = 10) -> dict:
+    """Find the airports closest to several locations in a single call.
+    
+    Args:
+        points (list[dict]): The locations, each as {"lat": float, "lon": float}.
+        radius_km (float): The search radius in kilometres (default: 100).
+        k (int): The maximum number of airports to return per location (default: 10, at most 50).
+        
+    Returns:
+        dict: For every location, in order, the airports found or an error message.
+    """
+    return await TOOL_EXECUTOR.run("find_nearest_airports_batch", find_nearest_airports_batch, points, radius_km, k)
 
 @FLIGHTS_INFO_SERVER.tool(title="get_airline_by_code")
 async def get_airline_by_code_tool(code: str) -> dict:
@@ -62,9 +130,23 @@ async def get_airline_by_code_tool(code: str) -> dict:
     Returns:
         dict: The airline information or an error message.
     """
-    airline = find_airline_by_code(code)
+    airline = await TOOL_EXECUTOR.run("get_airline_by_code", find_airline_by_code, code)
     return {"airline": airline} if airline else {"error": f"Airline not found for code/name {code}"}
 
+@FLIGHTS_INFO_SERVER.tool(title="get_airlines_by_code")
+async def get_airlines_by_code_tool(codes: list[str]) -> dict:
+    """Get the information of several airlines by IATA or ICAO code or name in a single call.
+
+    Args:
+        codes (list[str]): The IATA codes, ICAO codes, or names of the airlines.
+
+    Returns:
+        dict: The airlines found, keyed by code/name, and the codes/names that were not found.
+    """
+    airlines = await TOOL_EXECUTOR.run("get_airlines_by_code", find_airlines_by_code, codes)
+    found = {code: airline for code, airline in airlines.items() if airline}
+    return {"count": len(found), "airlines": found, "not_found": [code for code, airline in airlines.items() if not airline]}
+
 @FLIGHTS_INFO_SERVER.tool(title="list_airlines_by_country")
 async def list_airlines_by_country_tool(country: str) -> dict:
     """List all airlines in a specific country.
@@ -75,7 +157,7 @@ async def list_airlines_by_country_tool(country: str) -> dict:
     Returns:
         dict: A list of airlines in the specified country.
     """
-    airlines = list_airlines_by_country(country)
+    airlines = await TOOL_EXECUTOR.run("list_airlines_by_country", list_airlines_by_country, country)
     return {"count": len(airlines), "airlines": airlines}
 
 @FLIGHTS_INFO_SERVER.tool(title="get_routes_from_airport")
@@ -88,9 +170,27 @@ async def get_routes_from_airport_tool(source_iata: str) -> dict:
     Returns:
         dict: A list of routes from the specified airport.
     """
-    destinations = destinations_from_airport(source_iata)
+    destinations = await TOOL_EXECUTOR.run("get_routes_from_airport", destinations_from_airport, source_iata)
     return {"source": source_iata.upper(), "destinations_count": len(destinations), "destinations": destinations[:50]}
 
+@FLIGHTS_INFO_SERVER.tool(title="get_routes_from_airports")
+async def get_routes_from_airports_tool(source_iatas: list[str]) -> dict:
+    """Get the routes from several airports in a single call.
+
+    Args:
+        source_iatas (list[str]): The IATA codes of the source airports.
+
+    Returns:
+        dict: For every source airport, keyed by IATA code, its destinations (at most 50) and how many there are.
+    """
+    routes = await TOOL_EXECUTOR.run("get_routes_from_airports", destinations_from_airports, source_iatas)
+    return {
+        "sources": {
+            code.upper(): {"destinations_count": len(destinations), "destinations": destinations[:50]}
+            for code, destinations in routes.items()
+        }
+    }
+
 @FLIGHTS_INFO_SERVER.tool(title="get_planes_by_code")
 async def get_planes_by_code_tool(code: str) -> dict:
     """Get plane information by IATA or ICAO code.
@@ -101,9 +201,23 @@ async def get_planes_by_code_tool(code: str) -> dict:
     Returns:
         dict: The plane information or an error message.
     """
-    planes = find_planes_by_code(code)
+    planes = await TOOL_EXECUTOR.run("get_planes_by_code", find_planes_by_code, code)
     return {"planes": planes} if planes else {"error": f"No planes found for code {code}"}
 
+@FLIGHTS_INFO_SERVER.tool(title="get_planes_by_codes")
+async def get_planes_by_codes_tool(codes: list[str]) -> dict:
+    """Get the information of the planes of several IATA or ICAO codes in a single call.
+
+    Args:
+        codes (list[str]): The IATA or ICAO codes of the planes.
+
+    Returns:
+        dict: The planes found, keyed by code, and the codes that were not found.
+    """
+    planes = await TOOL_EXECUTOR.run("get_planes_by_codes", find_planes_by_codes, codes)
+    found = {code: matches for code, matches in planes.items() if matches}
+    return {"count": len(found), "planes": found, "not_found": [code for code, matches in planes.items() if not matches]}
+
 @FLIGHTS_INFO_SERVER.tool(title="get_country_codes")
 async def get_country_codes_tool(country_name: str) -> dict:
     """Get country codes by country name.
@@ -114,26 +228,48 @@ async def get_country_codes_tool(country_name: str) -> dict:
     Returns:
         dict: The country information or an error message.
     """
-    country = find_country_by_name(country_name)
+    country = await TOOL_EXECUTOR.run("get_country_codes", find_country_by_name, country_name)
     return {"country": country} if country else {"error": f"Country not found: {country_name}"}
 
 @FLIGHTS_INFO_SERVER.tool(title="find_route_hops")
-async def find_route_hops_tool(source_iata: str, destination_iata: str, max_hops: int = 2) -> dict:
-    """Find possible flight routes between two airports within a maximum number of hops.
+async def find_route_hops_tool(source_iata: str, destination_iata: str, max_hops: int = 2, limit: int = 25) -> dict:
+    """Find possible flight routes between two airports within a maximum number of hops, shortest first.
     
     Args:
         source_iata (str): The IATA code of the source airport.
         destination_iata (str): The IATA code of the destination airport.
         max_hops (int): The maximum number of hops allowed.
+        limit (int): The maximum number of routes to return (default: 25, at most 100).
+        
+    Returns:
+        dict: A list of possible routes found and whether more routes exist than were returned.
+    """
+    result = await TOOL_EXECUTOR.run("find_route_hops", find_route_paths, source_iata, destination_iata, max_hops, limit)
+    paths = result["paths"]
+    return {"source": source_iata.upper(), "destination": destination_iata.upper(), "max_hops": max_hops, "paths_found": len(paths), "truncated": result["truncated"], "paths": paths}
+
+@FLIGHTS_INFO_SERVER.tool(title="find_shortest_itineraries")
+async def find_shortest_itineraries_tool(source_iata: str, destination_iata: str, k: int = 3) -> dict:
+    """Find the k shortest itineraries between two airports by total flight distance, with the distance of every leg and the details of every airport.
+    
+    Args:
+        source_iata (str): The IATA code of the source airport.
+        destination_iata (str): The IATA code of the destination airport.
+        k (int): The number of itineraries to return (default: 3, at most 10).
         
     Returns:
-        dict: A list of possible routes found.
+        dict: The itineraries found, shortest first, or an error message.
     """
-    paths = find_route_paths(source_iata, destination_iata, max_hops)
-    return {"source": source_iata.upper(), "destination": destination_iata.upper(), "max_hops": max_hops, "paths_found": len(paths), "paths": paths[:25]}
+    return await TOOL_EXECUTOR.run("find_shortest_itineraries", find_shortest_itineraries, source_iata, destination_iata, k)
 
 async def main():
-    await FLIGHTS_INFO_SERVER.run_async(transport="http", host="0.0.0.0", port=8001, path="/flights_info_server", log_level="debug")
+    logging.basicConfig(level=logging.INFO)
+    warm_up([get_airport_indexes, get_airport_grid, get_airline_indexes, get_route_graph, get_distance_graph, get_plane_index, get_country_index])
+    TOOL_EXECUTOR.start()
+    try:
+        await FLIGHTS_INFO_SERVER.run_async(transport="http", host="0.0.0.0", port=8001, path="/flights_info_server", log_level="debug")
+    finally:
+        TOOL_EXECUTOR.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
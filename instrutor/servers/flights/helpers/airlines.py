@@ -1,18 +1,55 @@
 import os
-from utils.loader import load_dataset
+from collections.abc import Sequence
+from utils.indexes import unique_index
+from utils.registry import DatasetSnapshot, get_dataset
 
 HEADERS_AIRLINES = ["airline_id","name","alias","iata","icao","callsign","country","active"]
 FILENAME_AIRLINES = "airlines.dat"
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dataset")
 
-def load_airlines() -> list[dict]:
+def get_airlines_snapshot() -> DatasetSnapshot:
+    """Get the shared snapshot of the airlines dataset, parsed once per process.
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the airlines dataset.
+    """
+    dataset_path = os.path.join(DATASET_DIR, FILENAME_AIRLINES)
+    return get_dataset(dataset_path, HEADERS_AIRLINES)
+
+def load_airlines() -> Sequence[dict]:
     """
     Load the airlines dataset.
     
     Returns:
-        list[dict]: A list of airlines with their details.
+        Sequence[dict]: A list of airlines with their details.
+    """
+    return get_airlines_snapshot().rows
+
+def build_airline_indexes(airlines: Sequence[dict]) -> dict[str, dict[str, int]]:
+    """Build the code and name hash indexes of the airlines.
+
+    Args:
+        airlines (Sequence[dict]): The airlines to index.
+
+    Returns:
+        dict[str, dict[str, int]]: "code" maps upper-cased IATA and ICAO codes and "name" maps
+        lower-cased names to the position of the first airline that has them.
+    """
+    return {
+        "code": unique_index(airlines, lambda al: al.get("iata", "").upper(), lambda al: al.get("icao", "").upper()),
+        "name": unique_index(airlines, lambda al: al.get("name", "").lower()),
+    }
+
+def get_airline_indexes() -> dict[str, dict[str, int]]:
+    """Get the airline indexes, built once per dataset snapshot.
+
+    Returns:
+        dict[str, dict[str, int]]: The code and name indexes.
     """
-    dataset_path = os.path.join(os.path.dirname(__file__), "dataset", FILENAME_AIRLINES)
-    return load_dataset(dataset_path, HEADERS_AIRLINES)
+    return _airline_indexes(get_airlines_snapshot())
+
+def _airline_indexes(snapshot: DatasetSnapshot) -> dict[str, dict[str, int]]:
+    return snapshot.derive("indexes", lambda s: build_airline_indexes(s.rows))
 
 def find_airline_by_code(code: str) -> dict | None:
     """Find an airline by its IATA or ICAO code or name.
@@ -23,13 +60,26 @@ def find_airline_by_code(code: str) -> dict | None:
     Returns:
         dict | None: The airline data if found, else None.
     """
-    
-    airlines = load_airlines()
-    code_upper = code.upper()
-    for al in airlines:
-        if al.get("iata", "").upper() == code_upper or al.get("icao", "").upper() == code_upper or al.get("name", "").lower() == code.lower():
-            return al
-    return None
+    snapshot = get_airlines_snapshot()
+    return _lookup_airline(snapshot, _airline_indexes(snapshot), code)
+
+def find_airlines_by_code(codes: Sequence[str]) -> dict[str, dict | None]:
+    """Find several airlines by their IATA or ICAO codes or names.
+
+    Args:
+        codes (Sequence[str]): The IATA codes, ICAO codes, or names of the airlines.
+
+    Returns:
+        dict[str, dict | None]: The airline data for every code (None if not found), keyed as given.
+    """
+    snapshot = get_airlines_snapshot()
+    indexes = _airline_indexes(snapshot)
+    return {code: _lookup_airline(snapshot, indexes, code) for code in codes}
+
+def _lookup_airline(snapshot: DatasetSnapshot, indexes: dict[str, dict[str, int]], code: str) -> dict | None:
+    # The first airline in file order wins, whichever of its fields matched
+    positions = [i for i in (indexes["code"].get(code.upper()), indexes["name"].get(code.lower())) if i is not None]
+    return snapshot.rows[min(positions)] if positions else None
 
 def list_airlines_by_country(country: str) -> list[dict]:
     """List all active airlines in a given country.
@@ -1,19 +1,94 @@
+from collections.abc import Sequence
 from typing import Optional
 import os
-from utils.loader import load_dataset
+import numpy as np
+from utils.columnar import ColumnarTable
+from utils.geo import GeoGrid
+from utils.indexes import unique_index
+from utils.registry import DatasetSnapshot, get_dataset
 
 HEADERS_AIRPORTS = ["airport_id","name","city","country","iata","icao","latitude","longitude","altitude","timezone","dst","tz_database","type","source"]
 FILENAME_AIRPORTS = "airports.dat"
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dataset")
+MAX_NEAREST_AIRPORTS = 50
+SCHEMA_AIRPORTS = {"city": str, "country": str, "latitude": float, "longitude": float, "altitude": float}
 
-def load_airports() -> list[dict]:
+def get_airports_snapshot() -> DatasetSnapshot:
+    """Get the shared snapshot of the airports dataset, parsed once per process.
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the airports dataset.
+    """
+    dataset_path = os.path.join(DATASET_DIR, FILENAME_AIRPORTS)
+    return get_dataset(dataset_path, HEADERS_AIRPORTS)
+
+def load_airports() -> Sequence[dict]:
     """
     Load the airports dataset.
     
     Returns:
-        list[dict]: A list of airports with their details.
+        Sequence[dict]: A list of airports with their details.
+    """
+    return get_airports_snapshot().rows
+
+def get_airports_table() -> ColumnarTable:
+    """Get the typed columnar view of the airports dataset.
+
+    Returns:
+        ColumnarTable: The airports with typed city, country and coordinate columns.
     """
-    dataset_path = os.path.join(os.path.dirname(__file__), "dataset", FILENAME_AIRPORTS)
-    return load_dataset(dataset_path, HEADERS_AIRPORTS)
+    return get_airports_snapshot().table(SCHEMA_AIRPORTS)
+
+def build_airport_indexes(airports: Sequence[dict]) -> dict[str, dict[str, int]]:
+    """
+    Build the IATA and ICAO hash indexes of the airports.
+
+    Args:
+        airports (Sequence[dict]): The airports to index.
+
+    Returns:
+        dict[str, dict[str, int]]: For "iata" and "icao", the position of the first airport with each code.
+    """
+    return {
+        "iata": unique_index(airports, lambda a: a.get("iata", "").upper()),
+        "icao": unique_index(airports, lambda a: a.get("icao", "").upper()),
+    }
+
+def get_airport_indexes(snapshot: Optional[DatasetSnapshot] = None) -> dict[str, dict[str, int]]:
+    """
+    Get the airport indexes, built once per dataset snapshot.
+
+    Args:
+        snapshot (Optional[DatasetSnapshot]): The airports snapshot to get them for (default: the current one).
+
+    Returns:
+        dict[str, dict[str, int]]: The IATA and ICAO indexes.
+    """
+    return _airport_indexes(snapshot if snapshot is not None else get_airports_snapshot())
+
+def _airport_indexes(snapshot: DatasetSnapshot) -> dict[str, dict[str, int]]:
+    return snapshot.derive("indexes", lambda s: build_airport_indexes(s.rows))
+
+def get_airport_grid(snapshot: Optional[DatasetSnapshot] = None) -> GeoGrid:
+    """
+    Get the spatial grid index of the airport coordinates, built once per dataset snapshot.
+
+    Args:
+        snapshot (Optional[DatasetSnapshot]): The airports snapshot to get it for (default: the current one).
+
+    Returns:
+        GeoGrid: The grid of the airports, with row positions as ids.
+    """
+    return (snapshot if snapshot is not None else get_airports_snapshot()).derive("grid", _build_airport_grid)
+
+def _build_airport_grid(snapshot: DatasetSnapshot) -> GeoGrid:
+    table = snapshot.table(SCHEMA_AIRPORTS)
+    return GeoGrid(table.values("latitude"), table.values("longitude"))
+
+def _find_airport(index: str, code: str) -> Optional[dict]:
+    snapshot = get_airports_snapshot()
+    i = _airport_indexes(snapshot)[index].get(code.upper())
+    return snapshot.rows[i] if i is not None else None
 
 def find_airport_by_iata(iata: str) -> Optional[dict]:
     """
@@ -25,11 +100,34 @@ def find_airport_by_iata(iata: str) -> Optional[dict]:
     Returns:
         Optional[dict]: The airport data if found, else None.
     """
-    iata_upper = iata.upper()
-    for a in load_airports():
-        if a.get("iata", "").upper() == iata_upper:
-            return a
-    return None
+    return _find_airport("iata", iata)
+
+def find_airport_by_icao(icao: str) -> Optional[dict]:
+    """
+    Find an airport by its ICAO code.
+    
+    Args: 
+        icao (str): The ICAO code of the airport.
+        
+    Returns:
+        Optional[dict]: The airport data if found, else None.
+    """
+    return _find_airport("icao", icao)
+
+def find_airports_by_iata(codes: Sequence[str]) -> dict[str, Optional[dict]]:
+    """
+    Find several airports by their IATA codes with a single index lookup each.
+
+    Args:
+        codes (Sequence[str]): The IATA codes of the airports.
+
+    Returns:
+        dict[str, Optional[dict]]: The airport data for every code (None if not found), keyed as given.
+    """
+    snapshot = get_airports_snapshot()
+    index = _airport_indexes(snapshot)["iata"]
+    positions = {code: index.get(code.upper()) for code in codes}
+    return {code: snapshot.rows[i] if i is not None else None for code, i in positions.items()}
 
 def search_airports_by_city(city: str, limit: int = 25) -> dict:
     """
@@ -42,10 +140,9 @@ def search_airports_by_city(city: str, limit: int = 25) -> dict:
     Returns:
         dict: A list of airports in the specified city.
     """
-    c = city.lower()
-    airports = load_airports()
-    matches = [a for a in airports if c in a.get("city", "").lower()]
-    return {"count": len(matches), "airports": matches[:limit]}
+    table = get_airports_table()
+    ids = table.search("city", city)
+    return {"count": len(ids), "airports": table.take(ids, limit)}
 
 def list_airports_in_country(country: str, limit: int = 50) -> dict:
     """
@@ -59,6 +156,51 @@ def list_airports_in_country(country: str, limit: int = 50) -> dict:
         dict: A list of airports in the specified country.
     """
     c = country.lower()
-    airports = load_airports()
-    matches = [a for a in airports if a.get("country", "").lower() == c]
-    return {"count": len(matches), "airports": matches[:limit]}
+    table = get_airports_table()
+    ids = np.flatnonzero(table.match("country", lambda v: v.lower() == c))
+    return {"count": len(ids), "airports": table.take(ids, limit)}
+
+def find_nearest_airports(lat: float, lon: float, radius_km: float = 100, k: int = 10) -> dict:
+    """
+    Find the airports closest to a location.
+
+    Args:
+        lat (float): Latitude of the location, in degrees.
+        lon (float): Longitude of the location, in degrees.
+        radius_km (float): Only consider airports within this distance, in kilometres.
+        k (int): The maximum number of airports to return (at most MAX_NEAREST_AIRPORTS).
+
+    Returns:
+        dict: The airports found, closest first, each with its distance in kilometres.
+    """
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return {"error": f"Invalid coordinates: {lat}, {lon}"}
+    if radius_km <= 0:
+        return {"error": f"Invalid radius: {radius_km}"}
+    snapshot = get_airports_snapshot()
+    ids, distances = get_airport_grid(snapshot).nearest(lat, lon, radius_km, max(1, min(k, MAX_NEAREST_AIRPORTS)))
+    rows = snapshot.rows
+    airports = [{**rows[i], "distance_km": round(float(d), 1)} for i, d in zip(ids.tolist(), distances)]
+    return {"count": len(airports), "airports": airports}
+
+def find_nearest_airports_batch(points: Sequence[dict], radius_km: float = 100, k: int = 10) -> dict:
+    """
+    Find the airports closest to several locations at once.
+
+    Args:
+        points (Sequence[dict]): The locations, each with "lat" and "lon" keys.
+        radius_km (float): Only consider airports within this distance, in kilometres.
+        k (int): The maximum number of airports to return per location.
+
+    Returns:
+        dict: For every location, in order, the airports found or an error message.
+    """
+    results = []
+    for point in points:
+        try:
+            lat, lon = float(point["lat"]), float(point["lon"])
+        except (KeyError, TypeError, ValueError):
+            results.append({"point": point, "error": "Each point needs numeric 'lat' and 'lon'"})
+            continue
+        results.append({"point": {"lat": lat, "lon": lon}, **find_nearest_airports(lat, lon, radius_km, k)})
+    return {"count": len(results), "results": results}
@@ -1,17 +1,39 @@
 import os
-from utils.loader import load_dataset
+from collections.abc import Sequence
+from utils.indexes import unique_index
+from utils.registry import DatasetSnapshot, get_dataset
 
 HEADERS_COUNTRIES = ["name","iso_name","dafif_code"]
 FILENAME_COUNTRIES = "countries.dat"
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dataset")
 
-def load_countries() -> list[dict]:
+def get_countries_snapshot() -> DatasetSnapshot:
+    """Get the shared snapshot of the countries dataset, parsed once per process.
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the countries dataset.
+    """
+    dataset_path = os.path.join(DATASET_DIR, FILENAME_COUNTRIES)
+    return get_dataset(dataset_path, HEADERS_COUNTRIES)
+
+def load_countries() -> Sequence[dict]:
     """Load the countries dataset.
 
     Returns:
-        list[dict]: A list of countries with their details.
+        Sequence[dict]: A list of countries with their details.
     """
-    dataset_path = os.path.join(os.path.dirname(__file__), "dataset", FILENAME_COUNTRIES)
-    return load_dataset(dataset_path, HEADERS_COUNTRIES)
+    return get_countries_snapshot().rows
+
+def get_country_index() -> dict[str, int]:
+    """Get the index of lower-cased country names, built once per dataset snapshot.
+
+    Returns:
+        dict[str, int]: Position of the first country with each name.
+    """
+    return _country_index(get_countries_snapshot())
+
+def _country_index(snapshot: DatasetSnapshot) -> dict[str, int]:
+    return snapshot.derive("index", lambda s: unique_index(s.rows, lambda c: c.get("name", "").lower()))
 
 def find_country_by_name(name: str) -> dict | None:
     """Find a country by its name.
@@ -22,8 +44,6 @@ def find_country_by_name(name: str) -> dict | None:
     Returns:
         dict | None: The country data if found, else None.
     """
-    name_lower = name.lower()
-    for c in load_countries():
-        if c.get("name", "").lower() == name_lower:
-            return c
-    return None
\ No newline at end of file
+    snapshot = get_countries_snapshot()
+    i = _country_index(snapshot).get(name.lower())
+    return snapshot.rows[i] if i is not None else None
\ No newline at end of file
@@ -0,0 +1,174 @@
+import heapq
+import math
+from typing import Optional
+import numpy as np
+from servers.flights.helpers.airports import SCHEMA_AIRPORTS, get_airport_indexes, get_airports_snapshot
+from servers.flights.helpers.route_graph import RouteGraph
+from servers.flights.helpers.routes import get_route_graph, get_routes_snapshot
+from utils.geo import haversine_km
+from utils.registry import DatasetSnapshot
+
+MAX_ITINERARIES = 10
+
+class DistanceGraph:
+    """
+    Route graph weighted by the great-circle distance of every flight.
+
+    Airport coordinates come from a snapshot of airports.dat, kept as `airports` (routes may use
+    IATA or ICAO codes). Distances are computed once, with a vectorized haversine over all the
+    distinct routes of the `RouteGraph`; routes touching an airport without coordinates are left out.
+    """
+
+    def __init__(self, graph: RouteGraph, airports: DatasetSnapshot):
+        self.graph = graph
+        self.airports = airports
+        table = airports.table(SCHEMA_AIRPORTS)
+        indexes = get_airport_indexes(airports)
+        self.airport_positions = np.array(
+            [indexes["iata"].get(code, indexes["icao"].get(code, -1)) for code in graph.codes], dtype=np.int64
+        )
+        known = self.airport_positions >= 0
+        positions = np.where(known, self.airport_positions, 0)
+        self.lat = np.where(known, table.values("latitude")[positions] if len(positions) else np.empty(0), np.nan)
+        self.lon = np.where(known, table.values("longitude")[positions] if len(positions) else np.empty(0), np.nan)
+
+        sources = np.repeat(np.arange(graph.node_count), np.diff(graph.neighbor_offsets))
+        self.km = haversine_km(self.lat[sources], self.lon[sources], self.lat[graph.neighbors], self.lon[graph.neighbors])
+
+        # Plain Python adjacency lists: much faster than NumPy slices inside the search loop
+        self.adjacency: list[list[tuple[int, float]]] = [[] for _ in range(graph.node_count)]
+        for u, v, km in zip(sources.tolist(), graph.neighbors.tolist(), self.km.tolist()):
+            if not math.isnan(km):
+                self.adjacency[u].append((v, km))
+
+    def shortest_path(self, source: int, target: int, heuristic: list[float], banned_nodes: set[int], banned_edges: set[tuple[int, int]]) -> Optional[tuple[float, list[int]]]:
+        """
+        A* search for the shortest path by distance, avoiding some nodes and edges.
+
+        The great-circle distance to the target never overestimates the remaining flight
+        distance, so the heuristic is admissible and consistent.
+
+        Returns:
+            Optional[tuple[float, list[int]]]: The distance and nodes of the path, or None.
+        """
+        best = {source: 0.0}
+        previous: dict[int, int] = {}
+        closed: set[int] = set()
+        heap = [(heuristic[source], 0.0, source)]
+        while heap:
+            _, dist, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == target:
+                path = [u]
+                while u != source:
+                    u = previous[u]
+                    path.append(u)
+                return dist, path[::-1]
+            closed.add(u)
+            for v, km in self.adjacency[u]:
+                if v in closed or v in banned_nodes or (u, v) in banned_edges:
+                    continue
+                candidate = dist + km
+                if candidate < best.get(v, math.inf):
+                    best[v] = candidate
+                    previous[v] = u
+                    heapq.heappush(heap, (candidate + heuristic[v], candidate, v))
+        return None
+
+    def leg_km(self, u: int, v: int) -> float:
+        """Distance of the direct flight from u to v."""
+        return next(km for w, km in self.adjacency[u] if w == v)
+
+    def k_shortest_paths(self, source: int, target: int, k: int) -> list[tuple[float, list[int]]]:
+        """
+        Yen's algorithm: the k shortest loopless paths by total distance.
+
+        Args:
+            source (int): The source node.
+            target (int): The target node.
+            k (int): How many paths to find.
+
+        Returns:
+            list[tuple[float, list[int]]]: Up to k (distance, nodes) pairs, shortest first.
+        """
+        heuristic = haversine_km(self.lat, self.lon, self.lat[target], self.lon[target])
+        heuristic = np.where(np.isnan(heuristic), 0.0, heuristic).tolist()
+        first = self.shortest_path(source, target, heuristic, set(), set())
+        if first is None:
+            return []
+        found = [first]
+        candidates: list[tuple[float, list[int]]] = []
+        seen = {tuple(first[1])}
+        while len(found) < k:
+            _, last = found[-1]
+            root_km = 0.0
+            for i in range(len(last) - 1):
+                spur, root = last[i], last[:i + 1]
+                banned_edges = {(p[i], p[i + 1]) for _, p in found if len(p) > i + 1 and p[:i + 1] == root}
+                spur_path = self.shortest_path(spur, target, heuristic, set(root[:-1]), banned_edges)
+                if spur_path is not None:
+                    path = root[:-1] + spur_path[1]
+                    if tuple(path) not in seen:
+                        seen.add(tuple(path))
+                        heapq.heappush(candidates, (root_km + spur_path[0], path))
+                root_km += self.leg_km(last[i], last[i + 1])
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+        return found
+
+def get_distance_graph() -> DistanceGraph:
+    """
+    Get the distance-weighted route graph, rebuilt when routes.dat or airports.dat change.
+
+    Returns:
+        DistanceGraph: The distance-weighted route graph.
+    """
+    airports = get_airports_snapshot()
+    # One graph per routes snapshot, replaced when airports.dat is reloaded
+    return get_routes_snapshot().derive(
+        "distances", lambda s: DistanceGraph(get_route_graph(s), airports), valid=lambda distances: distances.airports is airports
+    )
+
+def _airport_summary(distances: DistanceGraph, node: int) -> dict:
+    code = distances.graph.codes[node]
+    position = distances.airport_positions[node]
+    if position < 0:
+        return {"code": code}
+    airport = distances.airports.rows[position]
+    return {"code": code, "name": airport.get("name", ""), "city": airport.get("city", ""), "country": airport.get("country", "")}
+
+def find_shortest_itineraries(source_iata: str, destination_iata: str, k: int = 3) -> dict:
+    """
+    Find the k shortest itineraries between two airports by total great-circle distance.
+
+    Args:
+        source_iata (str): The IATA code of the source airport.
+        destination_iata (str): The IATA code of the destination airport.
+        k (int): How many itineraries to return (at most MAX_ITINERARIES).
+
+    Returns:
+        dict: The itineraries, shortest first, each with its airports, legs and total distance.
+    """
+    distances = get_distance_graph()
+    graph = distances.graph
+    source = graph.node(source_iata)
+    target = graph.node(destination_iata)
+    if source is None or target is None:
+        missing = source_iata if source is None else destination_iata
+        return {"error": f"No routes found for airport {missing.upper()}"}
+
+    itineraries = []
+    for total_km, path in distances.k_shortest_paths(source, target, max(1, min(k, MAX_ITINERARIES))):
+        itineraries.append({
+            "route": [graph.codes[n] for n in path],
+            "hops": len(path) - 1,
+            "total_km": round(total_km, 1),
+            "legs": [
+                {"from": graph.codes[u], "to": graph.codes[v], "km": round(distances.leg_km(u, v), 1)}
+                for u, v in zip(path, path[1:])
+            ],
+            "airports": [_airport_summary(distances, n) for n in path],
+        })
+    return {"source": source_iata.upper(), "destination": destination_iata.upper(), "count": len(itineraries), "itineraries": itineraries}
@@ -1,18 +1,53 @@
 import os
-from utils.loader import load_dataset
+from collections.abc import Sequence
+from utils.indexes import multi_index
+from utils.registry import DatasetSnapshot, get_dataset
 
 HEADERS_PLANES = ["name","iata","icao"]
 FILENAME_PLANES = "planes.dat"
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dataset")
 
-def load_planes() -> list[dict]:
+def get_planes_snapshot() -> DatasetSnapshot:
+    """Get the shared snapshot of the planes dataset, parsed once per process.
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the planes dataset.
+    """
+    dataset_path = os.path.join(DATASET_DIR, FILENAME_PLANES)
+    return get_dataset(dataset_path, HEADERS_PLANES)
+
+def load_planes() -> Sequence[dict]:
     """
     Load the planes dataset.
 
     Returns:
-        list[dict]: A list of planes with their details.
+        Sequence[dict]: A list of planes with their details.
+    """
+    return get_planes_snapshot().rows
+
+def build_plane_index(planes: Sequence[dict]) -> dict[str, list[int]]:
+    """
+    Build the hash index of upper-cased IATA and ICAO codes to planes.
+
+    Args:
+        planes (Sequence[dict]): The planes to index.
+
+    Returns:
+        dict[str, list[int]]: Positions of the planes with each code.
     """
-    dataset_path = os.path.join(os.path.dirname(__file__), "dataset", FILENAME_PLANES)
-    return load_dataset(dataset_path, HEADERS_PLANES)
+    return multi_index(planes, lambda p: p.get("iata", "").upper(), lambda p: p.get("icao", "").upper())
+
+def get_plane_index() -> dict[str, list[int]]:
+    """
+    Get the plane code index, built once per dataset snapshot.
+
+    Returns:
+        dict[str, list[int]]: Positions of the planes with each code.
+    """
+    return _plane_index(get_planes_snapshot())
+
+def _plane_index(snapshot: DatasetSnapshot) -> dict[str, list[int]]:
+    return snapshot.derive("index", lambda s: build_plane_index(s.rows))
 
 def find_planes_by_code(code: str) -> list[dict]:
     """Find planes by their IATA or ICAO code.
@@ -23,6 +58,19 @@ def find_planes_by_code(code: str) -> list[dict]:
     Returns:
         list[dict]: A list of planes matching the code.
     """
-    planes = load_planes()
-    c = code.upper()
-    return [p for p in planes if p.get("iata_code", "").upper() == c or p.get("icao_code", "").upper() == c]
+    snapshot = get_planes_snapshot()
+    index = _plane_index(snapshot)
+    return [snapshot.rows[i] for i in index.get(code.upper(), [])]
+
+def find_planes_by_codes(codes: Sequence[str]) -> dict[str, list[dict]]:
+    """Find the planes of several IATA or ICAO codes.
+    
+    Args:
+        codes (Sequence[str]): The IATA or ICAO codes of the planes.
+        
+    Returns:
+        dict[str, list[dict]]: The planes matching every code, keyed as given.
+    """
+    snapshot = get_planes_snapshot()
+    index = _plane_index(snapshot)
+    return {code: [snapshot.rows[i] for i in index.get(code.upper(), [])] for code in codes}
@@ -0,0 +1,128 @@
+from typing import Optional
+import numpy as np
+from utils.columnar import ColumnarTable
+
+class RouteGraph:
+    """
+    Directed route graph in compressed-sparse-row (CSR) form.
+
+    Airports are interned to integer ids (`codes[id]` is the upper-cased airport code). The routes
+    leaving airport `u` are the edges `offsets[u]:offsets[u + 1]`, in file order, with their
+    destination in `targets` and their airline id, stops, codeshare flag and equipment in the
+    parallel per-edge arrays. `neighbor_offsets`/`neighbors` hold the same graph with parallel
+    routes collapsed, which is what path searches iterate over, and
+    `predecessor_offsets`/`predecessors` hold its reverse.
+    """
+
+    UNREACHABLE = np.iinfo(np.int16).max
+
+    def __init__(self, routes: ColumnarTable):
+        self.codes: list[str] = []
+        self.ids: dict[str, int] = {}
+
+        source = self._intern_column(routes, "source_airport")
+        destination = self._intern_column(routes, "destination_airport")
+        valid = (source >= 0) & (destination >= 0)
+        order = np.flatnonzero(valid)[np.argsort(source[valid], kind="stable")]
+        n = len(self.codes)
+
+        sources = source[order]
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=n)))).astype(np.int64)
+        self.targets = destination[order].astype(np.int32)
+
+        airline_id = routes.values("airline_id")[order]
+        self.airline_ids = np.where(np.isnan(airline_id), -1, airline_id).astype(np.int32)
+        stops = routes.values("stops")[order]
+        self.stops = np.where(np.isnan(stops), -1, stops).astype(np.int16)
+        self.codeshare = routes.match("codeshare", lambda v: v.upper() == "Y")[order]
+        self.equipment_codes = routes.codes("equipment")[order]
+        self.equipment_names = routes.categories("equipment")
+
+        pairs = np.unique(sources.astype(np.int64) * n + self.targets)
+        self.neighbors = (pairs % n).astype(np.int32) if n else np.empty(0, dtype=np.int32)
+        neighbor_sources = pairs // n if n else pairs
+        self.neighbor_offsets = np.concatenate(([0], np.cumsum(np.bincount(neighbor_sources, minlength=n)))).astype(np.int64)
+
+        reverse = np.argsort(self.neighbors, kind="stable")
+        self.predecessors = neighbor_sources[reverse].astype(np.int32)
+        self.predecessor_offsets = np.concatenate(([0], np.cumsum(np.bincount(self.neighbors, minlength=n)))).astype(np.int64)
+
+    def _intern_column(self, routes: ColumnarTable, name: str) -> np.ndarray:
+        """Map every row of an airport column to its airport id (-1 for empty values)."""
+        lookup = np.empty(len(routes.categories(name)), dtype=np.int32)
+        for i, value in enumerate(routes.categories(name)):
+            code = value.upper()
+            if not code:
+                lookup[i] = -1
+                continue
+            if code not in self.ids:
+                self.ids[code] = len(self.codes)
+                self.codes.append(code)
+            lookup[i] = self.ids[code]
+        return lookup[routes.codes(name)] if len(lookup) else np.empty(0, dtype=np.int32)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.codes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def node(self, code: str) -> Optional[int]:
+        """Get the id of an airport code, or None if no route touches it."""
+        return self.ids.get(code.upper())
+
+    def successors(self, node: int) -> np.ndarray:
+        """Get the distinct airports reachable from a node with a single flight."""
+        return self.neighbors[self.neighbor_offsets[node]:self.neighbor_offsets[node + 1]]
+
+    def predecessors_of(self, node: int) -> np.ndarray:
+        """Get the distinct airports with a direct flight to a node."""
+        return self.predecessors[self.predecessor_offsets[node]:self.predecessor_offsets[node + 1]]
+
+    def hops_to(self, target: int, max_hops: int) -> np.ndarray:
+        """
+        Breadth-first search backwards from a node.
+
+        Args:
+            target (int): The node to reach.
+            max_hops (int): How many flights to search back.
+
+        Returns:
+            np.ndarray: For every node, the minimum number of flights needed to reach the target,
+            or `UNREACHABLE` if it takes more than `max_hops`.
+        """
+        hops = np.full(self.node_count, self.UNREACHABLE, dtype=np.int16)
+        hops[target] = 0
+        frontier = np.array([target], dtype=np.int32)
+        for depth in range(1, max_hops + 1):
+            if not len(frontier):
+                break
+            previous = np.concatenate([self.predecessors_of(v) for v in frontier.tolist()])
+            previous = np.unique(previous[hops[previous] == self.UNREACHABLE])
+            hops[previous] = depth
+            frontier = previous
+        return hops
+
+    def edges(self, node: int) -> range:
+        """Get the positions of the routes leaving a node in the per-edge arrays."""
+        return range(int(self.offsets[node]), int(self.offsets[node + 1]))
+
+    def edge_info(self, edge: int) -> dict:
+        """
+        Describe one route.
+
+        Args:
+            edge (int): Position of the route in the per-edge arrays.
+
+        Returns:
+            dict: The destination, airline id, stops, codeshare flag and equipment of the route.
+        """
+        return {
+            "destination": self.codes[self.targets[edge]],
+            "airline_id": int(self.airline_ids[edge]),
+            "stops": int(self.stops[edge]),
+            "codeshare": bool(self.codeshare[edge]),
+            "equipment": self.equipment_names[self.equipment_codes[edge]],
+        }
@@ -1,18 +1,57 @@
 import os
-from utils.loader import load_dataset
+import time
+from collections.abc import Sequence
+from typing import Optional
+from servers.flights.helpers.route_graph import RouteGraph
+from utils.columnar import ColumnarTable
+from utils.registry import DatasetSnapshot, get_dataset
 
 HEADERS_ROUTES = ["airline","airline_id","source_airport","source_airport_id","destination_airport","destination_airport_id","codeshare","stops","equipment"]
 FILENAME_ROUTES = "routes.dat"
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dataset")
+ROUTE_SEARCH_TIME_BUDGET = 1.0
+MAX_PATHS = 100
+SCHEMA_ROUTES = {"airline": str, "source_airport": str, "destination_airport": str, "airline_id": int, "stops": int, "codeshare": str, "equipment": str}
 
-def get_routes() -> list[dict]:
+def get_routes_snapshot() -> DatasetSnapshot:
+    """Get the shared snapshot of the routes dataset, parsed once per process.
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the routes dataset.
+    """
+    dataset_path = os.path.join(DATASET_DIR, FILENAME_ROUTES)
+    return get_dataset(dataset_path, HEADERS_ROUTES)
+
+def get_routes() -> Sequence[dict]:
     """
     Load the routes dataset.
 
     Returns:
-        list[dict]: A list of routes with their details.
+        Sequence[dict]: A list of routes with their details.
+    """
+    return get_routes_snapshot().rows
+
+def get_routes_table() -> ColumnarTable:
+    """Get the typed columnar view of the routes dataset.
+
+    Returns:
+        ColumnarTable: The routes with typed airport, airline and stop columns.
+    """
+    return get_routes_snapshot().table(SCHEMA_ROUTES)
+
+def get_route_graph(snapshot: Optional[DatasetSnapshot] = None) -> RouteGraph:
     """
-    dataset_path = os.path.join(os.path.dirname(__file__), "dataset", FILENAME_ROUTES)
-    return load_dataset(dataset_path, HEADERS_ROUTES)
+    Get the CSR route graph, built once per snapshot of the routes dataset.
+
+    Args:
+        snapshot (Optional[DatasetSnapshot]): The routes snapshot to get it for (default: the current one).
+
+    Returns:
+        RouteGraph: The route graph.
+    """
+    if snapshot is None:
+        snapshot = get_routes_snapshot()
+    return snapshot.derive("graph", lambda s: RouteGraph(s.table(SCHEMA_ROUTES)))
 
 def destinations_from_airport(source_iata: str) -> list[str]:
     """Get a list of destination IATA codes from a specific source airport.
@@ -23,49 +62,91 @@ def destinations_from_airport(source_iata: str) -> list[str]:
     Returns:
         list[str]: A list of destination IATA codes.
     """
-    routes = get_routes()
-    s = source_iata.upper()
-    dest_codes: list[str] = []
-    for r in routes:
-        if r.get("source_airport", "").upper() == s:
-            dest = r.get("destination_airport", "")
-            if dest:
-                dest_codes.append(dest.upper())
-    return sorted(set(dest_codes))
-
-def find_route_paths(source_iata: str, destination_iata: str, max_hops: int = 2) -> list[list[str]]:
-    """Find all possible route paths from a source airport to a destination airport.
+    return destinations_from_airports([source_iata])[source_iata]
+
+def destinations_from_airports(source_codes: Sequence[str]) -> dict[str, list[str]]:
+    """Get the destination IATA codes of several source airports.
+
+    Args:
+        source_codes (Sequence[str]): The IATA codes of the source airports.
+
+    Returns:
+        dict[str, list[str]]: The destinations of every source airport, keyed as given.
+    """
+    graph = get_route_graph()
+    destinations = {}
+    for code in source_codes:
+        node = graph.node(code)
+        destinations[code] = sorted(graph.codes[n] for n in graph.successors(node)) if node is not None else []
+    return destinations
+
+def find_route_paths(source_iata: str, destination_iata: str, max_hops: int = 2, limit: int = 25, time_budget: float = ROUTE_SEARCH_TIME_BUDGET) -> dict:
+    """Find route paths from a source airport to a destination airport, shortest first.
+
+    A backward breadth-first search from the destination gives, for every airport, the minimum
+    number of flights still needed. Paths are then enumerated forward from the source by
+    increasing length, only ever stepping onto airports that can still reach the destination
+    within the remaining hops, so every branch explored leads to a result. The search stops
+    after `limit` paths (clamped to 1..MAX_PATHS) or `time_budget` seconds.
 
     Args:
         source_iata (str): The IATA code of the source airport.
         destination_iata (str): The IATA code of the destination airport.
         max_hops (int, optional): The maximum number of hops allowed. Defaults to 2.
+        limit (int, optional): The maximum number of paths to return (at most MAX_PATHS). Defaults to 25.
+        time_budget (float, optional): The maximum search time in seconds.
 
     Returns:
-        list[list[str]]: A list of all possible route paths.
+        dict: The paths found ("paths"), shortest first, and whether the search stopped before
+        finding every path ("truncated").
     """
-    routes = get_routes()
+    graph = get_route_graph()
     source = source_iata.upper()
     dest = destination_iata.upper()
-    adj: dict[str, set[str]] = {}
-    for r in routes:
-        s = r.get("source_airport", "").upper()
-        d = r.get("destination_airport", "").upper()
-        if not s or not d:
-            continue
-        adj.setdefault(s, set()).add(d)
+    limit = max(1, min(limit, MAX_PATHS))
+    if source == dest:
+        return {"paths": [[source]] if max_hops >= 0 else [], "truncated": False}
+    source_id = graph.node(source)
+    target = graph.node(dest)
+    if source_id is None or target is None or max_hops < 1:
+        return {"paths": [], "truncated": False}
+
+    hops_to_target = graph.hops_to(target, max_hops)
+    shortest = int(hops_to_target[source_id])
+    if shortest > max_hops:
+        return {"paths": [], "truncated": False}
+
+    deadline = time.perf_counter() + time_budget
     paths: list[list[str]] = []
-    def dfs(current: str, target: str, hops_left: int, visited: list[str]):
-        if hops_left < 0:
-            return
-        if current == target:
-            paths.append(visited.copy())
-            return
-        for nxt in adj.get(current, []):
-            if nxt in visited:
+    truncated = False
+
+    def extend(path: list[int], on_path: set[int], hops_left: int) -> bool:
+        """Extend a partial path with exactly `hops_left` more flights; returns False to stop the search."""
+        nonlocal truncated
+        current = path[-1]
+        if hops_left == 0:
+            if len(paths) >= limit:
+                truncated = True
+                return False
+            paths.append([graph.codes[n] for n in path])
+            return True
+        if time.perf_counter() > deadline:
+            truncated = True
+            return False
+        successors = graph.successors(current)
+        for nxt in successors[hops_to_target[successors] <= hops_left - 1].tolist():
+            if nxt in on_path or (nxt == target and hops_left > 1):
                 continue
-            visited.append(nxt)
-            dfs(nxt, target, hops_left - 1, visited)
-            visited.pop()
-    dfs(source, dest, max_hops, [source])
-    return paths
\ No newline at end of file
+            path.append(nxt)
+            on_path.add(nxt)
+            keep_going = extend(path, on_path, hops_left - 1)
+            path.pop()
+            on_path.discard(nxt)
+            if not keep_going:
+                return False
+        return True
+
+    for length in range(shortest, max_hops + 1):
+        if not extend([source_id], {source_id}, length):
+            break
+    return {"paths": paths, "truncated": truncated}
@@ -0,0 +1,103 @@
+"""Shared fixtures of the test suite.
+
+Run from the `instrutor` folder, so that `servers` and `utils` are importable:
+
+    python -m pytest tests
+"""
+import json
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    body: Any
+    headers: dict[str, str]
+    client_port: int
+
+
+# A route answers a request with a status code and a JSON body
+Route = Callable[[Request], tuple[int, Any]]
+
+
+class StandInServer:
+    """Local HTTP server standing in for an upstream API.
+
+    Requests are answered by the route registered for their method and path (404 otherwise),
+    after `delay` seconds, and recorded in `requests`.
+    """
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], Route] = {}
+        self.requests: list[Request] = []
+        self.delay = 0.0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._answer(None)
+
+            def do_POST(self):
+                self._answer(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+
+            def _answer(self, body: Any):
+                url = urlparse(self.path)
+                query = {name: values[0] for name, values in parse_qs(url.query).items()}
+                request = Request(self.command, url.path, query, body, dict(self.headers), self.client_address[1])
+                server.requests.append(request)
+                time.sleep(server.delay)
+                route = server.routes.get((self.command, url.path))
+                status, payload = route(request) if route else (404, {"error": "not found"})
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up waiting (timeout tests)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def route(self, method: str, path: str, answer: Route) -> None:
+        self.routes[(method, path)] = answer
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def stand_in_server():
+    server = StandInServer()
+    server.start()
+    yield server
+    server.stop()
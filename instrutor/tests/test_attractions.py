@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+
+from servers.city import city
+from servers.city.helpers import attractions
+from utils.async_cache import AsyncTTLCache
+
+pytestmark = pytest.mark.anyio
+
+API_KEY = "test-key"
+
+
+def search(request):
+    results = [{"title": f"Attraction {i}", "url": f"https://example.com/{i}", "score": 1.0} for i in range(request.body["max_results"])]
+    return 200, {"query": request.body["query"], "results": results}
+
+
+@pytest.fixture
+async def search_api(stand_in_server, monkeypatch, tmp_path):
+    stand_in_server.route("POST", attractions.SEARCH_PATH, search)
+    monkeypatch.setattr(attractions, "TAVILY_API_BASE_URL", stand_in_server.url)
+    monkeypatch.setattr(attractions, "ATTRACTIONS_CACHE", AsyncTTLCache(ttl=attractions.ATTRACTIONS_TTL))
+    monkeypatch.setattr(attractions, "ATTRACTIONS_DISK_CACHE", attractions.SearchResultCache(str(tmp_path / "attractions.sqlite3")))
+    await attractions.close_http_client()
+    yield stand_in_server
+    await attractions.close_http_client()
+    attractions.ATTRACTIONS_DISK_CACHE.close()
+
+
+async def test_search_posts_the_query_with_the_api_key(search_api):
+    response = await attractions.search_trending_attractions("Lisbon", API_KEY, max_results=3)
+
+    assert response["query"] == "Lisbon trending attractions"
+    assert len(response["results"]) == 3
+    (request,) = search_api.requests
+    assert request.method == "POST"
+    assert request.body == {"query": "Lisbon trending attractions", "max_results": 3}
+    assert request.headers["Authorization"] == f"Bearer {API_KEY}"
+
+
+async def test_every_search_sends_the_api_key_it_is_given(search_api):
+    await attractions.search_trending_attractions("Lisbon", "first-key")
+    await attractions.search_trending_attractions("Porto", "second-key")
+
+    assert [r.headers["Authorization"] for r in search_api.requests] == ["Bearer first-key", "Bearer second-key"]
+
+
+async def test_max_results_is_clamped(search_api):
+    response = await attractions.search_trending_attractions("Lisbon", API_KEY, max_results=50)
+
+    assert len(response["results"]) == attractions.MAX_ATTRACTIONS
+
+
+async def test_pooled_client_is_reused_across_searches(search_api):
+    client = attractions.get_http_client()
+    for city in ("Lisbon", "Porto", "Madrid"):
+        await attractions.search_trending_attractions(city, API_KEY)
+
+    assert attractions.get_http_client() is client
+    # Every search went over the same kept-alive connection
+    assert len(search_api.requests) == 3
+    assert len({r.client_port for r in search_api.requests}) == 1
+
+
+async def test_concurrent_identical_searches_share_one_request(search_api):
+    search_api.delay = 0.2
+
+    responses = await asyncio.gather(*(attractions.search_trending_attractions("Lisbon", API_KEY) for _ in range(10)))
+
+    assert len(search_api.requests) == 1
+    assert all(response == responses[0] for response in responses)
+
+
+async def test_responses_survive_a_restart_in_the_disk_cache(search_api, monkeypatch):
+    first = await attractions.search_trending_attractions("Lisbon", API_KEY)
+    # A new process starts with an empty memory cache but the same database
+    monkeypatch.setattr(attractions, "ATTRACTIONS_CACHE", AsyncTTLCache(ttl=attractions.ATTRACTIONS_TTL))
+
+    again = await attractions.search_trending_attractions("  lisbon", API_KEY)
+
+    assert again == first
+    assert len(search_api.requests) == 1
+
+
+async def test_failed_searches_are_not_cached(search_api):
+    search_api.route("POST", attractions.SEARCH_PATH, lambda request: (500, {"detail": {"error": "unavailable"}}))
+    with pytest.raises(httpx.HTTPStatusError):
+        await attractions.search_trending_attractions("Lisbon", API_KEY)
+
+    search_api.route("POST", attractions.SEARCH_PATH, search)
+    response = await attractions.search_trending_attractions("Lisbon", API_KEY)
+
+    assert len(response["results"]) == 5
+    assert len(search_api.requests) == 2
+
+
+async def test_search_without_api_key_sends_no_authorization(search_api):
+    await attractions.search_trending_attractions("Lisbon", None)
+
+    (request,) = search_api.requests
+    assert "authorization" not in {name.lower() for name in request.headers}
+
+
+async def test_http_error_becomes_a_clean_tool_error(search_api, monkeypatch):
+    monkeypatch.setattr(city, "TAVILY_API_KEY", API_KEY)
+    search_api.route("POST", attractions.SEARCH_PATH, lambda request: (401, {"detail": {"error": "Unauthorized"}}))
+
+    result = await city.get_trending_attractions.fn("Lisbon")
+
+    assert result == {"error": "Search service returned HTTP 401"}
+
+
+async def test_timeout_becomes_a_clean_tool_error(search_api, monkeypatch):
+    monkeypatch.setattr(attractions, "TAVILY_TIMEOUT", httpx.Timeout(0.2))
+    search_api.delay = 1.0
+
+    result = await city.get_trending_attractions.fn("Lisbon")
+
+    assert result == {"error": "Search service unavailable (ReadTimeout)"}
@@ -0,0 +1,59 @@
+import pytest
+
+from servers.accommodations.helpers import hotels
+from utils.snapshot import encode_columns
+from utils.star_schema import StarSchema
+
+STARS = {"three": "3", "half": "3.5", "four": "4", "unrated": ""}
+
+
+def booking(hotel_id: str, stars: str) -> dict:
+    return {
+        "hotel_id": hotel_id,
+        "addresscountryname": "Portugal",
+        "city_actual": "Lisbon",
+        "neighbourhood": "Baixa",
+        "accommodationtype": "_ACCOM_TYPE@Hotel",
+        "starrating": stars,
+        "guestreviewsrating": "4.2 /5",
+        "center1distance": "1.0 miles",
+        "center1label": "City centre",
+        "price": "300",
+        "price_night": "price for 3 nights",
+        "offer": "0",
+        "year": "2024",
+        "month": "5",
+        "weekend": "0",
+        "holiday": "0",
+    }
+
+
+@pytest.fixture
+def star_schema(monkeypatch):
+    rows = [booking(hotel_id, stars) for hotel_id, stars in STARS.items()]
+    schema = StarSchema(
+        encode_columns(rows, list(rows[0])),
+        "hotel_id",
+        hotels.HOTEL_DIMENSION_ATTRIBUTES,
+        hotels.HOTEL_DIMENSION_SCHEMA,
+        hotels.HOTEL_FACT_MEASURES,
+    )
+    monkeypatch.setattr(hotels, "get_hotel_star_schema", lambda snapshot=None: schema)
+    monkeypatch.setattr(hotels, "get_hotel_prices_per_night", lambda: schema.dimension_mean(schema.facts["price"] / schema.facts["price_night"]))
+    return schema
+
+
+def test_half_stars_rank_between_whole_stars(star_schema):
+    result = hotels.rank_hotels(weights={"stars": 1.0}, k=10)
+
+    ranked = [(hotel["hotel_id"], hotel["score"]) for hotel in result["hotels"]]
+    assert ranked == [("four", 1.0), ("half", 0.5), ("three", 0.0), ("unrated", 0.0)]
+
+
+def test_price_trends_keep_half_stars_apart(star_schema, monkeypatch):
+    monkeypatch.setattr(hotels, "get_hotel_price_cube", lambda: hotels.build_hotel_price_cube(None))
+
+    result = hotels.get_hotel_price_trends(group_by=["star_rating"])
+
+    assert [(group["star_rating"], group["bookings"]) for group in result["groups"]] == [(3.0, 1), (3.5, 1), (4.0, 1), (None, 1)]
+    assert hotels.get_hotel_price_trends(star_rating=3.5)["bookings"] == 1
@@ -0,0 +1,124 @@
+import httpx
+import pytest
+
+from servers.city import city
+from servers.city.helpers import weather
+from servers.city.helpers.geocoding import GeocodeCache
+from utils.async_cache import AsyncTTLCache
+
+pytestmark = pytest.mark.anyio
+
+API_KEY = "test-key"
+LOCATIONS = {"Lisbon": (38.72, -9.14), "Porto": (41.15, -8.61), "Broken": (1.0, 1.0)}
+
+
+def current_weather(temp: float, conditions: list) -> dict:
+    return {"current": {"temp": temp, "feels_like": temp - 1, "weather": conditions}}
+
+
+def geocode(request):
+    location = LOCATIONS.get(request.query["q"])
+    return 200, [{"lat": location[0], "lon": location[1]}] if location else []
+
+
+def onecall(request):
+    if float(request.query["lat"]) == LOCATIONS["Broken"][0]:
+        return 200, current_weather(20.0, [])
+    return 200, current_weather(float(request.query["lat"]), [{"main": "Clear", "description": "clear sky"}])
+
+
+@pytest.fixture
+async def weather_api(stand_in_server, monkeypatch):
+    stand_in_server.route("GET", weather.GEOCODE_PATH, geocode)
+    stand_in_server.route("GET", weather.ONECALL_PATH, onecall)
+    monkeypatch.setattr(weather, "WEATHER_API_BASE_URL", stand_in_server.url)
+    monkeypatch.setattr(weather, "GEOCODE_CACHE", GeocodeCache(":memory:"))
+    monkeypatch.setattr(weather, "WEATHER_CACHE", AsyncTTLCache(ttl=0))
+    monkeypatch.setattr(city, "WEATHER_API_KEY", API_KEY)
+    await weather.close_http_client()
+    yield stand_in_server
+    await weather.close_http_client()
+
+
+async def test_city_weather_geocodes_then_calls_onecall(weather_api):
+    result = await weather.get_city_weather("Lisbon", API_KEY)
+
+    assert result == {
+        "temperature": 38.72,
+        "temperature_feels_like": 37.72,
+        "temperature_min": 38.72,
+        "temperature_max": 38.72,
+        "main_condition": "Clear",
+        "condition_description": "clear sky",
+    }
+    first, second = weather_api.requests
+    assert (first.path, first.query["q"], first.query["appid"]) == (weather.GEOCODE_PATH, "Lisbon", API_KEY)
+    assert (second.path, second.query["lat"], second.query["lon"]) == (weather.ONECALL_PATH, "38.72", "-9.14")
+    assert second.query["units"] == "metric"
+
+
+async def test_geocoded_coordinates_are_cached(weather_api):
+    await weather.get_city_weather("Lisbon", API_KEY)
+    await weather.get_city_weather("lisbon ", API_KEY)
+
+    assert [r.path for r in weather_api.requests] == [weather.GEOCODE_PATH, weather.ONECALL_PATH, weather.ONECALL_PATH]
+
+
+async def test_current_weather_is_cached_per_location(weather_api, monkeypatch):
+    monkeypatch.setattr(weather, "WEATHER_CACHE", AsyncTTLCache(ttl=60))
+
+    first = await weather.get_city_weather("Lisbon", API_KEY)
+    again = await weather.get_city_weather("Lisbon", API_KEY)
+
+    assert again == first
+    assert [r.path for r in weather_api.requests] == [weather.GEOCODE_PATH, weather.ONECALL_PATH]
+
+
+async def test_pooled_client_is_reused_across_calls(weather_api):
+    client = weather.get_http_client()
+    for name in ("Lisbon", "Porto", "Lisbon"):
+        await weather.get_city_weather(name, API_KEY)
+
+    assert weather.get_http_client() is client
+    # Every request went over the same kept-alive connection
+    assert len(weather_api.requests) == 5
+    assert len({r.client_port for r in weather_api.requests}) == 1
+
+
+async def test_timeout_becomes_a_city_error(weather_api, monkeypatch):
+    monkeypatch.setattr(weather, "WEATHER_TIMEOUT", httpx.Timeout(0.2))
+    weather_api.delay = 1.0
+
+    result = await weather.get_weather_for_cities(["Lisbon"], API_KEY)
+
+    assert result == {"count": 0, "weather": {}, "errors": {"Lisbon": "Weather service unavailable (ReadTimeout)"}}
+
+
+async def test_http_error_becomes_a_clean_tool_error(weather_api):
+    weather_api.route("GET", weather.GEOCODE_PATH, lambda request: (401, {"message": "Invalid API key"}))
+
+    result = await city.get_weather_data.fn("Lisbon")
+
+    assert result == {"error": "Weather service returned HTTP 401"}
+
+
+async def test_unknown_city_becomes_a_clean_tool_error(weather_api):
+    result = await city.get_weather_data.fn("Atlantis")
+
+    assert result == {"error": "City 'Atlantis' not found"}
+
+
+async def test_batch_keeps_partial_results_with_per_city_errors(weather_api):
+    weather_api.route("GET", weather.ONECALL_PATH, lambda request: (500, {}) if request.query["lat"] == "41.15" else onecall(request))
+
+    result = await weather.get_weather_for_cities(["Lisbon", "Porto", "Broken", "Atlantis", "Lisbon"], API_KEY)
+
+    assert result["count"] == 1
+    assert result["weather"]["Lisbon"]["temperature"] == 38.72
+    assert result["errors"] == {
+        "Porto": "Weather service returned HTTP 500",
+        "Broken": "Unexpected response from the weather service",
+        "Atlantis": "City 'Atlantis' not found",
+    }
+    # Error messages never carry the request URL, and with it the API key
+    assert all(API_KEY not in message for message in result["errors"].values())
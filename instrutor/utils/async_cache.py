@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    """In-memory TTL cache for the results of async fetches, with request coalescing.
+
+    - A value is fresh for `ttl` seconds after it was fetched and is returned as is.
+    - For `stale_ttl` more seconds it is stale: it is still returned immediately, but a background
+      task fetches a new value (stale-while-revalidate). If that refresh fails, the stale value
+      keeps being served until it expires.
+    - Concurrent misses for the same key share a single fetch; every caller gets its result (or
+      its exception). The fetch runs as its own task, so a caller that gives up does not cancel
+      it for the others.
+
+    At most `max_entries` values are kept, least recently used first out. Counters of hits,
+    stale hits, misses, coalesced calls and failed refreshes are returned by `stats`.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refresh_errors = 0
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Get the value of a key, fetching it if it is missing or expired.
+
+        Args:
+            key (Hashable): The cache key.
+            fetch (Callable[[], Awaitable[Any]]): Fetches the current value of the key.
+
+        Returns:
+            Any: The cached or fetched value; the exceptions of the fetch are raised here.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._start_fetch(key, fetch, refresh=True)
+                return value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._start_fetch(key, fetch, refresh=False)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], refresh: bool) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._fetch_done(key, t, refresh))
+        return task
+
+    async def _load(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def _fetch_done(self, key: Hashable, task: asyncio.Task, refresh: bool) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        # Retrieving the exception also keeps asyncio from warning about failures nobody awaited
+        error = task.exception()
+        if error is not None and refresh:
+            self.refresh_errors += 1
+            logger.warning("Background refresh of %r failed: %s", key, error)
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Drop one cached value, or all of them."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        """Get the cache counters and current size."""
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refresh_errors": self.refresh_errors,
+            "hit_ratio": round((self.hits + self.stale_hits + self.coalesced) / lookups, 3) if lookups else None,
+        }
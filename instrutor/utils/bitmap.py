@@ -0,0 +1,79 @@
+from collections.abc import Hashable, Sequence
+from typing import Callable, Iterable
+
+import numpy as np
+
+# Bitmaps are NumPy uint8 arrays of packed bits (`np.packbits`, big-endian within each byte),
+# one bit per row. Predicates combine with the plain bitwise operators (`a & b`, `a | b`,
+# `~a & full(n)`), eight rows per byte.
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def empty(size: int) -> np.ndarray:
+    """Get a bitmap of `size` rows with no row set."""
+    return np.zeros((size + 7) // 8, dtype=np.uint8)
+
+
+def full(size: int) -> np.ndarray:
+    """Get a bitmap of `size` rows with every row set (the padding bits stay clear)."""
+    return np.packbits(np.ones(size, dtype=bool))
+
+
+def from_ids(ids: np.ndarray, size: int) -> np.ndarray:
+    """Build the bitmap of a set of row ids."""
+    mask = np.zeros(size, dtype=bool)
+    mask[ids] = True
+    return np.packbits(mask)
+
+
+def to_ids(bitmap: np.ndarray, size: int) -> np.ndarray:
+    """Get the ids of the rows set in a bitmap, in ascending order."""
+    return np.flatnonzero(np.unpackbits(bitmap, count=size))
+
+
+def count(bitmap: np.ndarray) -> int:
+    """Count the rows set in a bitmap."""
+    return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+
+class BitmapIndex:
+    """Bitmap index over a low-cardinality column: one packed bitmap per distinct value.
+
+    Built from the value code of every row (e.g. the codes of a dictionary-encoded column) and
+    the list of distinct values. Selecting the rows with a value, or with any of several values,
+    is then a lookup or an OR of bitmaps, and combining predicates over several columns is an AND.
+    """
+
+    def __init__(self, codes: np.ndarray, values: Sequence[Hashable]):
+        self.size = len(codes)
+        self.values = list(values)
+        self._positions = {v: i for i, v in enumerate(self.values)}
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self.values) + 1))
+        self._bitmaps = [from_ids(order[bounds[i]:bounds[i + 1]], self.size) for i in range(len(self.values))]
+
+    @classmethod
+    def from_numbers(cls, values: np.ndarray) -> "BitmapIndex":
+        """Build the index of a numeric column; NaN values are left out of every bitmap."""
+        known = ~np.isnan(values)
+        distinct, inverse = np.unique(values[known], return_inverse=True)
+        codes = np.full(len(values), len(distinct), dtype=np.int64)
+        codes[known] = inverse
+        return cls(codes, [float(v) for v in distinct])
+
+    def bitmap(self, value: Hashable) -> np.ndarray:
+        """Get the bitmap of the rows with a value (no row set for an unknown value)."""
+        position = self._positions.get(value)
+        return self._bitmaps[position] if position is not None else empty(self.size)
+
+    def any_of(self, values: Iterable[Hashable]) -> np.ndarray:
+        """Get the bitmap of the rows with any of the given values."""
+        result = empty(self.size)
+        for value in values:
+            result |= self.bitmap(value)
+        return result
+
+    def where(self, predicate: Callable[[Hashable], bool]) -> np.ndarray:
+        """Get the bitmap of the rows whose value satisfies a predicate, tested once per distinct value."""
+        return self.any_of(v for v in self.values if predicate(v))
@@ -0,0 +1,195 @@
+import math
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import numpy as np
+
+from utils.bitmap import BitmapIndex
+from utils.sorted_index import SortedIndex
+from utils.text_index import SubstringIndex
+
+# A schema maps a column name to its type. `str` keeps the column as dictionary-encoded
+# strings (categorical); any other callable converts a raw string to a number, and values
+# it cannot convert are stored as NaN.
+Schema = dict[str, Callable[[str], Any]]
+
+
+def as_flag(*true_values: str) -> Callable[[str], float]:
+    """Build a converter that maps the given (case-insensitive) strings to 1 and anything else to 0."""
+    accepted = {v.lower() for v in true_values}
+
+    def convert(value: str) -> float:
+        return 1.0 if value.lower() in accepted else 0.0
+
+    return convert
+
+
+def encode(values: Iterable[str], count: int) -> tuple[np.ndarray, list[str]]:
+    """Dictionary-encode a sequence of strings.
+
+    Args:
+        values (Iterable[str]): The raw values.
+        count (int): Number of values.
+
+    Returns:
+        tuple[np.ndarray, list[str]]: An int32 code per value and the list of distinct values.
+    """
+    index: dict[str, int] = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=count)
+    return codes, list(index)
+
+
+def _convert(converter: Callable[[str], Any], value: str) -> float:
+    try:
+        return float(converter(value))
+    except (ValueError, TypeError):
+        return math.nan
+
+
+def to_numbers(codes: np.ndarray, categories: Sequence[str], kind: Callable[[str], Any]) -> np.ndarray:
+    """Convert a dictionary-encoded column to numbers, converting every distinct value once (NaN when it cannot be converted)."""
+    lookup = np.array([_convert(kind, c) for c in categories], dtype=np.float64)
+    return lookup[codes] if len(categories) else np.empty(0, dtype=np.float64)
+
+
+class ColumnarTable:
+    """Typed, column-oriented view over the rows of a dataset.
+
+    Columns declared in the schema are coerced once, at construction, into NumPy arrays so that
+    queries can be written as vectorized masks. The original row dicts are kept and returned by
+    `take`, so callers still get the same dictionaries as before. Columns that were already
+    dictionary-encoded (e.g. by a binary snapshot) can be passed in `encoded` to skip the encoding.
+    """
+
+    def __init__(self, rows: Sequence[dict], schema: Schema, encoded: Optional[dict[str, tuple[np.ndarray, list[str]]]] = None):
+        self.rows = rows
+        self.schema = schema
+        self._codes: dict[str, np.ndarray] = {}
+        self._categories: dict[str, list[str]] = {}
+        self._values: dict[str, np.ndarray] = {}
+        self._text_indexes: dict[str, SubstringIndex] = {}
+        self._bitmap_indexes: dict[str, BitmapIndex] = {}
+        self._sorted_indexes: dict[str, SortedIndex] = {}
+        for name, kind in schema.items():
+            if encoded is not None and name in encoded:
+                codes, categories = encoded[name]
+            else:
+                codes, categories = encode(((r.get(name) or "") for r in rows), len(rows))
+            if kind is str:
+                self._codes[name] = codes
+                self._categories[name] = categories
+            else:
+                self._values[name] = to_numbers(codes, categories, kind)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def values(self, name: str) -> np.ndarray:
+        """Get a numeric column as a float64 array (NaN where the value could not be converted)."""
+        return self._values[name]
+
+    def codes(self, name: str) -> np.ndarray:
+        """Get the int32 category codes of a string column."""
+        return self._codes[name]
+
+    def categories(self, name: str) -> list[str]:
+        """Get the distinct values of a string column, indexed by code."""
+        return self._categories[name]
+
+    def match(self, name: str, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Build a boolean mask of the rows whose string value satisfies a predicate.
+
+        The predicate is evaluated once per distinct value, not once per row.
+
+        Args:
+            name (str): The string column to test.
+            predicate (Callable[[str], bool]): Test applied to each distinct value.
+
+        Returns:
+            np.ndarray: Boolean mask over the rows.
+        """
+        accepted = np.array([predicate(c) for c in self._categories[name]], dtype=bool)
+        if not len(accepted):
+            return np.zeros(len(self.rows), dtype=bool)
+        return accepted[self._codes[name]]
+
+    def search(self, name: str, needle: str) -> np.ndarray:
+        """Get the ids of the rows whose string value contains the needle (case-insensitive).
+
+        Backed by a trigram index over the distinct values of the column, built on first use.
+
+        Args:
+            name (str): The string column to search.
+            needle (str): The substring to look for.
+
+        Returns:
+            np.ndarray: Matching row ids, in ascending (file) order.
+        """
+        return self._text_index(name).rows(needle)
+
+    def count(self, name: str, needle: str) -> int:
+        """Count the rows whose string value contains the needle (case-insensitive), without listing them."""
+        return self._text_index(name).count(needle)
+
+    def matching(self, name: str, needle: str) -> list[int]:
+        """Get the codes of the distinct values of a string column that contain the needle (case-insensitive).
+
+        Args:
+            name (str): The string column to search.
+            needle (str): The substring to look for.
+
+        Returns:
+            list[int]: Matching codes, in ascending order.
+        """
+        return self._text_index(name).matching_values(needle)
+
+    def _text_index(self, name: str) -> SubstringIndex:
+        index = self._text_indexes.get(name)
+        if index is None:
+            index = self._text_indexes[name] = SubstringIndex(self._categories[name], self._codes[name])
+        return index
+
+    def bitmap(self, name: str) -> BitmapIndex:
+        """Get the bitmap index of a low-cardinality column, built on first use.
+
+        String columns are indexed by value, numeric columns by number (NaN rows are in no bitmap).
+
+        Args:
+            name (str): The column to index.
+
+        Returns:
+            BitmapIndex: One packed bitmap per distinct value of the column.
+        """
+        index = self._bitmap_indexes.get(name)
+        if index is None:
+            if name in self._codes:
+                index = BitmapIndex(self._codes[name], self._categories[name])
+            else:
+                index = BitmapIndex.from_numbers(self._values[name])
+            self._bitmap_indexes[name] = index
+        return index
+
+    def sorted(self, name: str) -> SortedIndex:
+        """Get the sorted index of a numeric column, built on first use.
+
+        Args:
+            name (str): The numeric column to index.
+
+        Returns:
+            SortedIndex: The row ids ordered by the values of the column.
+        """
+        index = self._sorted_indexes.get(name)
+        if index is None:
+            index = self._sorted_indexes[name] = SortedIndex(self._values[name])
+        return index
+
+    def take(self, ids: Sequence[int], limit: Optional[int] = None, offset: int = 0) -> list[dict]:
+        """Get the row dicts at the given positions, optionally skipping the first `offset` and keeping only the next `limit`."""
+        offset = max(0, offset)
+        ids = ids[offset:offset + limit] if limit is not None else ids[offset:]
+        return [self.rows[i] for i in ids]
+
+
+def positive(values: np.ndarray) -> np.ndarray:
+    """Get a copy of a numeric array with the values that are not positive replaced by NaN."""
+    return np.where(values > 0, values, np.nan)
+
@@ -0,0 +1,103 @@
+from collections.abc import Hashable, Iterable, Sequence
+from typing import Callable, Optional
+
+import numpy as np
+
+
+def encode_numbers(values: np.ndarray, label: Callable[[float], Hashable] = int) -> tuple[np.ndarray, list]:
+    """Code a numeric column by its distinct values, in ascending order.
+
+    Args:
+        values (np.ndarray): The values; NaN values get a last code labelled None.
+        label (Callable[[float], Hashable]): Converts a distinct value to its label.
+
+    Returns:
+        tuple[np.ndarray, list]: The code of every value and the label of every code.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    known = ~np.isnan(values)
+    distinct = np.unique(values[known])
+    codes = np.full(len(values), len(distinct), dtype=np.int64)
+    codes[known] = np.searchsorted(distinct, values[known])
+    labels = [label(v) for v in distinct.tolist()]
+    if not known.all():
+        labels.append(None)
+    return codes, labels
+
+
+class Cube:
+    """Pre-aggregated cube of a measure over every combination of some dimensions.
+
+    Built in one pass: every row falls in the cell of its dimension values, and every non-empty
+    cell keeps the count, sum, min and max of the measure (rows without a measure are left out).
+    Any roll-up (filtering some dimensions, grouping by others) is then answered by merging
+    cells, whose number is bounded by the product of the dimension sizes, not by the rows.
+
+    Args:
+        dimensions (dict[str, tuple[np.ndarray, Sequence[Hashable]]]): The code of every row and
+            the label of every code, for every dimension.
+        values (np.ndarray): The measure of every row (NaN when missing).
+    """
+
+    def __init__(self, dimensions: dict[str, tuple[np.ndarray, Sequence[Hashable]]], values: np.ndarray):
+        self.labels = {name: list(labels) for name, (_, labels) in dimensions.items()}
+        self._positions = {name: {label: i for i, label in enumerate(labels)} for name, labels in self.labels.items()}
+        self._shape = tuple(max(1, len(labels)) for labels in self.labels.values())
+
+        known = ~np.isnan(values)
+        flat = np.ravel_multi_index([codes[known] for codes, _ in dimensions.values()], self._shape)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        measure = values[known]
+        self.coords = dict(zip(self.labels, np.unravel_index(cells, self._shape)))
+        self.count = np.bincount(inverse, minlength=len(cells))
+        self.sum = np.bincount(inverse, weights=measure, minlength=len(cells))
+        self.min = np.full(len(cells), np.inf)
+        self.max = np.full(len(cells), -np.inf)
+        np.minimum.at(self.min, inverse, measure)
+        np.maximum.at(self.max, inverse, measure)
+
+    def __len__(self) -> int:
+        return len(self.count)
+
+    def rollup(self, filters: Optional[dict[str, Iterable[Hashable]]] = None, group_by: Sequence[str] = ()) -> list[dict]:
+        """Aggregate the cells matching some filters, grouped by some dimensions.
+
+        Args:
+            filters (Optional[dict[str, Iterable[Hashable]]]): The accepted labels of some dimensions.
+            group_by (Sequence[str]): The dimensions to group by (none for a single total).
+
+        Returns:
+            list[dict]: One entry per non-empty group, in order of the group labels' codes: the
+            labels of the group and the count, min, max and average of the measure.
+        """
+        selected = np.ones(len(self), dtype=bool)
+        for name, labels in (filters or {}).items():
+            positions = self._positions[name]
+            accepted = np.zeros(len(positions) or 1, dtype=bool)
+            accepted[[positions[label] for label in labels if label in positions]] = True
+            selected &= accepted[self.coords[name]]
+        cells = np.flatnonzero(selected)
+        if not len(cells):
+            return []
+
+        shape = tuple(self._shape[list(self.labels).index(name)] for name in group_by)
+        keys = np.ravel_multi_index([self.coords[name][cells] for name in group_by], shape) if group_by else np.zeros(len(cells), dtype=np.int64)
+        groups, inverse = np.unique(keys, return_inverse=True)
+        count = np.bincount(inverse, weights=self.count[cells], minlength=len(groups))
+        total = np.bincount(inverse, weights=self.sum[cells], minlength=len(groups))
+        low = np.full(len(groups), np.inf)
+        high = np.full(len(groups), -np.inf)
+        np.minimum.at(low, inverse, self.min[cells])
+        np.maximum.at(high, inverse, self.max[cells])
+
+        coords = np.unravel_index(groups, shape) if group_by else ()
+        return [
+            {
+                **{name: self.labels[name][c[g]] for name, c in zip(group_by, coords)},
+                "count": int(count[g]),
+                "min": float(low[g]),
+                "max": float(high[g]),
+                "avg": float(total[g] / count[g]),
+            }
+            for g in range(len(groups))
+        ]
@@ -0,0 +1,137 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("thread", "process", "inline")
+
+
+class ToolExecutor:
+    """Runs the synchronous body of MCP tools off the asyncio event loop.
+
+    Tool handlers are `async def`, but the helpers they call are plain CPU-bound functions; called
+    directly they block the event loop and every other request the server is handling. `run` sends
+    the call to a worker pool instead and awaits its result.
+
+    Three kinds of pool are supported:
+
+    - "thread": a thread pool. Datasets are shared as they are; NumPy releases the GIL for the
+      vectorized queries, pure Python searches still take turns on it.
+    - "process": a process pool forked by `start` after the datasets were warmed up and before
+      the server starts serving, so every worker inherits the parsed snapshots and derived
+      indexes read-only (copy-on-write). The helper and its arguments and result must be
+      picklable.
+    - "inline": no pool, the helper runs on the event loop (the previous behaviour).
+
+    Every tool can also get a concurrency limit: at most that many calls of the tool run at once,
+    the others wait on the event loop without holding a worker, so a burst of slow searches cannot
+    take over the pool.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: Optional[int] = None, limits: Optional[dict[str, int]] = None, default_limit: Optional[int] = None):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind {kind!r}, expected one of {EXECUTOR_KINDS}")
+        self.kind = kind
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        # asyncio primitives belong to one event loop, so the limits are tracked per loop
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls, limits: Optional[dict[str, int]] = None) -> "ToolExecutor":
+        """Build an executor configured by environment variables.
+
+        TOOL_EXECUTOR selects the kind of pool ("thread", "process" or "inline", default
+        "thread"), TOOL_WORKERS its size and TOOL_CONCURRENCY the limit of the tools that have
+        none in `limits` (unlimited by default).
+
+        Args:
+            limits (Optional[dict[str, int]]): Concurrency limit of specific tools, by name.
+
+        Returns:
+            ToolExecutor: The configured executor.
+        """
+        workers = os.getenv("TOOL_WORKERS")
+        default_limit = os.getenv("TOOL_CONCURRENCY")
+        return cls(
+            kind=os.getenv("TOOL_EXECUTOR", "thread").lower(),
+            max_workers=int(workers) if workers else None,
+            limits=limits,
+            default_limit=int(default_limit) if default_limit else None,
+        )
+
+    def start(self) -> None:
+        """Start the worker pool now, before the server starts serving.
+
+        Call it after warm-up, from the server's `main`: in "process" mode the workers are all
+        forked here, so they inherit the loaded datasets but no server sockets or locks held by
+        requests in flight.
+        """
+        pool = self._get_pool(fork=True)
+        if self.kind == "process":
+            # A forked pool launches all its workers on its first submission
+            pool.submit(os.getpid).result()
+
+    def _get_pool(self, fork: bool = False) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    # Forking is only safe from `start`; a pool first needed while serving spawns
+                    # fresh workers instead, which load their datasets on first use
+                    method = "fork" if fork and "fork" in multiprocessing.get_all_start_methods() else "spawn"
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context(method))
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool")
+                logger.info("Started %s pool with %d workers", self.kind, self.max_workers)
+            return self._pool
+
+    def _semaphore(self, tool: str) -> Optional[asyncio.Semaphore]:
+        limit = self.limits.get(tool, self.default_limit)
+        if not limit:
+            return None
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        semaphore = semaphores.get(tool)
+        if semaphore is None:
+            semaphore = semaphores[tool] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def run(self, tool: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a helper off the event loop, within the concurrency limit of its tool.
+
+        Args:
+            tool (str): Name of the tool the call belongs to (used for its concurrency limit).
+            fn (Callable[..., Any]): The synchronous helper to run.
+            *args: Positional arguments of the helper.
+            **kwargs: Keyword arguments of the helper.
+
+        Returns:
+            Any: Whatever the helper returns; its exceptions are raised here.
+        """
+        semaphore = self._semaphore(tool)
+        if semaphore is None:
+            return await self._call(fn, args, kwargs)
+        async with semaphore:
+            return await self._call(fn, args, kwargs)
+
+    async def _call(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        if self.kind == "inline":
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool, if it was started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
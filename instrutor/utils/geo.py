@@ -0,0 +1,105 @@
+from typing import Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in kilometres between points given in degrees.
+
+    Works element-wise on scalars or NumPy arrays (broadcasting like any NumPy expression).
+
+    Args:
+        lat1, lon1: Latitude and longitude of the first point(s).
+        lat2, lon2: Latitude and longitude of the second point(s).
+
+    Returns:
+        np.ndarray: The distances, NaN where a coordinate is NaN.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoGrid:
+    """Fixed-size latitude/longitude grid over a set of points, for radius and nearest-k queries.
+
+    Points are bucketed into `cell_deg` x `cell_deg` cells and sorted by cell (row-major), so the
+    cells of one grid row that a query circle overlaps form a single contiguous slice found with
+    a binary search. Only the points in those slices get an exact haversine distance. Points with
+    NaN coordinates are left out.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, cell_deg: float = 1.0):
+        self.cell_deg = cell_deg
+        self.columns = int(np.ceil(360 / cell_deg))
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        ids = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        keys = self._cell_row(lat[ids]) * self.columns + self._cell_column(lon[ids])
+        order = np.argsort(keys, kind="stable")
+        self.ids = ids[order]
+        self.keys = keys[order]
+        self.lat = lat[self.ids]
+        self.lon = lon[self.ids]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell_row(self, lat: np.ndarray) -> np.ndarray:
+        return np.floor((np.clip(lat, -90.0, 90.0) + 90.0) / self.cell_deg).astype(np.int64)
+
+    def _cell_column(self, lon: np.ndarray) -> np.ndarray:
+        return np.floor(((lon + 180.0) % 360.0) / self.cell_deg).astype(np.int64) % self.columns
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Positions (in grid order) of the points in the cells a query circle may touch."""
+        reach_deg = np.degrees(radius_km / EARTH_RADIUS_KM)
+        if reach_deg >= 90.0:
+            return np.arange(len(self.ids))
+        first_row, last_row = self._cell_row(np.array([lat - reach_deg, lat + reach_deg]))
+        # Widest longitude span of the circle, reached at the latitude closest to a pole
+        widest_lat = np.radians(min(90.0, abs(lat) + reach_deg))
+        cos_lat = np.cos(widest_lat)
+        ratio = np.sin(np.radians(reach_deg)) / cos_lat if cos_lat > 1e-12 else np.inf
+        span_deg = np.degrees(np.arcsin(ratio)) if ratio < 1.0 else 180.0
+        if 2 * span_deg >= 360.0 - 2 * self.cell_deg:
+            column_ranges = [(0, self.columns - 1)]
+        else:
+            first_col, last_col = self._cell_column(np.array([lon - span_deg, lon + span_deg]))
+            if first_col <= last_col:
+                column_ranges = [(first_col, last_col)]
+            else:
+                # The circle crosses the antimeridian
+                column_ranges = [(first_col, self.columns - 1), (0, last_col)]
+        slices = []
+        for row in range(int(first_row), int(last_row) + 1):
+            for first, last in column_ranges:
+                start = np.searchsorted(self.keys, row * self.columns + first, side="left")
+                end = np.searchsorted(self.keys, row * self.columns + last, side="right")
+                if end > start:
+                    slices.append(np.arange(start, end))
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def nearest(self, lat: float, lon: float, radius_km: float, k: Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Find the points within a radius of a location, closest first.
+
+        Args:
+            lat (float): Latitude of the location, in degrees.
+            lon (float): Longitude of the location, in degrees.
+            radius_km (float): Search radius in kilometres.
+            k (Optional[int]): Keep only the k closest points.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The original ids of the points and their distances in km.
+        """
+        candidates = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        if k is not None and k < len(distances):
+            keep = np.argpartition(distances, k)[:k]
+            candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return self.ids[candidates[order]], distances[order]
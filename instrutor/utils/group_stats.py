@@ -0,0 +1,103 @@
+from collections.abc import Hashable, Sequence
+from typing import Optional
+
+import numpy as np
+
+from utils.quantiles import TDigest
+
+# Quantiles reported by `GroupStats.summary`, estimated from mergeable t-digests
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+class GroupStats:
+    """Materialized, mergeable statistics of a table grouped by a column.
+
+    Built in one vectorized pass over the rows. Every group keeps only mergeable aggregates:
+    its row count, the count, min, max and sum of some numeric columns with a quantile sketch
+    (`utils.quantiles.TDigest`) of each, the number of rows matching some masks, and value
+    histograms with the first row of every value. The statistics
+    of any set of groups are then merged from those aggregates without touching the rows, and
+    equal those computed over the union of their rows (histograms keep the order of first
+    appearance in the file).
+
+    Args:
+        groups (np.ndarray): The group of every row, numbered 0..n_groups-1.
+        n_groups (int): The number of groups.
+        summaries (dict[str, np.ndarray]): Numeric columns to summarize; NaN values are left out.
+        counts (dict[str, np.ndarray]): Boolean masks whose set rows are counted.
+        histograms (dict[str, tuple[np.ndarray, Sequence[Hashable]]]): Value codes of every row
+            (-1 to leave a row out) and the value of every code.
+    """
+
+    def __init__(
+        self,
+        groups: np.ndarray,
+        n_groups: int,
+        summaries: Optional[dict[str, np.ndarray]] = None,
+        counts: Optional[dict[str, np.ndarray]] = None,
+        histograms: Optional[dict[str, tuple[np.ndarray, Sequence[Hashable]]]] = None,
+    ):
+        self.n_groups = n_groups
+        self.rows = np.bincount(groups, minlength=n_groups)
+
+        self._summaries: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._digests: dict[str, list[Optional[TDigest]]] = {}
+        for name, values in (summaries or {}).items():
+            known = ~np.isnan(values)
+            g, v = groups[known], values[known]
+            mins, maxs = np.full(n_groups, np.inf), np.full(n_groups, -np.inf)
+            np.minimum.at(mins, g, v)
+            np.maximum.at(maxs, g, v)
+            self._summaries[name] = (np.bincount(g, minlength=n_groups), mins, maxs, np.bincount(g, weights=v, minlength=n_groups))
+            order = np.lexsort((v, g))
+            sorted_values = v[order]
+            bounds = np.searchsorted(g[order], np.arange(n_groups + 1))
+            self._digests[name] = [
+                TDigest.from_sorted(sorted_values[bounds[i]:bounds[i + 1]]) if bounds[i + 1] > bounds[i] else None
+                for i in range(n_groups)
+            ]
+
+        self._counts = {name: np.bincount(groups[mask], minlength=n_groups) for name, mask in (counts or {}).items()}
+
+        # Histogram entries sorted by (group, value); the entries of group g are [offsets[g], offsets[g + 1])
+        self._histograms: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list]] = {}
+        for name, (codes, labels) in (histograms or {}).items():
+            kept = np.flatnonzero(codes >= 0)
+            n_labels = max(1, len(labels))
+            pairs = groups[kept].astype(np.int64) * n_labels + codes[kept]
+            keys, first, entry_counts = np.unique(pairs, return_index=True, return_counts=True)
+            offsets = np.searchsorted(keys // n_labels, np.arange(n_groups + 1))
+            self._histograms[name] = (offsets, keys % n_labels, entry_counts, kept[first], list(labels))
+
+    def total(self, group_ids: Sequence[int]) -> int:
+        """Count the rows of a set of groups."""
+        return int(self.rows[group_ids].sum())
+
+    def count(self, name: str, group_ids: Sequence[int]) -> int:
+        """Count the rows of a set of groups that are set in a mask."""
+        return int(self._counts[name][group_ids].sum())
+
+    def summary(self, name: str, group_ids: Sequence[int]) -> Optional[dict]:
+        """Get the min, max, average and QUANTILES (as "p10", ...) of a numeric column over a set of groups, or None when it has no value."""
+        n, mins, maxs, sums = (a[group_ids] for a in self._summaries[name])
+        total = int(n.sum())
+        if not total:
+            return None
+        digests = self._digests[name]
+        digest = TDigest.merge(digests[g] for g in group_ids if digests[g] is not None)
+        return {
+            "min": float(mins.min()),
+            "max": float(maxs.max()),
+            "avg": float(sums.sum() / total),
+            **{f"p{round(q * 100)}": round(v, 4) for q, v in zip(QUANTILES, digest.quantiles(QUANTILES))}
+        }
+
+    def histogram(self, name: str, group_ids: Sequence[int]) -> dict:
+        """Count the values of a column over a set of groups, in order of first appearance."""
+        offsets, values, counts, first, labels = self._histograms[name]
+        entries = np.concatenate([np.arange(offsets[g], offsets[g + 1]) for g in group_ids]) if len(group_ids) else np.empty(0, dtype=np.intp)
+        distinct, inverse = np.unique(values[entries], return_inverse=True)
+        merged_counts = np.bincount(inverse, weights=counts[entries], minlength=len(distinct))
+        merged_first = np.full(len(distinct), np.iinfo(np.int64).max)
+        np.minimum.at(merged_first, inverse, first[entries])
+        return {labels[distinct[i]]: int(merged_counts[i]) for i in np.argsort(merged_first, kind="stable")}
@@ -0,0 +1,41 @@
+from collections.abc import Sequence
+from typing import Callable
+
+KeyFunction = Callable[[dict], str]
+
+
+def unique_index(rows: Sequence[dict], *keys: KeyFunction) -> dict[str, int]:
+    """Build a hash index from keys to the position of the first row that has them.
+
+    When several key functions are given they share the same index, so a key maps to the first
+    row that produces it through any of them.
+
+    Args:
+        rows (Sequence[dict]): The rows to index.
+        *keys (KeyFunction): Functions extracting the (normalized) keys of a row.
+
+    Returns:
+        dict[str, int]: Position of the first row for every key.
+    """
+    index: dict[str, int] = {}
+    for i, row in enumerate(rows):
+        for key in keys:
+            index.setdefault(key(row), i)
+    return index
+
+
+def multi_index(rows: Sequence[dict], *keys: KeyFunction) -> dict[str, list[int]]:
+    """Build a hash index from keys to the positions of every row that has them.
+
+    Args:
+        rows (Sequence[dict]): The rows to index.
+        *keys (KeyFunction): Functions extracting the (normalized) keys of a row.
+
+    Returns:
+        dict[str, list[int]]: Positions of the matching rows, in file order, for every key.
+    """
+    index: dict[str, list[int]] = {}
+    for i, row in enumerate(rows):
+        for k in {key(row) for key in keys}:
+            index.setdefault(k, []).append(i)
+    return index
@@ -0,0 +1,74 @@
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+# Centroids kept by a digest: about COMPRESSION / 2, smaller ones towards the tails
+COMPRESSION = 100
+
+
+def _compress(means: np.ndarray, weights: np.ndarray, compression: float) -> tuple[np.ndarray, np.ndarray]:
+    """Merge adjacent centroids (sorted by mean) whose quantiles fall in the same unit of the k1 scale."""
+    cumulative = np.cumsum(weights)
+    q = (cumulative - weights / 2) / cumulative[-1]
+    k = compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+    buckets = np.floor(k + compression / 4)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    merged_weights = np.add.reduceat(weights, starts)
+    return np.add.reduceat(means * weights, starts) / merged_weights, merged_weights
+
+
+class TDigest:
+    """Mergeable quantile sketch (a merging t-digest with the k1 scale function).
+
+    A digest summarizes any number of values in at most about `compression / 2` weighted
+    centroids, kept small near the tails so that extreme quantiles stay accurate, plus the exact
+    min and max. Digests of disjoint sets of values merge into the digest of their union, so
+    quantiles of a union of groups never need the values again.
+    """
+
+    def __init__(self, means: np.ndarray, weights: np.ndarray, low: float, high: float, compression: float = COMPRESSION):
+        self.means = means
+        self.weights = weights
+        self.low = low
+        self.high = high
+        self.compression = compression
+
+    @classmethod
+    def from_sorted(cls, values: np.ndarray, compression: float = COMPRESSION) -> "TDigest":
+        """Build the digest of a non-empty array of values sorted in ascending order."""
+        means, weights = _compress(values.astype(np.float64), np.ones(len(values)), compression)
+        return cls(means, weights, float(values[0]), float(values[-1]), compression)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, compression: float = COMPRESSION) -> "TDigest":
+        """Build the digest of a non-empty array of values."""
+        return cls.from_sorted(np.sort(values), compression)
+
+    @classmethod
+    def merge(cls, digests: Iterable["TDigest"]) -> "TDigest":
+        """Merge non-empty digests into the digest of all their values."""
+        digests = list(digests)
+        if len(digests) == 1:
+            return digests[0]
+        compression = max(d.compression for d in digests)
+        means = np.concatenate([d.means for d in digests])
+        weights = np.concatenate([d.weights for d in digests])
+        order = np.argsort(means, kind="stable")
+        means, weights = _compress(means[order], weights[order], compression)
+        return cls(means, weights, min(d.low for d in digests), max(d.high for d in digests), compression)
+
+    @property
+    def count(self) -> int:
+        return int(round(self.weights.sum()))
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0 <= q <= 1) of the values, in constant time."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Sequence[float]) -> list[float]:
+        """Estimate several quantiles of the values at once."""
+        cumulative = np.cumsum(self.weights)
+        centers = cumulative - self.weights / 2
+        positions = np.concatenate(([0.0], centers, [cumulative[-1]]))
+        values = np.concatenate(([self.low], self.means, [self.high]))
+        return np.interp(np.asarray(qs) * cumulative[-1], positions, values).tolist()
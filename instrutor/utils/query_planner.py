@@ -0,0 +1,110 @@
+from collections.abc import Hashable, Iterable
+from typing import Callable, Optional
+
+import numpy as np
+
+from utils import bitmap
+from utils.columnar import ColumnarTable
+
+
+class Predicate:
+    """One filter of a conjunctive query over a ColumnarTable.
+
+    A predicate knows how many rows it selects (from an index, without listing them), how to
+    list those rows through the index, and how to test a set of candidate rows directly.
+
+    Args:
+        name (str): Describes the filter in query plans.
+        estimate (int): How many rows the filter selects.
+        rows (Callable[[], np.ndarray]): Lists the ids of the selected rows (in any order).
+        test (Callable[[np.ndarray], np.ndarray]): Boolean mask of the candidate ids that pass.
+    """
+
+    def __init__(self, name: str, estimate: int, rows: Callable[[], np.ndarray], test: Callable[[np.ndarray], np.ndarray]):
+        self.name = name
+        self.estimate = estimate
+        self.rows = rows
+        self.test = test
+
+
+def text_predicate(table: ColumnarTable, column: str, needle: str) -> Predicate:
+    """Rows whose string value contains the needle (case-insensitive), through the trigram index."""
+    accepted = np.zeros(len(table.categories(column)), dtype=bool)
+    accepted[table.matching(column, needle)] = True
+    return Predicate(
+        f"{column} contains {needle!r}",
+        table.count(column, needle),
+        lambda: table.search(column, needle),
+        lambda ids: accepted[table.codes(column)[ids]],
+    )
+
+
+def value_predicate(table: ColumnarTable, column: str, values: Iterable[Hashable], label: Optional[str] = None) -> Predicate:
+    """Rows whose value is one of the given ones, through the bitmap index of the column."""
+    values = list(values)
+    selected = table.bitmap(column).any_of(values)
+    if table.schema.get(column) is str:
+        positions = {v: i for i, v in enumerate(table.categories(column))}
+        accepted = np.zeros(len(positions), dtype=bool)
+        accepted[[positions[v] for v in values if v in positions]] = True
+        test = lambda ids: accepted[table.codes(column)[ids]]
+    else:
+        test = lambda ids: np.isin(table.values(column)[ids], values)
+    return Predicate(
+        label or f"{column} in {values}",
+        bitmap.count(selected),
+        lambda: bitmap.to_ids(selected, len(table)),
+        test,
+    )
+
+
+def range_predicate(table: ColumnarTable, column: str, low: Optional[float] = None, high: Optional[float] = None) -> Predicate:
+    """Rows whose numeric value is between `low` and `high` (inclusive, either may be open), through the sorted index."""
+    if low is None:
+        name = f"{column} <= {high:g}"
+    elif high is None:
+        name = f"{column} >= {low:g}"
+    else:
+        name = f"{low:g} <= {column} <= {high:g}"
+    low = -np.inf if low is None else low
+    high = np.inf if high is None else high
+    index = table.sorted(column)
+    return Predicate(
+        name,
+        index.count(low, high),
+        lambda: index.range(low, high, "asc"),
+        lambda ids: (table.values(column)[ids] >= low) & (table.values(column)[ids] <= high),
+    )
+
+
+def execute(predicates: list[Predicate], size: int) -> tuple[np.ndarray, list[dict]]:
+    """Evaluate a conjunction of predicates, most selective first.
+
+    The most selective predicate lists its rows through its index; every other predicate is
+    then tested on the remaining candidates only, in order of selectivity, so no index but the
+    first is scanned and the candidate set only shrinks. Evaluation stops as soon as it is empty.
+
+    Args:
+        predicates (list[Predicate]): The filters, all of which must hold.
+        size (int): The number of rows of the table (all of them match an empty query).
+
+    Returns:
+        tuple[np.ndarray, list[dict]]: The matching row ids in ascending order, and the plan:
+        every filter in evaluation order with its estimated and remaining rows.
+    """
+    if not predicates:
+        return np.arange(size), []
+    ordered = sorted(predicates, key=lambda p: p.estimate)
+    ids = np.sort(ordered[0].rows())
+    plan = [{"filter": ordered[0].name, "estimated_rows": ordered[0].estimate, "remaining_rows": len(ids)}]
+    for predicate in ordered[1:]:
+        if len(ids):
+            ids = ids[predicate.test(ids)]
+        plan.append({"filter": predicate.name, "estimated_rows": predicate.estimate, "remaining_rows": len(ids)})
+    return ids, plan
+
+
+def order_by(table: ColumnarTable, column: str, ids: np.ndarray, sort: str = "asc") -> np.ndarray:
+    """Order row ids by a numeric column ("asc" or "desc"); ties keep their order and NaN values come last."""
+    values = table.values(column)[ids]
+    return ids[np.argsort(values if sort == "asc" else -values, kind="stable")]
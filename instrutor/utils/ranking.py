@@ -0,0 +1,81 @@
+from typing import Optional
+
+import numpy as np
+
+# A ranking criterion maps a name to a numeric column and whether lower values are better
+Criteria = dict[str, tuple[str, bool]]
+# Most results a ranking returns
+MAX_RANKED = 50
+
+
+def normalize(values: np.ndarray, lower_is_better: bool = False) -> np.ndarray:
+    """Min-max scale values to [0, 1], 1 being the best; NaN values score 0 and equal values 1."""
+    scores = np.zeros(len(values))
+    known = ~np.isnan(values)
+    if not known.any():
+        return scores
+    low, high = values[known].min(), values[known].max()
+    if high == low:
+        scores[known] = 1.0
+    else:
+        scaled = (values[known] - low) / (high - low)
+        scores[known] = 1.0 - scaled if lower_is_better else scaled
+    return scores
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Get the positions of the k highest scores, best first (equal scores by position).
+
+    The k-th best score is found by partial selection (`np.partition`), so only the k selected
+    scores are ever sorted.
+    """
+    k = max(0, min(k, len(scores)))
+    if not k:
+        return np.empty(0, dtype=np.intp)
+    threshold = -np.partition(-scores, k - 1)[k - 1]
+    above = np.flatnonzero(scores > threshold)
+    selected = np.concatenate((above, np.flatnonzero(scores == threshold)[:k - len(above)]))
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+
+def check_weights(weights: Optional[dict[str, float]], criteria: Criteria, defaults: dict[str, float]) -> tuple[Optional[dict[str, float]], Optional[str]]:
+    """Validate ranking weights against the available criteria.
+
+    Args:
+        weights (Optional[dict[str, float]]): Weight of every criterion to use; None for the defaults.
+        criteria (Criteria): The available criteria.
+        defaults (dict[str, float]): The default weights.
+
+    Returns:
+        tuple[Optional[dict[str, float]], Optional[str]]: The weights of the used criteria, scaled
+        to sum to 1, or an error message.
+    """
+    weights = defaults if weights is None else weights
+    unknown = [name for name in weights if name not in criteria]
+    if unknown:
+        return None, f"Unknown ranking criteria: {', '.join(unknown)} (expected any of {', '.join(criteria)})"
+    if any(w < 0 for w in weights.values()):
+        return None, "Ranking weights must not be negative"
+    total = sum(weights.values())
+    if total <= 0:
+        return None, "At least one ranking weight must be positive"
+    return {name: w / total for name, w in weights.items() if w > 0}, None
+
+
+def weighted_scores(columns: dict[str, np.ndarray], criteria: Criteria, weights: dict[str, float]) -> np.ndarray:
+    """Score rows as the weighted sum of their normalized criteria.
+
+    Args:
+        columns (dict[str, np.ndarray]): The values of every weighted criterion, for the rows to score.
+        criteria (Criteria): The column and direction of every criterion.
+        weights (dict[str, float]): The weights, summing to 1 (see `check_weights`).
+
+    Returns:
+        np.ndarray: A score in [0, 1] per row, higher being better.
+    """
+    scores = None
+    for name, weight in weights.items():
+        _, lower_is_better = criteria[name]
+        part = weight * normalize(columns[name], lower_is_better)
+        scores = part if scores is None else scores + part
+    return scores
@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from utils.columnar import ColumnarTable, Schema
+from utils.loader import load_dataset
+from utils.snapshot import EncodedColumns, LazyRows, encode_columns, file_hash, read_snapshot, snapshot_path, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """Immutable, fully parsed view of a dataset file at a given point in time.
+
+    Rows are shared between every caller of the registry, so they must be treated as read-only.
+    With binary snapshots enabled they are a `LazyRows` over the encoded columns, whether these
+    were mapped from a snapshot or just parsed from the CSV; without, they are a tuple of dicts.
+    Structures derived from the rows (indexes, graphs, ...) are memoized per snapshot through
+    `derive`, which means they are rebuilt automatically whenever the file is reloaded.
+    """
+    path: str
+    headers: Optional[tuple[str, ...]]
+    rows: Sequence[dict]
+    mtime: float
+    size: int
+    version: int
+    load_seconds: float
+    loaded_at: float
+    source: str = "csv"
+    columns: Optional[EncodedColumns] = field(default=None, repr=False, compare=False)
+    _derived: dict = field(default_factory=dict, repr=False, compare=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    def derive(self, key: Any, builder: Callable[["DatasetSnapshot"], Any], valid: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Build (once) and return a structure derived from this snapshot.
+
+        Args:
+            key (Any): Hashable name of the derived structure.
+            builder (Callable): Function receiving the snapshot and returning the structure.
+            valid (Callable, optional): Whether the memoized structure is still up to date, for
+                structures that also depend on another dataset; an outdated one is rebuilt and
+                replaces it.
+
+        Returns:
+            Any: The memoized structure.
+        """
+        try:
+            value = self._derived[key]
+            if valid is None or valid(value):
+                return value
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived or (valid is not None and not valid(self._derived[key])):
+                self._derived[key] = builder(self)
+            return self._derived[key]
+
+    def table(self, schema: Schema) -> ColumnarTable:
+        """Get the typed columnar view of this snapshot, coerced once per snapshot.
+
+        Args:
+            schema (Schema): Column types, see `utils.columnar`.
+
+        Returns:
+            ColumnarTable: The columnar view over the snapshot rows.
+        """
+        return self.derive(("columnar", tuple(schema)), lambda s: ColumnarTable(s.rows, schema, s.columns))
+
+
+class DatasetRegistry:
+    """Process-wide cache of parsed datasets.
+
+    Each file is parsed once and reused until its mtime or size changes on disk. When binary
+    snapshots are enabled, the parsed columns are also written next to the source file (see
+    `utils.snapshot`) and mapped back on the next start instead of parsing the CSV again.
+    """
+
+    def __init__(self, binary_snapshots: bool = True):
+        self._snapshots: dict[str, DatasetSnapshot] = {}
+        self._lock = threading.Lock()
+        self._versions = 0
+        self.binary_snapshots = binary_snapshots
+
+    def get(self, filepath: str, headers: Optional[list[str]] = None) -> DatasetSnapshot:
+        """Get the current snapshot of a dataset, loading or reloading it when needed.
+
+        Args:
+            filepath (str): Full path to the CSV file.
+            headers (list[str], optional): Column headers, see `load_dataset`.
+
+        Returns:
+            DatasetSnapshot: The current snapshot of the dataset.
+        """
+        path = os.path.abspath(filepath)
+        stat = os.stat(path)
+        snapshot = self._snapshots.get(path)
+        if snapshot is not None and snapshot.mtime == stat.st_mtime and snapshot.size == stat.st_size:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshots.get(path)
+            if snapshot is not None and snapshot.mtime == stat.st_mtime and snapshot.size == stat.st_size:
+                return snapshot
+            snapshot = self._load(path, headers, stat)
+            self._snapshots[path] = snapshot
+            return snapshot
+
+    def _load(self, path: str, headers: Optional[list[str]], stat: os.stat_result) -> DatasetSnapshot:
+        start = time.perf_counter()
+        columns, source = None, "csv"
+        if self.binary_snapshots:
+            source_hash = file_hash(path)
+            cached = read_snapshot(snapshot_path(path), source_hash)
+            if cached is not None:
+                names, columns, count = cached
+                rows = LazyRows(names, columns, count)
+                source = "snapshot"
+            else:
+                parsed = tuple(load_dataset(path, headers))
+                names = list(headers) if headers is not None else [k for k in (parsed[0] if parsed else {}) if isinstance(k, str)]
+                columns = encode_columns(parsed, names)
+                try:
+                    write_snapshot(snapshot_path(path), source_hash, names, columns, len(parsed))
+                except OSError as e:
+                    logger.warning("Could not write snapshot for %s: %s", os.path.basename(path), e)
+                # Serve the same lazy rows as a mapped snapshot, so the parsed dicts can be freed
+                rows = LazyRows(names, columns, len(parsed))
+        else:
+            rows = tuple(load_dataset(path, headers))
+        elapsed = time.perf_counter() - start
+        self._versions += 1
+        logger.debug("Loaded %s from %s: %d rows in %.3fs", os.path.basename(path), source, len(rows), elapsed)
+        return DatasetSnapshot(
+            path=path,
+            headers=tuple(headers) if headers is not None else None,
+            rows=rows,
+            mtime=stat.st_mtime,
+            size=stat.st_size,
+            version=self._versions,
+            load_seconds=elapsed,
+            loaded_at=time.time(),
+            source=source,
+            columns=columns,
+        )
+
+    def invalidate(self, filepath: Optional[str] = None) -> None:
+        """Drop one cached dataset, or all of them when no path is given."""
+        with self._lock:
+            if filepath is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(os.path.abspath(filepath), None)
+
+    def stats(self) -> list[dict]:
+        """Get load statistics for every dataset currently in the registry.
+
+        Returns:
+            list[dict]: One entry per dataset with its row count and load time.
+        """
+        return [
+            {
+                "dataset": os.path.basename(s.path),
+                "rows": s.row_count,
+                "load_seconds": round(s.load_seconds, 4),
+                "source": s.source,
+                "version": s.version,
+                "loaded_at": s.loaded_at,
+            }
+            for s in self._snapshots.values()
+        ]
+
+
+REGISTRY = DatasetRegistry(binary_snapshots=os.getenv("DATASET_SNAPSHOTS", "1") != "0")
+
+
+def get_dataset(filepath: str, headers: Optional[list[str]] = None) -> DatasetSnapshot:
+    """Get the shared snapshot of a dataset from the process-wide registry.
+
+    Args:
+        filepath (str): Full path to the CSV file.
+        headers (list[str], optional): Column headers, see `load_dataset`.
+
+    Returns:
+        DatasetSnapshot: The current snapshot of the dataset.
+    """
+    return REGISTRY.get(filepath, headers)
+
+
+def warm_up(loaders: list[Callable[[], Any]]) -> list[dict]:
+    """Load datasets ahead of the first tool call and report what it cost.
+
+    Args:
+        loaders (list[Callable]): Dataset loader functions to call.
+
+    Returns:
+        list[dict]: Load statistics for every dataset in the registry.
+    """
+    for load in loaders:
+        try:
+            load()
+        except FileNotFoundError as e:
+            logger.warning("Skipping warm-up of missing dataset: %s", e.filename)
+    stats = REGISTRY.stats()
+    for entry in stats:
+        logger.info("Dataset %s ready: %d rows, loaded from %s in %.3fs", entry["dataset"], entry["rows"], entry["source"], entry["load_seconds"])
+    return stats
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from typing import Optional
+
+import numpy as np
+
+from utils.columnar import encode
+
+# Binary snapshot of a parsed dataset, written next to the source file.
+#
+# Layout: MAGIC, a little-endian uint64 with the size of a JSON header, the JSON header and
+# then, for every column, its int32 codes (8-byte aligned) followed by its string table
+# (the distinct values joined by NUL). The header records the source file hash, the column
+# names, the row count and the offset of every block, so a snapshot can be mapped and
+# validated without parsing anything else.
+MAGIC = b"WSNAP01\n"
+SNAPSHOT_SUFFIX = ".snap"
+
+EncodedColumns = dict[str, tuple[np.ndarray, list[str]]]
+
+
+def snapshot_path(filepath: str) -> str:
+    """Get the path of the snapshot that belongs to a dataset file."""
+    return filepath + SNAPSHOT_SUFFIX
+
+
+def file_hash(filepath: str) -> str:
+    """Hash the contents of a file.
+
+    Args:
+        filepath (str): Full path to the file.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_columns(rows: Sequence[dict], names: Sequence[str]) -> EncodedColumns:
+    """Dictionary-encode every column of a list of rows.
+
+    Args:
+        rows (Sequence[dict]): The parsed rows.
+        names (Sequence[str]): The columns to encode.
+
+    Returns:
+        EncodedColumns: Codes and distinct values for every column.
+    """
+    return {name: encode(((r.get(name) or "") for r in rows), len(rows)) for name in names}
+
+
+class LazyRows(Sequence):
+    """Read-only sequence of row dicts rebuilt on demand from encoded columns.
+
+    Single rows are built (and cached) when they are accessed; iterating over the whole sequence
+    builds every row at once, which is much cheaper than building them one by one.
+    """
+
+    def __init__(self, names: Sequence[str], columns: EncodedColumns, count: int):
+        self._names = list(names)
+        self._columns = [columns[n] for n in self._names]
+        self._count = count
+        self._rows: Optional[list[dict]] = None
+        self._cache: dict[int, dict] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if self._rows is not None:
+            return self._rows[index]
+        index = int(index)
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("row index out of range")
+        row = self._cache.get(index)
+        if row is None:
+            row = dict(zip(self._names, (strings[codes[index]] for codes, strings in self._columns)))
+            self._cache[index] = row
+        return row
+
+    def __iter__(self):
+        if self._rows is None:
+            self._materialize()
+        return iter(self._rows)
+
+    def _materialize(self) -> None:
+        values = [np.array(strings, dtype=object)[codes].tolist() for codes, strings in self._columns]
+        rows = [dict(zip(self._names, row)) for row in zip(*values)] if values else [{} for _ in range(self._count)]
+        # Keep the dicts already handed out so callers keep seeing the same objects
+        for index, row in self._cache.items():
+            rows[index] = row
+        self._rows = rows
+        self._cache = {}
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_snapshot(path: str, source_hash: str, names: Sequence[str], columns: EncodedColumns, count: int) -> None:
+    """Write a binary snapshot atomically.
+
+    Args:
+        path (str): Where to write the snapshot.
+        source_hash (str): Hash of the source file the columns were parsed from.
+        names (Sequence[str]): Column names, in order.
+        columns (EncodedColumns): Encoded columns.
+        count (int): Number of rows.
+    """
+    blocks: list[bytes] = []
+    layout = []
+    offset = 0
+    for name in names:
+        codes, strings = columns[name]
+        codes_offset = _align(offset)
+        blocks.append(b"\0" * (codes_offset - offset))
+        data = codes.astype("<i4", copy=False).tobytes()
+        blocks.append(data)
+        table = "\0".join(strings).encode("utf-8")
+        blocks.append(table)
+        layout.append({"name": name, "codes": codes_offset, "strings": codes_offset + len(data), "strings_size": len(table), "distinct": len(strings)})
+        offset = codes_offset + len(data) + len(table)
+
+    header = json.dumps({"source_hash": source_hash, "rows": count, "columns": layout}).encode("utf-8")
+    start = _align(len(MAGIC) + 8 + len(header))
+    header += b" " * (start - len(MAGIC) - 8 - len(header))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str, source_hash: str) -> Optional[tuple[list[str], EncodedColumns, int]]:
+    """Map a binary snapshot if it exists and matches the source file.
+
+    Args:
+        path (str): Path of the snapshot.
+        source_hash (str): Hash of the current source file.
+
+    Returns:
+        Optional[tuple[list[str], EncodedColumns, int]]: Column names, encoded columns and row
+        count, or None when the snapshot is missing, corrupt or stale.
+    """
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if mm[:len(MAGIC)] != MAGIC:
+            return None
+        (header_size,) = struct.unpack_from("<Q", mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(mm[start:start + header_size])
+        if header.get("source_hash") != source_hash:
+            return None
+        base = start + header_size
+        count = header["rows"]
+        names: list[str] = []
+        columns: EncodedColumns = {}
+        for col in header["columns"]:
+            codes = np.frombuffer(mm, dtype="<i4", count=count, offset=base + col["codes"])
+            strings_start = base + col["strings"]
+            strings = mm[strings_start:strings_start + col["strings_size"]].decode("utf-8").split("\0") if col["distinct"] else []
+            if len(strings) != col["distinct"]:
+                return None
+            names.append(col["name"])
+            columns[col["name"]] = (codes, strings)
+        return names, columns, count
+    except (ValueError, KeyError, struct.error):
+        return None
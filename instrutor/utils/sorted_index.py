@@ -0,0 +1,53 @@
+from typing import Optional
+
+import numpy as np
+
+SORT_ORDERS = ("asc", "desc")
+
+
+class SortedIndex:
+    """Sorted permutation of a numeric column, for range queries.
+
+    The row ids are kept ordered by value (ties in file order; NaN values are left out), so the
+    rows in a range are a contiguous slice found with two binary searches, already sorted by
+    value in either direction.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.size = len(values)
+        known = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[known], kind="stable")
+        self.ids = known[order]
+        self.keys = values[self.ids]
+
+    def count(self, low: float, high: float) -> int:
+        """Count the rows whose value is between `low` and `high` (inclusive), without listing them."""
+        start = np.searchsorted(self.keys, low, side="left")
+        stop = np.searchsorted(self.keys, high, side="right")
+        return int(max(0, stop - start))
+
+    def range(self, low: float, high: float, sort: Optional[str] = None) -> np.ndarray:
+        """Get the ids of the rows whose value is between `low` and `high` (inclusive).
+
+        Args:
+            low (float): The lowest value.
+            high (float): The highest value.
+            sort (Optional[str]): "asc" or "desc" to order the ids by value; by default they
+                are in ascending (file) order.
+
+        Returns:
+            np.ndarray: The matching row ids.
+        """
+        start = np.searchsorted(self.keys, low, side="left")
+        stop = np.searchsorted(self.keys, high, side="right")
+        ids = self.ids[start:max(start, stop)]
+        if sort == "asc":
+            return ids
+        if sort == "desc":
+            return ids[::-1]
+        if len(ids) * 8 < self.size:
+            return np.sort(ids)
+        # Wide ranges: scattering into a mask is cheaper than sorting the ids back
+        mask = np.zeros(self.size, dtype=bool)
+        mask[ids] = True
+        return np.flatnonzero(mask)
@@ -0,0 +1,112 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from utils.columnar import ColumnarTable, Schema, to_numbers
+from utils.snapshot import EncodedColumns
+
+
+def compact(values: np.ndarray) -> np.ndarray:
+    """Store a numeric column in the smallest dtype that holds it exactly (float32 if it is not integral)."""
+    if not len(values) or np.isnan(values).any() or not np.array_equal(values, np.round(values)):
+        return values.astype(np.float32)
+    return values.astype(np.result_type(np.min_scalar_type(int(values.min())), np.min_scalar_type(int(values.max()))))
+
+
+class StarSchema:
+    """Star-schema split of a denormalized table into a dimension table and a fact table.
+
+    Every distinct value of the key column (e.g. a hotel id) gets one dimension row holding its
+    descriptive attributes, taken from its first row in the file, plus its number of facts. The
+    dimension is itself a `ColumnarTable`, so it can be searched and filtered like any table but
+    has one row per key instead of one per fact. Every source row becomes a fact: the dimension id
+    of its key and the dictionary codes of its other columns, plus a few numeric measures decoded
+    once in a compact dtype.
+
+    The denormalized rows are not kept: `rows` joins a fact with its dimension row when it is
+    read, and `encoded` gives any column per fact, to index the facts like a flat table.
+    Dimension ids are the codes of the key column, so dimensions are in order of first appearance
+    and `first_facts` holds the first fact of every dimension row.
+
+    Args:
+        columns (EncodedColumns): The dictionary-encoded columns of the denormalized table, in
+            order (see `utils.snapshot`); the key must be one of them.
+        key (str): The column identifying a dimension row.
+        attributes (Sequence[str]): The columns stored once per dimension row.
+        dimension_schema (Schema): Column types of the dimension table.
+        measures (Schema): The numeric fact columns to decode, and their types.
+    """
+
+    def __init__(self, columns: EncodedColumns, key: str, attributes: Sequence[str], dimension_schema: Schema, measures: Schema):
+        self.key = key
+        self.names = list(columns)
+        self.fact_keys, keys = columns[key]
+        _, self.first_facts = np.unique(self.fact_keys, return_index=True)
+        counts = np.bincount(self.fact_keys, minlength=len(keys))
+
+        # Codes of every attribute by dimension id, and of every other column by fact id
+        self._attributes = {name: (np.asarray(columns[name][0])[self.first_facts], columns[name][1]) for name in (key, *attributes)}
+        self._facts = {name: column for name, column in columns.items() if name not in self._attributes}
+        values = [np.array(strings, dtype=object)[codes].tolist() for codes, strings in self._attributes.values()]
+        rows = tuple(
+            {**dict(zip(self._attributes, row)), "bookings": int(count)}
+            for row, count in zip(zip(*values), counts.tolist())
+        )
+        self.dimension = ColumnarTable(rows, dimension_schema, {name: self._attributes[name] for name in dimension_schema})
+        self.facts = {name: compact(to_numbers(*self._facts[name], kind)) for name, kind in measures.items()}
+        self.rows = JoinedRows(self)
+
+    def __len__(self) -> int:
+        return len(self.fact_keys)
+
+    def encoded(self, names: Sequence[str]) -> EncodedColumns:
+        """Get some columns per fact, dictionary-encoded; attributes are looked up through the dimension of every fact."""
+        return {
+            name: (self._attributes[name][0][self.fact_keys], self._attributes[name][1]) if name in self._attributes else self._facts[name]
+            for name in names
+        }
+
+    def column(self, name: str) -> tuple[np.ndarray, list[str], bool]:
+        """Get the codes and distinct values of a column, and whether its codes are by dimension id (an attribute) or by fact id."""
+        if name in self._attributes:
+            return (*self._attributes[name], True)
+        return (*self._facts[name], False)
+
+    def dimension_mean(self, values: np.ndarray) -> np.ndarray:
+        """Average per-fact values over the facts of every dimension row, leaving NaN values out (NaN for a row without any)."""
+        known = ~np.isnan(values)
+        total = np.bincount(self.fact_keys[known], weights=values[known], minlength=len(self.dimension))
+        count = np.bincount(self.fact_keys[known], minlength=len(self.dimension))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return total / count
+
+
+class JoinedRows(Sequence):
+    """Read-only sequence of the denormalized rows of a star schema, joined on demand.
+
+    A row dict is built from its fact and its dimension row every time it is accessed and is not
+    kept, so only the rows actually returned by a query are ever materialized.
+    """
+
+    def __init__(self, schema: StarSchema):
+        self._count = len(schema)
+        self._key = schema.fact_keys.item
+        # `item` reads a code as a Python int, much cheaper than indexing into a NumPy scalar
+        self._columns = []
+        for name in schema.names:
+            codes, strings, by_dimension = schema.column(name)
+            self._columns.append((name, codes.item, strings, by_dimension))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        dimension = self._key(index)
+        return {name: strings[code(dimension if by_dimension else index)] for name, code, strings, by_dimension in self._columns}
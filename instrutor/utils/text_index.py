@@ -0,0 +1,85 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+GRAM = 3
+
+
+def ngrams(text: str, n: int = GRAM) -> set[str]:
+    """Get the set of character n-grams of a string."""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class SubstringIndex:
+    """Trigram inverted index answering case-insensitive substring queries over a string column.
+
+    The index is built over the distinct values of a dictionary-encoded column (see
+    `utils.columnar`). A query intersects the posting lists of its trigrams to get candidate
+    values, verifies them with a plain substring test and only then maps the surviving values to
+    row ids, so no row is touched while matching. Results are exactly those of
+    `needle.lower() in value.lower()`.
+    """
+
+    def __init__(self, values: Sequence[str], codes: np.ndarray):
+        self._values = [v.lower() for v in values]
+        postings: dict[str, list[int]] = {}
+        for value_id, value in enumerate(self._values):
+            for gram in ngrams(value):
+                postings.setdefault(gram, []).append(value_id)
+        self._postings = {g: set(ids) for g, ids in postings.items()}
+
+        # Rows grouped by value: rows of value v are _order[_offsets[v]:_offsets[v + 1]], ascending
+        self._codes = codes
+        self._order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes, minlength=len(values)) if len(codes) else np.zeros(len(values), dtype=np.int64)
+        self._offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def matching_values(self, needle: str) -> list[int]:
+        """Get the ids of the distinct values that contain the needle (case-insensitive).
+
+        Args:
+            needle (str): The substring to look for.
+
+        Returns:
+            list[int]: Matching value ids, in ascending order.
+        """
+        needle = needle.lower()
+        if len(needle) < GRAM:
+            candidates = range(len(self._values))
+        else:
+            posting_lists = []
+            for gram in ngrams(needle):
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                posting_lists.append(posting)
+            posting_lists.sort(key=len)
+            candidates = sorted(set.intersection(*posting_lists))
+        return [v for v in candidates if needle in self._values[v]]
+
+    def count(self, needle: str) -> int:
+        """Count the rows whose value contains the needle (case-insensitive), without listing them."""
+        value_ids = np.asarray(self.matching_values(needle), dtype=np.intp)
+        return int((self._offsets[value_ids + 1] - self._offsets[value_ids]).sum())
+
+    def rows(self, needle: str) -> np.ndarray:
+        """Get the ids of the rows whose value contains the needle (case-insensitive).
+
+        Args:
+            needle (str): The substring to look for.
+
+        Returns:
+            np.ndarray: Matching row ids, in ascending (file) order.
+        """
+        value_ids = self.matching_values(needle)
+        if not value_ids:
+            return np.empty(0, dtype=np.intp)
+        starts = self._offsets[value_ids]
+        ends = self._offsets[np.asarray(value_ids) + 1]
+        total = int((ends - starts).sum())
+        if total > len(self._codes) // 4:
+            # Many rows match: a vectorized mask over the codes is cheaper than merging the groups
+            accepted = np.zeros(len(self._values), dtype=bool)
+            accepted[value_ids] = True
+            return np.flatnonzero(accepted[self._codes])
+        return np.sort(np.concatenate([self._order[s:e] for s, e in zip(starts, ends)]))